@@ -0,0 +1,179 @@
+"""
+Incremental, persistent skill analytics keyed on dataset version and vocabulary
+"""
+
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+from data_models import JobListing
+from skill_analyzer import SkillAnalyzer
+from job_store import JobStore
+
+
+class AnalyticsCache:
+    """Keeps per-skill job counts for the current job set up to date.
+
+    Counts are keyed by lowercased skill name so they survive changes to the
+    display name. Adding jobs only analyzes the new jobs, and a vocabulary
+    change only rescans the skills whose match signature changed.
+    """
+
+    def __init__(self, job_store: JobStore):
+        self.job_store = job_store
+        self._create_table()
+        self.reset()
+
+    def _create_table(self):
+        with self.job_store.conn:
+            self.job_store.conn.execute('''
+                CREATE TABLE IF NOT EXISTS analytics_cache (
+                    dataset_key TEXT PRIMARY KEY,
+                    dataset_version INTEGER NOT NULL,
+                    vocabulary_hash TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at TIMESTAMP
+                )
+            ''')
+
+    def reset(self, dataset_key: Optional[str] = None):
+        """Start a new, empty job set"""
+        self.dataset_key = dataset_key or f"live:{uuid.uuid4().hex[:12]}"
+        self.dataset_version = 0
+        self.vocabulary_hash = None
+        self.skill_signatures: Dict[str, str] = {}
+        self.skill_counts: Counter = Counter()
+        self.display_names: Dict[str, str] = {}
+        self.total_jobs = 0
+        self._stats = None
+
+    @property
+    def key(self):
+        return (self.dataset_key, self.dataset_version, self.vocabulary_hash)
+
+    def _adopt_vocabulary(self, analyzer: SkillAnalyzer):
+        self.vocabulary_hash = analyzer.vocabulary_hash()
+        self.skill_signatures = analyzer.skill_signatures()
+        self._stats = None
+
+    def _count(self, skills: Iterable[str], delta: int = 1):
+        for skill in skills:
+            key = skill.lower()
+            self.display_names[key] = skill
+            self.skill_counts[key] += delta
+            if self.skill_counts[key] <= 0:
+                del self.skill_counts[key]
+
+    def add_jobs(self, jobs: List[JobListing], analyzer: SkillAnalyzer):
+        """Analyze only the new jobs and fold them into the counts"""
+        for job in jobs:
+            analyzer.analyze_job(job)
+        self.count_jobs(jobs, analyzer)
+
+    def count_jobs(self, jobs: List[JobListing], analyzer: SkillAnalyzer):
+        """Fold jobs already analyzed with ``analyzer`` into the counts"""
+        if self.vocabulary_hash is None:
+            self._adopt_vocabulary(analyzer)
+
+        for job in jobs:
+            self._count(set(job.identified_skills))
+
+        self.total_jobs += len(jobs)
+        self.dataset_version += 1
+        self._stats = None
+
+    def update_vocabulary(self, analyzer: SkillAnalyzer, jobs: List[JobListing]) -> List[str]:
+        """Bring the counts in line with a new vocabulary.
+
+        Only skills that were added, removed or now match differently are
+        rescanned; a skill that merely moved category keeps its counts.
+        Returns the lowercased names of the rescanned skills.
+        """
+        self._stats = None
+        if analyzer.vocabulary_hash() == self.vocabulary_hash:
+            return []
+
+        new_signatures = analyzer.skill_signatures()
+        affected = {
+            skill for skill in set(new_signatures) | set(self.skill_signatures)
+            if new_signatures.get(skill) != self.skill_signatures.get(skill)
+        }
+
+        if affected:
+            for skill in affected:
+                self.skill_counts.pop(skill, None)
+                self.display_names.pop(skill, None)
+
+            rescan = [skill for skill in affected if skill in new_signatures]
+            for job in jobs:
+                kept = [skill for skill in job.identified_skills if skill.lower() not in affected]
+                found = analyzer.find_skills(job, rescan) if rescan else []
+                job.identified_skills = kept + found
+                self._count(set(found))
+
+        self._adopt_vocabulary(analyzer)
+        return sorted(affected)
+
+    def get_statistics(self, analyzer: SkillAnalyzer) -> Dict[str, any]:
+        """Statistics for the cached counts, rebuilt only when the key changes"""
+        if self._stats is None or self._stats[0] != self.key:
+            counts = Counter({self.display_names[skill]: count for skill, count in self.skill_counts.items()})
+            self._stats = (self.key, analyzer.build_statistics(counts, self.total_jobs))
+        return self._stats[1]
+
+    def save(self, dataset_key: Optional[str] = None):
+        """Persist the counts so the next start can show them immediately"""
+        if dataset_key:
+            self.dataset_key = dataset_key
+
+        payload = {
+            'total_jobs': self.total_jobs,
+            'skill_signatures': self.skill_signatures,
+            'skill_counts': dict(self.skill_counts),
+            'display_names': self.display_names
+        }
+        with self.job_store.conn:
+            self.job_store.conn.execute(
+                "INSERT OR REPLACE INTO analytics_cache "
+                "(dataset_key, dataset_version, vocabulary_hash, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (self.dataset_key, self.dataset_version, self.vocabulary_hash or "",
+                 json.dumps(payload), datetime.now().isoformat(sep=' '))
+            )
+
+    def load_latest(self, analyzer: SkillAnalyzer) -> bool:
+        """Restore the most recently saved job set.
+
+        If the vocabulary changed since it was saved and the job set is a
+        stored session, the affected skills are rescanned from the store.
+        """
+        row = self.job_store.conn.execute(
+            "SELECT dataset_key, dataset_version, vocabulary_hash, payload FROM analytics_cache "
+            "ORDER BY updated_at DESC LIMIT 1"
+        ).fetchone()
+        if not row:
+            return False
+
+        dataset_key, dataset_version, vocabulary_hash, payload = row
+        try:
+            payload = json.loads(payload)
+        except json.JSONDecodeError:
+            return False
+
+        self.reset(dataset_key)
+        self.dataset_version = dataset_version
+        self.vocabulary_hash = vocabulary_hash
+        self.skill_signatures = payload.get('skill_signatures', {})
+        self.skill_counts = Counter(payload.get('skill_counts', {}))
+        self.display_names = payload.get('display_names', {})
+        self.total_jobs = payload.get('total_jobs', 0)
+
+        if vocabulary_hash != analyzer.vocabulary_hash():
+            if not dataset_key.startswith("session:"):
+                self.reset()
+                return False
+            jobs = self.job_store.load_session_jobs(int(dataset_key.split(":", 1)[1]))
+            self.update_vocabulary(analyzer, jobs)
+            self.save()
+
+        return True
@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files.
+
+    python scarp/benchmarks/compare_results.py base.json new.json --threshold 10
+
+Exits with status 1 when any metric regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: dict, new: dict, threshold: float) -> bool:
+    """Print a comparison table and return True if anything regressed"""
+    regressed = False
+    names = sorted(set(base["metrics"]) | set(new["metrics"]))
+
+    print(f"{'metric':<45} {'base':>12} {'new':>12} {'change':>9}")
+    print("-" * 81)
+
+    for name in names:
+        old_metric = base["metrics"].get(name)
+        new_metric = new["metrics"].get(name)
+        if not old_metric or not new_metric:
+            status = "added" if new_metric else "removed"
+            value = (new_metric or old_metric)["value"]
+            print(f"{name:<45} {'':>12} {value:>12.4f} {status:>9}")
+            continue
+
+        old_value, new_value = old_metric["value"], new_metric["value"]
+        change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+        worse = change < -threshold if new_metric["better"] == "higher" else change > threshold
+        better = change > threshold if new_metric["better"] == "higher" else change < -threshold
+
+        marker = "  REGRESSION" if worse else ("  improved" if better else "")
+        regressed = regressed or worse
+        print(f"{name:<45} {old_value:>12.4f} {new_value:>12.4f} {change:>+8.1f}%{marker}")
+
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change treated as a regression (default: 10)")
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    print(f"base: {base['meta']['commit']} ({base['meta']['timestamp']})")
+    print(f"new:  {new['meta']['commit']} ({new['meta']['timestamp']})\n")
+
+    sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Local stand-in HTTP server that replays recorded job board pages
+"""
+
+import json
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureSet:
+    """Pages listed in fixtures/manifest.json, indexed for replay"""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        with open(os.path.join(fixtures_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        self.sites: List[Dict] = self.manifest["sites"]
+        self.search_pages: Dict[tuple, str] = {}
+        self.detail_pages: Dict[tuple, str] = {}
+        for page in self.manifest["pages"]:
+            if page["kind"] == "search":
+                self.search_pages[(page["site"], page["query"].lower())] = page["path"]
+            else:
+                self.detail_pages[(page["site"], str(page["job_id"]))] = page["path"]
+
+    @property
+    def queries(self) -> List[str]:
+        return sorted({page["query"] for page in self.manifest["pages"] if page["kind"] == "search"})
+
+    def read(self, path: str) -> bytes:
+        with open(os.path.join(self.fixtures_dir, path), "rb") as f:
+            return f.read()
+
+    def resolve(self, request_path: str) -> Optional[str]:
+        """Map a request on the stand-in server to a fixture file"""
+        parsed = urlparse(request_path)
+        parts = parsed.path.strip("/").split("/", 1)
+        site = parts[0]
+        rest = parts[1] if len(parts) > 1 else ""
+
+        if rest.startswith("search"):
+            params = parse_qs(parsed.query)
+            query = (params.get("q") or [""])[0].lower()
+            return self.search_pages.get((site, query))
+
+        job_id = re.search(r"\d+", rest + "?" + parsed.query)
+        if job_id:
+            return self.detail_pages.get((site, job_id.group(0)))
+        return None
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    fixtures: FixtureSet = None
+
+    def do_GET(self):
+        path = self.fixtures.resolve(self.path)
+        if path is None:
+            self.send_error(404)
+            return
+
+        body = self.fixtures.read(path)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves a FixtureSet on 127.0.0.1 from a background thread.
+
+    Every site is mounted under ``/<slug>/``, with its search page at
+    ``/<slug>/search?q=<query>`` and detail pages at any path containing
+    the job id.
+    """
+
+    def __init__(self, fixtures: Optional[FixtureSet] = None, port: int = 0):
+        self.fixtures = fixtures or FixtureSet()
+        handler = type("FixtureHandler", (_FixtureHandler,), {"fixtures": self.fixtures})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def site_urls(self, slug: str) -> Dict[str, str]:
+        """base_url and search_url_template for a stand-in JobSite"""
+        return {
+            "base_url": f"{self.base_url}/{slug}",
+            "search_url_template": f"{self.base_url}/{slug}/search?q={{query}}"
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import sys
+    server = FixtureServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Serving fixtures on {server.base_url}")
+    for site in server.fixtures.sites:
+        print(f"  {site['name']}: {server.site_urls(site['slug'])['search_url_template']}")
+    server.httpd.serve_forever()
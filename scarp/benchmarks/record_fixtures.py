@@ -0,0 +1,88 @@
+"""
+Record live search pages into the benchmark fixtures.
+
+    python scarp/benchmarks/record_fixtures.py --config config.json --queries "Software Engineer"
+
+Each active site's search page is saved under fixtures/<slug>/ and added to
+manifest.json with source "recorded", replacing any page for the same site
+and query.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import requests
+
+from config_manager import ConfigManager
+from fixture_server import FIXTURES_DIR
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live search pages as benchmark fixtures")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--queries", nargs="*", help="Queries to record (default: the configured ones)")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config).load_config()
+    queries = args.queries or config.search_queries
+
+    manifest_path = os.path.join(FIXTURES_DIR, "manifest.json")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+
+    for site in config.job_sites:
+        if not site.is_active:
+            continue
+
+        slug = slugify(site.name)
+        if not any(entry["slug"] == slug for entry in manifest["sites"]):
+            manifest["sites"].append({
+                "slug": slug,
+                "name": site.name,
+                "base_url": site.base_url,
+                "search_url_template": site.search_url_template
+            })
+
+        os.makedirs(os.path.join(FIXTURES_DIR, slug), exist_ok=True)
+        for query in queries:
+            url = site.get_search_url(query)
+            try:
+                response = session.get(url, timeout=10)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"Error recording {url}: {e}")
+                continue
+
+            path = f"{slug}/search_{slugify(query)}.html"
+            with open(os.path.join(FIXTURES_DIR, path), "wb") as f:
+                f.write(response.content)
+
+            manifest["pages"] = [
+                page for page in manifest["pages"]
+                if not (page["site"] == slug and page["kind"] == "search" and page.get("query") == query)
+            ]
+            manifest["pages"].append({"site": slug, "kind": "search", "query": query,
+                                      "path": path, "source": "recorded", "url": url})
+            print(f"Recorded {url} -> {path} ({len(response.content)} bytes)")
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Offline benchmark suite for the scraper, skill analyzer, filtering and exports.
+
+Replays the pages in fixtures/ through a local stand-in server, so no live
+job board is contacted. Results are written as JSON and can be compared
+across commits with compare_results.py.
+
+    python scarp/benchmarks/run_benchmarks.py --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Dict, Callable
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bs4 import BeautifulSoup
+
+from config_manager import ConfigManager
+from data_models import JobListing, JobSite, ScrapingConfig, SkillCategory
+from skill_analyzer import SkillAnalyzer
+from fixture_server import FixtureServer, FixtureSet
+
+
+class BenchmarkResults:
+    """Collects metrics as name -> value, unit and which direction is better"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict] = {}
+
+    def add(self, name: str, value: float, unit: str, better: str = "lower"):
+        self.metrics[name] = {"value": round(value, 6), "unit": unit, "better": better}
+        print(f"  {name:<45} {value:>14.4f} {unit}")
+
+
+def time_runs(func: Callable, repeats: int) -> List[float]:
+    """Wall-clock seconds for each of ``repeats`` calls"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def default_skill_categories() -> List[SkillCategory]:
+    # Use the built-in defaults rather than the user's config.json
+    config_data = ConfigManager()._get_default_config()
+    return [SkillCategory(**cat) for cat in config_data["skill_categories"]]
+
+
+def make_config(server: FixtureServer) -> ScrapingConfig:
+    sites = [
+        JobSite(name=site["name"], **server.site_urls(site["slug"]))
+        for site in server.fixtures.sites
+    ]
+    return ScrapingConfig(
+        job_sites=sites,
+        search_queries=server.fixtures.queries,
+        skill_categories=default_skill_categories(),
+        delay_between_requests=0.0
+    )
+
+
+def bench_scrape(results: BenchmarkResults, server: FixtureServer, rounds: int) -> List[JobListing]:
+    """Pages per second through the real fetch, parse and extract path"""
+    from scraper import JobScraper
+
+    config = make_config(server)
+    scraper = JobScraper(config)
+    jobs = []
+    pages = 0
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for site in config.job_sites:
+            for query in config.search_queries:
+                jobs.extend(scraper._scrape_site(site, query))
+                pages += 1
+    elapsed = time.perf_counter() - start
+
+    results.add("scrape.pages_per_sec", pages / elapsed, "pages/s", "higher")
+    results.add("scrape.jobs_per_sec", len(jobs) / elapsed, "jobs/s", "higher")
+    results.add("scrape.jobs_per_page", len(jobs) / pages, "jobs", "higher")
+    return jobs[:len(jobs) // rounds]
+
+
+def bench_parse(results: BenchmarkResults, fixtures: FixtureSet, repeats: int):
+    """Document parse time and per-element extraction time"""
+    import re
+    from scraper import JobScraper
+
+    scraper = JobScraper(ScrapingConfig(job_sites=[], search_queries=[], skill_categories=[]))
+    pages = [fixtures.read(path) for path in fixtures.search_pages.values()]
+    sites = {site["slug"]: JobSite(name=site["name"], base_url=site["base_url"],
+                                   search_url_template=site["search_url_template"])
+             for site in fixtures.sites}
+    page_sites = [sites[site] for site, _ in fixtures.search_pages]
+
+    parse_times = time_runs(lambda: [BeautifulSoup(page, "html.parser") for page in pages], repeats)
+    results.add("parse.document_ms", statistics.median(parse_times) / len(pages) * 1000, "ms/page")
+    results.add("parse.bytes_per_sec", sum(map(len, pages)) / statistics.median(parse_times), "B/s", "higher")
+
+    soups = [BeautifulSoup(page, "html.parser") for page in pages]
+    pattern = re.compile(r'job|listing|item|card')
+    find_times = time_runs(lambda: [soup.find_all(['div', 'article', 'li'], class_=pattern) for soup in soups], repeats)
+    results.add("parse.find_elements_ms", statistics.median(find_times) / len(soups) * 1000, "ms/page")
+
+    elements = [(element, site) for soup, site in zip(soups, page_sites)
+                for element in soup.find_all(['div', 'article', 'li'], class_=pattern)]
+    extract_times = time_runs(lambda: [scraper._extract_job_info(element, site) for element, site in elements], repeats)
+    results.add("parse.extract_us_per_element", statistics.median(extract_times) / len(elements) * 1e6, "us/element")
+
+
+def bench_analyze(results: BenchmarkResults, jobs: List[JobListing], repeats: int):
+    """analyze_job throughput as the vocabulary grows"""
+    base = default_skill_categories()
+    base_size = sum(len(cat.skills) for cat in base)
+
+    for size in (base_size, 250, 1000):
+        categories = [SkillCategory(cat.name, list(cat.skills), cat.color, dict(cat.aliases)) for cat in base]
+        for index in range(size - base_size):
+            categories[index % len(categories)].skills.append(f"Skill{index}x")
+
+        build_times = time_runs(lambda: SkillAnalyzer(categories), repeats)
+        analyzer = SkillAnalyzer(categories)
+        analyze_times = time_runs(lambda: [analyzer.analyze_job(job) for job in jobs], repeats)
+
+        results.add(f"analyze.build_ms.vocab_{size}", statistics.median(build_times) * 1000, "ms")
+        results.add(f"analyze.jobs_per_sec.vocab_{size}", len(jobs) / statistics.median(analyze_times),
+                    "jobs/s", "higher")
+
+
+def bench_filter(results: BenchmarkResults, jobs: List[JobListing], repeats: int, target: int = 2000):
+    """Latency of the Job Listings search box and source filter"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = MainWindow()
+
+    history = [jobs[index % len(jobs)] for index in range(target)]
+    window.jobs[:] = history
+    window.filtered_jobs = window.jobs
+
+    def run_filter(text: str):
+        window.search_input.blockSignals(True)
+        window.search_input.setText(text)
+        window.search_input.blockSignals(False)
+        window.filter_jobs()
+
+    text_times = time_runs(lambda: run_filter("python"), repeats)
+    clear_times = time_runs(lambda: run_filter(""), repeats)
+    results.add(f"filter.search_ms.jobs_{target}", statistics.median(text_times) * 1000, "ms")
+    results.add(f"filter.clear_ms.jobs_{target}", statistics.median(clear_times) * 1000, "ms")
+
+    window.close()
+    app.processEvents()
+
+
+def bench_export(results: BenchmarkResults, jobs: List[JobListing], skill_stats: Dict, repeats: int):
+    """CSV and Word export time"""
+    from export_manager import ExportManager
+
+    manager = ExportManager()
+    csv_times = time_runs(lambda: manager.export_to_csv(jobs, skill_stats), repeats)
+    word_times = time_runs(lambda: manager.export_to_word(jobs, skill_stats), max(1, repeats // 2))
+    results.add(f"export.csv_ms.jobs_{len(jobs)}", statistics.median(csv_times) * 1000, "ms")
+    results.add(f"export.word_ms.jobs_{len(jobs)}", statistics.median(word_times) * 1000, "ms")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--output", "-o", help="JSON results file (default: results/<commit>.json)")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetitions per timed step")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over every site and query when scraping")
+    parser.add_argument("--skip", nargs="*", default=[],
+                        choices=["scrape", "parse", "analyze", "filter", "export"],
+                        help="Benchmarks to leave out")
+    args = parser.parse_args()
+
+    fixtures = FixtureSet()
+    results = BenchmarkResults()
+    work_dir = tempfile.mkdtemp(prefix="devkh-bench-")
+    cwd = os.getcwd()
+
+    with FixtureServer(fixtures) as server:
+        # Exports and any stores created by the app go to a scratch directory
+        os.chdir(work_dir)
+        try:
+            print("Scraping fixture pages")
+            if "scrape" in args.skip:
+                jobs = []
+            else:
+                jobs = bench_scrape(results, server, args.rounds)
+
+            if "parse" not in args.skip:
+                print("Parsing")
+                bench_parse(results, fixtures, args.repeats)
+
+            if not jobs:
+                from scraper import JobScraper
+                scraper = JobScraper(make_config(server))
+                jobs = [job for site in scraper.config.job_sites
+                        for query in scraper.config.search_queries
+                        for job in scraper._scrape_site(site, query)]
+
+            if "analyze" not in args.skip:
+                print("Analyzing")
+                bench_analyze(results, jobs, args.repeats)
+
+            analyzer = SkillAnalyzer(default_skill_categories())
+            skill_stats = analyzer.get_skill_statistics(jobs)
+
+            if "filter" not in args.skip:
+                print("Filtering")
+                bench_filter(results, jobs, args.repeats)
+
+            if "export" not in args.skip:
+                print("Exporting")
+                bench_export(results, jobs, skill_stats, args.repeats)
+        finally:
+            os.chdir(cwd)
+
+    commit = git_commit()
+    output = args.output or os.path.join(BENCH_DIR, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeats": args.repeats,
+                "rounds": args.rounds,
+                "fixture_pages": len(fixtures.manifest["pages"])
+            },
+            "metrics": results.metrics
+        }, f, indent=2)
+
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Matplotlib chart canvases for the analysis tabs.
+
+Importing this module pulls in matplotlib, so the main window only imports
+it when a chart tab is first opened.
+"""
+
+import math
+from typing import Dict, Optional
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+
+class SkillChartCanvas(FigureCanvas):
+    """Top skills and category breakdown charts for the Skill Analysis tab.
+
+    The axes and their artists are created once and updated in place. The
+    pie is only rebuilt when the set of categories changes, the layout is
+    only recomputed when tick labels change, and drawing goes through
+    ``draw_idle`` so several updates in one event loop pass cost one draw.
+    """
+
+    TOP_SKILLS = 10
+
+    def __init__(self, parent=None):
+        self.figure = Figure(figsize=(10, 8))
+        super().__init__(self.figure)
+        self.setParent(parent)
+
+        self.ax_skills = self.figure.add_subplot(2, 2, 1)
+        self.ax_pie = self.figure.add_subplot(2, 2, 2)
+        self.ax_categories = self.figure.add_subplot(2, 1, 2)
+
+        self.skill_bars = self.ax_skills.barh(range(self.TOP_SKILLS), [0] * self.TOP_SKILLS, color='#3498db')
+        self.ax_skills.set_yticks(range(self.TOP_SKILLS))
+        self.ax_skills.set_yticklabels([""] * self.TOP_SKILLS)
+        self.ax_skills.set_xlabel('Frequency')
+        self.ax_skills.set_title('Top 10 Most Demanded Skills')
+        self.ax_skills.invert_yaxis()
+
+        self.ax_pie.set_title('Skills Distribution by Category')
+        self.ax_pie.set_aspect('equal')
+        self.ax_pie.set_axis_off()
+
+        self.ax_categories.set_xlabel('Skill Categories')
+        self.ax_categories.set_ylabel('Total Mentions')
+        self.ax_categories.set_title('Skill Demand by Category')
+
+        self._skill_labels = ()
+        self._categories = ()
+        self._wedges = []
+        self._wedge_labels = []
+        self._wedge_percents = []
+        self._category_bars = []
+        self._category_texts = []
+
+        self.figure.tight_layout()
+
+    def update_charts(self, skill_stats: Dict):
+        if not skill_stats or 'category_breakdown' not in skill_stats:
+            return
+
+        relayout = self._update_top_skills(skill_stats.get('most_demanded_skills', [])[:self.TOP_SKILLS])
+
+        # One pass over the breakdown feeds both category charts
+        categories, totals, colors = [], [], []
+        for cat_name, cat_data in skill_stats['category_breakdown'].items():
+            if cat_data['total_mentions'] > 0:
+                categories.append(cat_name)
+                totals.append(cat_data['total_mentions'])
+                colors.append(cat_data['color'])
+
+        if tuple(categories) != self._categories:
+            self._rebuild_categories(categories, colors)
+            relayout = True
+        self._update_categories(totals, colors)
+
+        if relayout:
+            self.figure.tight_layout()
+        self.draw_idle()
+
+    def _update_top_skills(self, top_skills) -> bool:
+        labels = tuple(skill for skill, _ in top_skills) + ("",) * (self.TOP_SKILLS - len(top_skills))
+        counts = [count for _, count in top_skills]
+
+        for index, bar in enumerate(self.skill_bars):
+            bar.set_width(counts[index] if index < len(counts) else 0)
+        self.ax_skills.set_xlim(0, max(counts, default=1) * 1.1)
+
+        if labels == self._skill_labels:
+            return False
+        self._skill_labels = labels
+        self.ax_skills.set_yticklabels(labels)
+        return True
+
+    def _rebuild_categories(self, categories, colors):
+        """Create the pie wedges and category bars for a new set of categories"""
+        self._categories = tuple(categories)
+
+        for artist in self._wedges + self._wedge_labels + self._wedge_percents + self._category_texts:
+            artist.remove()
+        for bar in self._category_bars:
+            bar.remove()
+
+        self._wedges, self._wedge_labels, self._wedge_percents = [], [], []
+        self._category_bars, self._category_texts = [], []
+        if not categories:
+            return
+
+        wedges, labels, percents = self.ax_pie.pie([1] * len(categories), labels=categories,
+                                                   colors=colors, autopct='%1.1f%%')
+        self._wedges, self._wedge_labels, self._wedge_percents = list(wedges), list(labels), list(percents)
+        self.ax_pie.set_axis_off()
+
+        # Numeric positions keep the axis free of stale categorical units
+        positions = range(len(categories))
+        self._category_bars = list(self.ax_categories.bar(positions, [0] * len(categories), color=colors))
+        self._category_texts = [
+            self.ax_categories.text(bar.get_x() + bar.get_width()/2., 0, "", ha='center', va='bottom')
+            for bar in self._category_bars
+        ]
+        self.ax_categories.set_xticks(positions)
+        self.ax_categories.set_xticklabels(categories, rotation=45)
+        self.ax_categories.set_xlim(-0.5, len(categories) - 0.5)
+
+    def _update_categories(self, totals, colors):
+        if not totals:
+            return
+
+        total = float(sum(totals))
+        theta = 0.0
+        for wedge, label, percent, value, color in zip(self._wedges, self._wedge_labels,
+                                                       self._wedge_percents, totals, colors):
+            span = 360.0 * value / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + span)
+            wedge.set_facecolor(color)
+
+            middle = math.radians(theta + span / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x >= 0 else 'right')
+            percent.set_position((0.6 * x, 0.6 * y))
+            percent.set_text(f"{100.0 * value / total:.1f}%")
+            theta += span
+
+        for bar, text, value, color in zip(self._category_bars, self._category_texts, totals, colors):
+            bar.set_height(value)
+            bar.set_facecolor(color)
+            text.set_position((bar.get_x() + bar.get_width()/2., value + 0.5))
+            text.set_text(str(value))
+        self.ax_categories.set_ylim(0, max(totals) * 1.15)
+
+
+class TrendChartCanvas(FigureCanvas):
+    """Skill and category demand over time for the Demand Trends tab"""
+
+    def __init__(self, parent=None):
+        self.figure = Figure(figsize=(10, 8))
+        super().__init__(self.figure)
+        self.setParent(parent)
+
+    def update_charts(self, skill_trends: Dict, category_trends: Dict,
+                      category_colors: Optional[Dict[str, str]] = None, normalize: bool = False):
+        self.figure.clear()
+        ax1 = self.figure.add_subplot(2, 1, 1)
+        ax2 = self.figure.add_subplot(2, 1, 2)
+
+        periods = skill_trends['periods']
+        if not periods:
+            ax1.text(0.5, 0.5, "No stored scraping sessions yet", ha='center', va='center',
+                     transform=ax1.transAxes)
+            ax1.set_axis_off()
+            ax2.set_axis_off()
+            self.draw_idle()
+            return
+
+        for skill, values in skill_trends['series'].items():
+            ax1.plot(periods, values, marker='o', label=skill)
+        ax1.set_title('Top Skill Demand Over Time')
+        ax1.set_ylabel('Share of Jobs' if normalize else 'Jobs Mentioning Skill')
+        if skill_trends['series']:
+            ax1.legend(loc='upper left', fontsize='small', ncol=2)
+
+        colors = category_colors or {}
+        for category, values in category_trends['series'].items():
+            ax2.plot(category_trends['periods'], values, marker='o', label=category,
+                     color=colors.get(category))
+        ax2.set_title('Category Demand Over Time')
+        ax2.set_ylabel('Total Mentions')
+        if category_trends['series']:
+            ax2.legend(loc='upper left', fontsize='small', ncol=2)
+
+        for ax in (ax1, ax2):
+            ax.tick_params(axis='x', rotation=45)
+
+        self.figure.tight_layout()
+        self.draw_idle()
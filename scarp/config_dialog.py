@@ -6,7 +6,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
-from typing import List
 from data_models import JobSite, SkillCategory, ScrapingConfig
 
 class ConfigDialog(QDialog):
@@ -94,6 +93,10 @@ class ConfigDialog(QDialog):
         self.site_search_edit.setReadOnly(True)
         right_layout.addRow("Search Template:", self.site_search_edit)
         
+        self.site_discovery_edit = QLineEdit()
+        self.site_discovery_edit.setReadOnly(True)
+        right_layout.addRow("Sitemap/Feed:", self.site_discovery_edit)
+        
         layout.addWidget(right_panel)
         
         return widget
@@ -175,6 +178,10 @@ class ConfigDialog(QDialog):
         remove_skill_btn.clicked.connect(self.remove_skill)
         skill_buttons.addWidget(remove_skill_btn)
         
+        aliases_btn = QPushButton("Edit Aliases")
+        aliases_btn.clicked.connect(self.edit_skill_aliases)
+        skill_buttons.addWidget(aliases_btn)
+        
         right_layout.addLayout(skill_buttons)
         layout.addWidget(right_panel)
         
@@ -200,6 +207,19 @@ class ConfigDialog(QDialog):
         self.selenium_check = QCheckBox("Use Selenium for JavaScript-heavy sites")
         settings_layout.addRow(self.selenium_check)
         
+        self.duplicates_check = QCheckBox("Collapse near-duplicate postings across sites")
+        settings_layout.addRow(self.duplicates_check)
+        
+        self.duplicate_threshold_spin = QDoubleSpinBox()
+        self.duplicate_threshold_spin.setRange(0.5, 1.0)
+        self.duplicate_threshold_spin.setSingleStep(0.05)
+        self.duplicate_threshold_spin.setToolTip("Estimated similarity at which two postings count as the same job")
+        self.duplicates_check.toggled.connect(self.duplicate_threshold_spin.setEnabled)
+        settings_layout.addRow("Duplicate similarity threshold:", self.duplicate_threshold_spin)
+        
+        self.archive_check = QCheckBox("Archive raw responses for offline replay")
+        settings_layout.addRow(self.archive_check)
+        
         layout.addWidget(settings_group)
         layout.addStretch()
         
@@ -226,6 +246,10 @@ class ConfigDialog(QDialog):
         self.max_pages_spin.setValue(self.config.max_pages_per_site)
         self.delay_spin.setValue(self.config.delay_between_requests)
         self.selenium_check.setChecked(self.config.use_selenium)
+        self.duplicates_check.setChecked(self.config.detect_duplicates)
+        self.duplicate_threshold_spin.setValue(self.config.duplicate_threshold)
+        self.duplicate_threshold_spin.setEnabled(self.config.detect_duplicates)
+        self.archive_check.setChecked(self.config.archive_responses)
     
     def on_site_item_changed(self, item: QListWidgetItem):
         site = item.data(Qt.ItemDataRole.UserRole)
@@ -235,6 +259,7 @@ class ConfigDialog(QDialog):
             self.site_name_edit.setText(site.name)
             self.site_url_edit.setText(site.base_url)
             self.site_search_edit.setText(site.search_url_template)
+            self.site_discovery_edit.setText(site.discovery_url)
     
     def on_category_selected(self, current: QListWidgetItem, previous: QListWidgetItem):
         self.skills_list.clear()
@@ -242,7 +267,14 @@ class ConfigDialog(QDialog):
             category = current.data(Qt.ItemDataRole.UserRole)
             if category:
                 for skill in category.skills:
-                    self.skills_list.addItem(skill)
+                    self.skills_list.addItem(self._create_skill_item(category, skill))
+    
+    def _create_skill_item(self, category: SkillCategory, skill: str) -> QListWidgetItem:
+        item = QListWidgetItem(skill)
+        aliases = category.aliases.get(skill, [])
+        if aliases:
+            item.setToolTip(f"Also matches: {', '.join(aliases)}")
+        return item
     
     def add_job_site(self):
         name, ok = QInputDialog.getText(self, "Add Job Site", "Site name:")
@@ -260,10 +292,18 @@ class ConfigDialog(QDialog):
         if not ok or not search_template.strip():
             return
         
+        discovery_url, ok = QInputDialog.getText(
+            self, "Add Job Site",
+            "Sitemap or RSS/Atom feed URL (optional, replaces searches):"
+        )
+        if not ok:
+            return
+        
         site = JobSite(
             name=name.strip(),
             base_url=base_url.strip(),
-            search_url_template=search_template.strip()
+            search_url_template=search_template.strip(),
+            discovery_url=discovery_url.strip()
         )
         
         self.config.job_sites.append(site)
@@ -299,15 +339,25 @@ class ConfigDialog(QDialog):
         if not ok:
             return
         
+        discovery_url, ok = QInputDialog.getText(
+            self, "Edit Job Site",
+            "Sitemap or RSS/Atom feed URL (optional):",
+            text=site.discovery_url
+        )
+        if not ok:
+            return
+        
         site.name = name.strip()
         site.base_url = base_url.strip()
         site.search_url_template = search_template.strip()
+        site.discovery_url = discovery_url.strip()
         
         current_item.setText(site.name)
         
         self.site_name_edit.setText(site.name)
         self.site_url_edit.setText(site.base_url)
         self.site_search_edit.setText(site.search_url_template)
+        self.site_discovery_edit.setText(site.discovery_url)
     
     def remove_job_site(self):
         current_item = self.sites_list.currentItem()
@@ -450,6 +500,8 @@ class ConfigDialog(QDialog):
                 index = category.skills.index(old_skill)
                 category.skills[index] = new_skill.strip()
                 current_skill_item.setText(new_skill.strip())
+                if old_skill in category.aliases:
+                    category.aliases[new_skill.strip()] = category.aliases.pop(old_skill)
             except ValueError:
                 pass
     
@@ -468,12 +520,45 @@ class ConfigDialog(QDialog):
         skill = current_skill_item.text()
         if skill in category.skills:
             category.skills.remove(skill)
+        category.aliases.pop(skill, None)
         
         self.skills_list.takeItem(self.skills_list.row(current_skill_item))
     
+    def edit_skill_aliases(self):
+        current_cat_item = self.categories_list.currentItem()
+        current_skill_item = self.skills_list.currentItem()
+        
+        if not current_cat_item or not current_skill_item:
+            QMessageBox.warning(self, "Warning", "Please select a category and skill to edit aliases for.")
+            return
+        
+        category = current_cat_item.data(Qt.ItemDataRole.UserRole)
+        if not category:
+            return
+        
+        skill = current_skill_item.text()
+        aliases_text, ok = QInputDialog.getText(
+            self, "Edit Aliases",
+            f"Other names for {skill} (comma separated):",
+            text=", ".join(category.aliases.get(skill, []))
+        )
+        if not ok:
+            return
+        
+        aliases = [alias.strip() for alias in aliases_text.split(",") if alias.strip()]
+        if aliases:
+            category.aliases[skill] = aliases
+            current_skill_item.setToolTip(f"Also matches: {', '.join(aliases)}")
+        else:
+            category.aliases.pop(skill, None)
+            current_skill_item.setToolTip("")
+    
     def get_config(self) -> ScrapingConfig:
         self.config.max_pages_per_site = self.max_pages_spin.value()
         self.config.delay_between_requests = self.delay_spin.value()
         self.config.use_selenium = self.selenium_check.isChecked()
+        self.config.detect_duplicates = self.duplicates_check.isChecked()
+        self.config.duplicate_threshold = self.duplicate_threshold_spin.value()
+        self.config.archive_responses = self.archive_check.isChecked()
         
         return self.config
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import List, Dict, Any
+from typing import Dict, Any
 from data_models import JobSite, SkillCategory, ScrapingConfig
 
 class ConfigManager:
@@ -57,12 +57,28 @@ class ConfigManager:
                 {
                     "name": "Backend",
                     "skills": ["Java", "Python", "Node.js", "C#", ".NET", "PHP", "Ruby", "Go", "Rust"],
-                    "color": "#e74c3c"
+                    "color": "#e74c3c",
+                    "aliases": {
+                        "Node.js": ["NodeJS", "Node JS"],
+                        "C#": ["CSharp", "C Sharp"],
+                        ".NET": ["ASP.NET", "dotnet", ".NET Core"],
+                        "Ruby": ["Ruby on Rails", "Rails"],
+                        "Go": ["Golang"]
+                    }
                 },
                 {
                     "name": "Frontend",
                     "skills": ["HTML", "CSS", "JavaScript", "React", "Vue.js", "Angular", "TypeScript", "Sass", "Bootstrap"],
-                    "color": "#3498db"
+                    "color": "#3498db",
+                    "aliases": {
+                        "HTML": ["HTML5"],
+                        "CSS": ["CSS3"],
+                        "JavaScript": ["JS", "ES6", "ECMAScript"],
+                        "React": ["ReactJS", "React.js"],
+                        "Vue.js": ["Vue", "VueJS"],
+                        "Angular": ["AngularJS"],
+                        "Sass": ["SCSS"]
+                    }
                 },
                 {
                     "name": "Mobile",
@@ -72,23 +88,51 @@ class ConfigManager:
                 {
                     "name": "Database",
                     "skills": ["MySQL", "PostgreSQL", "MongoDB", "Redis", "SQLite", "Oracle", "SQL Server"],
-                    "color": "#f39c12"
+                    "color": "#f39c12",
+                    "aliases": {
+                        "PostgreSQL": ["Postgres", "psql"],
+                        "MongoDB": ["Mongo"],
+                        "SQL Server": ["MSSQL", "MS SQL"]
+                    }
                 },
                 {
                     "name": "DevOps",
                     "skills": ["Docker", "Kubernetes", "AWS", "Azure", "GCP", "Jenkins", "Git", "Linux", "Nginx"],
-                    "color": "#9b59b6"
+                    "color": "#9b59b6",
+                    "aliases": {
+                        "Kubernetes": ["k8s"],
+                        "AWS": ["Amazon Web Services"],
+                        "GCP": ["Google Cloud"],
+                        "Git": ["GitHub", "GitLab"]
+                    }
                 },
                 {
                     "name": "Other",
                     "skills": ["C++", "Agile", "Scrum", "REST API", "GraphQL", "Microservices", "TDD", "CI/CD"],
-                    "color": "#34495e"
+                    "color": "#34495e",
+                    "aliases": {
+                        "C++": ["CPP"],
+                        "REST API": ["RESTful", "REST APIs"],
+                        "Microservices": ["Microservice"]
+                    }
                 }
             ],
             "scraping_settings": {
                 "max_pages_per_site": 5,
                 "delay_between_requests": 1.0,
-                "use_selenium": False
+                "use_selenium": False,
+                "detect_duplicates": True,
+                "duplicate_threshold": 0.8,
+                "metrics_file": "scrape_metrics.json",
+                "archive_responses": False,
+                "archive_dir": "archives",
+                "schedule": "0 */6 * * *",
+                "scheduler_workers": 4,
+                "discovery_fetch_limit": 50,
+                "circuit_failure_threshold": 3,
+                "circuit_cooldown": 1800.0,
+                "max_response_bytes": 4 * 1024 * 1024,
+                "robots_cache_ttl": 86400.0
             }
         }
     
@@ -117,7 +161,19 @@ class ConfigManager:
             skill_categories=skill_categories,
             max_pages_per_site=scraping_settings.get("max_pages_per_site", 5),
             delay_between_requests=scraping_settings.get("delay_between_requests", 1.0),
-            use_selenium=scraping_settings.get("use_selenium", False)
+            use_selenium=scraping_settings.get("use_selenium", False),
+            detect_duplicates=scraping_settings.get("detect_duplicates", True),
+            duplicate_threshold=scraping_settings.get("duplicate_threshold", 0.8),
+            metrics_file=scraping_settings.get("metrics_file", "scrape_metrics.json"),
+            archive_responses=scraping_settings.get("archive_responses", False),
+            archive_dir=scraping_settings.get("archive_dir", "archives"),
+            schedule=scraping_settings.get("schedule", "0 */6 * * *"),
+            scheduler_workers=scraping_settings.get("scheduler_workers", 4),
+            discovery_fetch_limit=scraping_settings.get("discovery_fetch_limit", 50),
+            circuit_failure_threshold=scraping_settings.get("circuit_failure_threshold", 3),
+            circuit_cooldown=scraping_settings.get("circuit_cooldown", 1800.0),
+            max_response_bytes=scraping_settings.get("max_response_bytes", 4 * 1024 * 1024),
+            robots_cache_ttl=scraping_settings.get("robots_cache_ttl", 86400.0)
         )
     
     def save_config(self, config_data: Dict[str, Any]):
@@ -136,7 +192,11 @@ class ConfigManager:
                     "name": site.name,
                     "base_url": site.base_url,
                     "search_url_template": site.search_url_template,
-                    "is_active": site.is_active
+                    "is_active": site.is_active,
+                    "discovery_url": site.discovery_url,
+                    "crawl_delay": site.crawl_delay,
+                    "max_concurrency": site.max_concurrency,
+                    "respect_robots": site.respect_robots
                 }
                 for site in config.job_sites
             ],
@@ -145,14 +205,31 @@ class ConfigManager:
                 {
                     "name": cat.name,
                     "skills": cat.skills,
-                    "color": cat.color
+                    "color": cat.color,
+                    "aliases": {
+                        skill: aliases
+                        for skill, aliases in cat.aliases.items()
+                        if skill in cat.skills and aliases
+                    }
                 }
                 for cat in config.skill_categories
             ],
             "scraping_settings": {
                 "max_pages_per_site": config.max_pages_per_site,
                 "delay_between_requests": config.delay_between_requests,
-                "use_selenium": config.use_selenium
+                "use_selenium": config.use_selenium,
+                "detect_duplicates": config.detect_duplicates,
+                "duplicate_threshold": config.duplicate_threshold,
+                "metrics_file": config.metrics_file,
+                "archive_responses": config.archive_responses,
+                "archive_dir": config.archive_dir,
+                "schedule": config.schedule,
+                "scheduler_workers": config.scheduler_workers,
+                "discovery_fetch_limit": config.discovery_fetch_limit,
+                "circuit_failure_threshold": config.circuit_failure_threshold,
+                "circuit_cooldown": config.circuit_cooldown,
+                "max_response_bytes": config.max_response_bytes,
+                "robots_cache_ttl": config.robots_cache_ttl
             }
         }
         self.save_config(config_data)
@@ -0,0 +1,174 @@
+"""
+WARC-style archives of raw scraper responses, for replaying past crawls.
+
+A run is archived under ``<archive_dir>/<run_id>/`` as gzip segments plus a
+JSON-lines index. Each record is its own gzip member holding a WARC/1.0
+``response`` record (WARC headers, then the HTTP status line, headers and
+body), so standard WARC tools can read the segments and a single record can
+be decompressed on its own from its offset and length in the index.
+"""
+
+import gzip
+import json
+import os
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from data_models import JobSite
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+
+class CrawlArchiveWriter:
+    """Appends responses from one scrape run to compressed segments"""
+
+    def __init__(self, archive_dir: str = "archives", run_id: Optional[str] = None,
+                 segment_size: int = SEGMENT_SIZE):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(archive_dir, self.run_id)
+        self.segment_size = segment_size
+        os.makedirs(self.path, exist_ok=True)
+
+        self._segment_number = -1
+        self._segment = None
+        self._index = open(os.path.join(self.path, INDEX_FILE), "a", encoding="utf-8")
+        self.record_count = 0
+
+    def _segment_name(self) -> str:
+        return f"segment-{self._segment_number:05d}.warc.gz"
+
+    def _open_segment(self):
+        if self._segment:
+            self._segment.close()
+        self._segment_number += 1
+        self._segment = open(os.path.join(self.path, self._segment_name()), "ab")
+
+    def write_response(self, site: JobSite, query: str, url: str, status: int,
+                       headers: Dict[str, str], body: bytes, truncated: bool = False):
+        """Archive one HTTP response together with the site and query it answered.
+
+        ``truncated`` marks a body cut short at the scraper's size cap.
+        """
+        if self._segment is None or self._segment.tell() >= self.segment_size:
+            self._open_segment()
+
+        http_block = (
+            f"HTTP/1.1 {status}\r\n"
+            + "".join(f"{name}: {value}\r\n" for name, value in headers.items()
+                      if name.lower() not in ("content-encoding", "transfer-encoding", "content-length"))
+            + f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("utf-8") + body
+
+        record_date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        warc_headers = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {record_date}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_block)}\r\n\r\n"
+        ).encode("utf-8")
+
+        member = gzip.compress(warc_headers + http_block + b"\r\n\r\n")
+        offset = self._segment.tell()
+        self._segment.write(member)
+
+        self._index.write(json.dumps({
+            "url": url,
+            "site": site.name,
+            "base_url": site.base_url,
+            "search_url_template": site.search_url_template,
+            "discovery_url": site.discovery_url,
+            "query": query,
+            "status": status,
+            "date": record_date,
+            "segment": self._segment_name(),
+            "offset": offset,
+            "length": len(member),
+            "truncated": truncated
+        }, ensure_ascii=False) + "\n")
+        self.record_count += 1
+
+    def close(self):
+        if self._segment:
+            self._segment.close()
+            self._segment = None
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CrawlArchiveReader:
+    """Reads back the responses of one archived run"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index: List[Dict] = [json.loads(line) for line in f if line.strip()]
+        # The last record for a URL wins if a run fetched it twice
+        self._by_url = {entry["url"]: entry for entry in self.index}
+
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __contains__(self, url: str) -> bool:
+        return url in self._by_url
+
+    def pages(self) -> List[Tuple[JobSite, str]]:
+        """The (site, query) pairs of the run in the order they were fetched"""
+        seen, pages = set(), []
+        for entry in self.index:
+            key = (entry["site"], entry["query"])
+            if key not in seen:
+                seen.add(key)
+                pages.append((JobSite(name=entry["site"], base_url=entry["base_url"],
+                                      search_url_template=entry["search_url_template"],
+                                      discovery_url=entry.get("discovery_url", "")), entry["query"]))
+        return pages
+
+    def _read_record(self, entry: Dict) -> bytes:
+        with open(os.path.join(self.path, entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        return zlib.decompress(member, 16 + zlib.MAX_WBITS)
+
+    def read(self, entry: Dict) -> Tuple[int, Dict[str, str], bytes]:
+        """Status, headers and body of an index entry"""
+        record = self._read_record(entry)
+        _, _, http_block = record.partition(b"\r\n\r\n")
+        head, _, body = http_block.partition(b"\r\n\r\n")
+        lines = head.decode("utf-8", errors="replace").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+        length = int(headers.get("Content-Length", len(body)))
+        return entry["status"], headers, body[:length]
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Archived body for a URL, or None if the run never fetched it"""
+        entry = self._by_url.get(url)
+        if entry is None:
+            return None
+        if entry.get("truncated"):
+            print(f"Warning: the archived response for {url} was cut off at the size cap; "
+                  f"listings past that point are missing from the replay")
+        return self.read(entry)[2]
+
+    def __iter__(self) -> Iterator[Tuple[Dict, bytes]]:
+        for entry in self.index:
+            yield entry, self.read(entry)[2]
+
+
+def list_archives(archive_dir: str = "archives") -> List[str]:
+    """Archived run directories, oldest first"""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(
+        os.path.join(archive_dir, name) for name in os.listdir(archive_dir)
+        if os.path.isfile(os.path.join(archive_dir, name, INDEX_FILE))
+    )
@@ -0,0 +1,272 @@
+"""
+robots.txt rules and per-site crawl policy, with robots.txt cached in the job store.
+
+Each origin's robots.txt is fetched once per ``robots_cache_ttl`` and kept
+in the store, so later runs (and the workers of a sharded run) reuse it
+instead of asking again. Rules are matched as RFC 9309 describes: the
+group for our product token, else the ``*`` group; the longest matching
+Allow or Disallow pattern wins, Allow on a tie; ``*`` and a trailing ``$``
+are understood. A robots.txt that does not exist (4xx) allows everything;
+one that cannot be fetched (5xx, 429, network errors) disallows everything
+until it can, unless an earlier copy is cached.
+
+A site's politeness combines the config and robots.txt: its delay is its
+own ``crawl_delay`` (or the global ``delay_between_requests``), raised to
+the Crawl-delay of the host just fetched from; its ``max_concurrency``
+pages may be in flight at once, unless the host serving its listing pages
+sets a Crawl-delay, in which case they go one at a time. Every request,
+robots.txt included, sends USER_AGENT, which carries our product token.
+"""
+
+import re
+import time
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from data_models import JobSite, ScrapingConfig
+from job_store import JobStore
+
+# Our product token in robots.txt user-agent lines
+ROBOTS_AGENT = "scarp"
+
+# Sent with every request, so sites can tell us apart and address us in robots.txt
+USER_AGENT = f"Mozilla/5.0 (compatible; {ROBOTS_AGENT}/1.0)"
+
+# Seconds before an unreachable robots.txt is asked for again
+ROBOTS_RETRY_SECONDS = 600.0
+
+# RFC 9309 asks crawlers to parse at least this much of a robots.txt
+ROBOTS_MAX_BYTES = 500 * 1024
+
+# A larger Crawl-delay is treated as this, so one host cannot stall a run for hours
+MAX_CRAWL_DELAY = 60.0
+
+
+class CrawlDisallowed(IOError):
+    """A page was not fetched because its host's robots.txt does not allow it"""
+
+
+def origin(url: str) -> str:
+    """scheme://host[:port] of a URL; robots.txt applies per origin"""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def listing_url(site: JobSite) -> str:
+    """A URL on the host serving the site's search results or feed, which may not be its base_url's"""
+    return site.discovery_url or site.search_url_template
+
+
+def _compile(pattern: str) -> Pattern:
+    anchored = pattern.endswith("$")
+    if anchored:
+        pattern = pattern[:-1]
+    regex = ".*".join(re.escape(part) for part in pattern.split("*"))
+    return re.compile(regex + ("$" if anchored else ""))
+
+
+class RobotsRules:
+    """The Allow/Disallow rules and Crawl-delay that apply to us on one origin"""
+
+    __slots__ = ('rules', 'crawl_delay', 'reachable')
+
+    def __init__(self, rules: List[Tuple[int, bool, Pattern]] = (), crawl_delay: Optional[float] = None,
+                 reachable: bool = True):
+        # (pattern length, allow, compiled pattern)
+        self.rules = list(rules)
+        self.crawl_delay = crawl_delay
+        # False if robots.txt could not be fetched, in which case nothing is allowed
+        self.reachable = reachable
+
+    @classmethod
+    def parse(cls, text: str, agent: str = ROBOTS_AGENT) -> "RobotsRules":
+        # Each group: (user agents, [(allow, pattern)], crawl delay)
+        groups = []
+        agents, rules, delay = [], [], None
+        in_rules = False
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            key, separator, value = line.partition(":")
+            if not separator:
+                continue
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if in_rules:
+                    groups.append((agents, rules, delay))
+                    agents, rules, delay = [], [], None
+                    in_rules = False
+                agents.append(value.lower())
+            elif key in ("allow", "disallow", "crawl-delay") and agents:
+                in_rules = True
+                if key == "crawl-delay":
+                    try:
+                        delay = float(value)
+                    except ValueError:
+                        pass
+                elif value:
+                    # An empty Disallow allows everything and adds no rule
+                    rules.append((key == "allow", value))
+        if agents:
+            groups.append((agents, rules, delay))
+
+        agent = agent.lower()
+        matching = [group for group in groups if agent in group[0]]
+        if not matching:
+            matching = [group for group in groups if "*" in group[0]]
+        rules = [(len(pattern), allow, _compile(pattern))
+                 for _, group_rules, _ in matching for allow, pattern in group_rules]
+        delays = [delay for _, _, delay in matching if delay is not None and delay >= 0]
+        return cls(rules, max(delays) if delays else None)
+
+    def allows(self, url: str) -> bool:
+        if not self.reachable:
+            return False
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if path == "/robots.txt":
+            return True
+        if parts.query:
+            path += "?" + parts.query
+        best_length, allowed = -1, True
+        for length, allow, pattern in self.rules:
+            if length >= best_length and pattern.match(path):
+                if length > best_length or allow:
+                    best_length, allowed = length, allow
+        return allowed
+
+
+ALLOW_ALL = RobotsRules()
+UNREACHABLE = RobotsRules(reachable=False)
+
+
+def fetch_robots(url: str) -> Tuple[int, bytes]:
+    """(status, body) of a robots.txt; used where no scraper session is at hand"""
+    response = requests.get(url, timeout=10, stream=True, headers={'User-Agent': USER_AGENT})
+    try:
+        body = response.raw.read(ROBOTS_MAX_BYTES, decode_content=True) if response.ok else b""
+    finally:
+        response.close()
+    return response.status_code, body
+
+
+class CrawlPolicies:
+    """robots.txt rules per origin and the resulting delay and concurrency per site.
+
+    ``fetch(url)`` returns the status and body of a robots.txt and raises on
+    network errors. Without a job store robots.txt is cached for the life
+    of this object only.
+    """
+
+    def __init__(self, job_store: Optional[JobStore], config: ScrapingConfig,
+                 fetch: Callable[[str], Tuple[int, bytes]] = fetch_robots):
+        self.config = config
+        self.fetch = fetch
+        self.conn = job_store.conn if job_store is not None else None
+        # Pages from the crawl queue carry only a site's addresses; its settings come from the config
+        self._sites: Dict[str, JobSite] = {site.name: site for site in config.job_sites}
+        # origin -> (rules, expires at)
+        self._rules: Dict[str, Tuple[RobotsRules, float]] = {}
+        if self.conn is not None:
+            self._create_table()
+
+    def _create_table(self):
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS robots_cache (
+                    origin TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    body TEXT,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+
+    def _settings(self, site: JobSite) -> JobSite:
+        return self._sites.get(site.name, site)
+
+    def rules(self, url: str) -> RobotsRules:
+        """The rules for a URL's origin, from the cache or else fetched"""
+        key = origin(url)
+        now = time.time()
+        cached = self._rules.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        row = None
+        if self.conn is not None:
+            row = self.conn.execute(
+                "SELECT status, body, expires_at FROM robots_cache WHERE origin = ?", (key,)
+            ).fetchone()
+        if row is None or row[2] <= now:
+            row = self._refresh(key, row, now)
+        status, body, expires_at = row
+
+        if 200 <= status < 300:
+            rules = RobotsRules.parse(body or "")
+        elif 400 <= status < 500 and status != 429:
+            rules = ALLOW_ALL
+        else:
+            rules = UNREACHABLE
+        self._rules[key] = (rules, expires_at)
+        return rules
+
+    def _refresh(self, key: str, stale: Optional[tuple], now: float) -> tuple:
+        """Fetch an origin's robots.txt and cache it; a stale copy stands in while it is unreachable"""
+        try:
+            status, body = self.fetch(f"{key}/robots.txt")
+        except Exception as e:
+            print(f"Error fetching {key}/robots.txt: {e}")
+            status, body = 0, b""
+
+        if status == 429 or not 200 <= status < 500:
+            if stale is not None and stale[0] and stale[0] < 500 and stale[0] != 429:
+                status, body = stale[0], stale[1]
+            else:
+                body = None
+            expires_at = now + ROBOTS_RETRY_SECONDS
+        else:
+            body = body.decode("utf-8", errors="replace") if 200 <= status < 300 else None
+            expires_at = now + self.config.robots_cache_ttl
+
+        if self.conn is not None:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO robots_cache (origin, status, body, fetched_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, status, body, now, expires_at)
+                )
+        return status, body, expires_at
+
+    def allows(self, site: JobSite, url: str) -> bool:
+        if not self._settings(site).respect_robots:
+            return True
+        return self.rules(url).allows(url)
+
+    def robots_delay(self, site: JobSite, url: Optional[str] = None) -> Optional[float]:
+        """The Crawl-delay of the host serving ``url`` (by default the site's listing pages),
+        capped at MAX_CRAWL_DELAY; None if it sets none"""
+        if not self._settings(site).respect_robots:
+            return None
+        delay = self.rules(url or listing_url(site)).crawl_delay
+        return min(delay, MAX_CRAWL_DELAY) if delay is not None else None
+
+    def delay(self, site: JobSite, url: Optional[str] = None) -> float:
+        """Seconds to wait after a request for ``url`` (by default one of the site's listing pages)"""
+        settings = self._settings(site)
+        delay = settings.crawl_delay if settings.crawl_delay is not None else self.config.delay_between_requests
+        robots_delay = self.robots_delay(site, url)
+        return max(delay, robots_delay) if robots_delay is not None else delay
+
+    def concurrency(self, site: JobSite) -> int:
+        """Listing pages of the site that may be in flight at once"""
+        if self.robots_delay(site) is not None:
+            return 1
+        return max(1, self._settings(site).max_concurrency)
+
+    def site_limits(self) -> Dict[str, int]:
+        """concurrency() of every active site, fetching any robots.txt not cached yet"""
+        return {site.name: self.concurrency(site) for site in self.config.job_sites if site.is_active}
+
+    def site_delays(self) -> Dict[str, float]:
+        return {site.name: self.delay(site) for site in self.config.job_sites if site.is_active}
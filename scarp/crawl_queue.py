@@ -0,0 +1,441 @@
+"""
+Persistent (site, query, page) work queue for unattended scraping runs
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from data_models import JobListing, JobSite, ScrapingConfig
+from job_store import JobStore
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+LEASE_SECONDS = 120.0
+
+# Attempts an item gets, counting claims whose lease ran out
+MAX_ATTEMPTS = 3
+
+# A failed item waits this long before its second attempt, doubling for each further one up to the max
+RETRY_BACKOFF = 30.0
+RETRY_BACKOFF_MAX = 900.0
+
+_RENEW_SQL = "UPDATE crawl_queue SET lease_expires = ? WHERE id = ? AND status = ? AND lease_token = ?"
+
+
+def build_work_items(config: ScrapingConfig) -> List[Tuple[JobSite, str, int]]:
+    """One item per active site, query and result page.
+
+    Sites whose search template has no ``{page}`` placeholder only get
+    their first page, and discovery sites get a single item with an empty
+    query, as one pass over their feed covers every query.
+    """
+    items = []
+    for site in config.job_sites:
+        if not site.is_active:
+            continue
+        if site.uses_discovery:
+            items.append((site, "", 1))
+            continue
+        items.extend(
+            (site, query, page)
+            for query in config.search_queries
+            for page in range(1, (config.max_pages_per_site if site.supports_paging else 1) + 1)
+        )
+    return items
+
+
+def lease_seconds(config: ScrapingConfig, site_delays: Optional[Dict[str, float]] = None) -> float:
+    """Lease long enough for a discovery item, which fetches up to discovery_fetch_limit postings.
+
+    ``site_delays`` has each site's delay after a request if known (see
+    CrawlPolicies.site_delays); otherwise delay_between_requests is assumed.
+    """
+    delays = [(site_delays or {}).get(site.name, config.delay_between_requests)
+              for site in config.job_sites if site.is_active and site.uses_discovery]
+    if not delays:
+        return LEASE_SECONDS
+    return max(LEASE_SECONDS, config.discovery_fetch_limit * (max(delays) + 10))
+
+
+def _job_to_dict(job: JobListing) -> Dict:
+    return {'title': job.title, 'company': job.company, 'location': job.location,
+            'description': job.description, 'url': job.url, 'source_site': job.source_site,
+            'scraped_ts': job.scraped_ts, 'matched_queries': list(job.matched_queries)}
+
+
+def _job_from_dict(data: Dict) -> JobListing:
+    return JobListing(title=data['title'], company=data['company'], location=data['location'],
+                      description=data['description'], url=data['url'], source_site=data['source_site'],
+                      scraped_at=datetime.fromtimestamp(data['scraped_ts']),
+                      matched_queries=data.get('matched_queries', ()))
+
+
+class WorkItem:
+    __slots__ = ('id', 'run_id', 'site', 'query', 'page', 'attempts', 'lease')
+
+    def __init__(self, id: int, run_id: int, site: JobSite, query: str, page: int, attempts: int,
+                 lease: str):
+        self.id = id
+        self.run_id = run_id
+        self.site = site
+        self.query = query
+        self.page = page
+        self.attempts = attempts
+        self.lease = lease
+
+    def __repr__(self):
+        return f"WorkItem({self.site.name!r}, {self.query!r}, page={self.page})"
+
+
+class CrawlQueue:
+    """Crawl runs and their work items, stored next to the jobs.
+
+    Claiming an item takes a time-limited lease on it with a fresh token.
+    Items whose lease ran out (their worker died or hung) can be claimed
+    again, and only the current lease holder can complete an item, so
+    several threads or processes can share one queue without a page being
+    counted twice. Completing an item stores its jobs, or stages them for
+    a coordinator to merge, in the same transaction that marks it done.
+    Workers keep the leases of items in progress alive with a
+    LeaseHeartbeat.
+    """
+
+    def __init__(self, job_store: JobStore):
+        self.job_store = job_store
+        self.conn = job_store.conn
+        # Claims run on their own autocommit connection; see _claim_connection
+        self._claim_conn: Optional[sqlite3.Connection] = None
+        self._create_tables()
+
+    def _claim_connection(self) -> sqlite3.Connection:
+        """Connection in autocommit mode, so claim's BEGIN IMMEDIATE never meets a transaction the driver opened"""
+        if self._claim_conn is None:
+            self._claim_conn = sqlite3.connect(self.job_store.db_path, timeout=30, isolation_level=None)
+        return self._claim_conn
+
+    def close(self):
+        if self._claim_conn is not None:
+            self._claim_conn.close()
+            self._claim_conn = None
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS crawl_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER REFERENCES scraping_sessions (id),
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP,
+                    status TEXT NOT NULL DEFAULT 'running'
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS crawl_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL REFERENCES crawl_runs (id),
+                    site TEXT NOT NULL,
+                    base_url TEXT NOT NULL,
+                    search_url_template TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    page INTEGER NOT NULL DEFAULT 1,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    job_count INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_crawl_queue_run_status ON crawl_queue (run_id, status)"
+            )
+            # Jobs from worker processes, waiting to be deduplicated into the run's session
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS crawl_results (
+                    item_id INTEGER PRIMARY KEY REFERENCES crawl_queue (id),
+                    run_id INTEGER NOT NULL REFERENCES crawl_runs (id),
+                    payload TEXT NOT NULL,
+                    merged INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            self.job_store.add_column_if_missing("crawl_queue", "lease_token", "TEXT")
+            self.job_store.add_column_if_missing("crawl_queue", "lease_expires", "REAL")
+            self.job_store.add_column_if_missing("crawl_queue", "discovery_url", "TEXT NOT NULL DEFAULT ''")
+            # Epoch seconds before which a failed item is not retried
+            self.job_store.add_column_if_missing("crawl_queue", "not_before", "REAL")
+
+    def create_run(self, config: ScrapingConfig) -> int:
+        """Start a run with a fresh session and queue every work item"""
+        items = build_work_items(config)
+        session_id = self.job_store.start_session(
+            [site.name for site in config.job_sites if site.is_active], config.search_queries
+        )
+        now = datetime.now().isoformat(sep=' ')
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO crawl_runs (session_id, started_at, status) VALUES (?, ?, 'running')",
+                (session_id, now)
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO crawl_queue (run_id, site, base_url, search_url_template, discovery_url, query, "
+                "page, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, site.name, site.base_url, site.search_url_template, site.discovery_url, query, page, now)
+                 for site, query, page in items]
+            )
+        return run_id
+
+    def unfinished_run(self) -> Optional[int]:
+        """The oldest run that was interrupted before it finished"""
+        row = self.conn.execute(
+            "SELECT MIN(id) FROM crawl_runs WHERE status = 'running'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def session_id(self, run_id: int) -> int:
+        return self.conn.execute("SELECT session_id FROM crawl_runs WHERE id = ?", (run_id,)).fetchone()[0]
+
+    def requeue_interrupted(self, run_id: int) -> int:
+        """Put items that were in flight when the process stopped back in the queue"""
+        with self.conn:
+            return self.conn.execute(
+                "UPDATE crawl_queue SET status = ?, lease_token = NULL, updated_at = ? "
+                "WHERE run_id = ? AND status = ?",
+                (PENDING, datetime.now().isoformat(sep=' '), run_id, RUNNING)
+            ).rowcount
+
+    def claim(self, run_id: int, lease_seconds: float = LEASE_SECONDS,
+              site_limits: Optional[Dict[str, int]] = None, max_attempts: int = MAX_ATTEMPTS) -> Optional[WorkItem]:
+        """Lease the next claimable item and mark it running.
+
+        Pending items past their retry backoff and running items with an
+        expired lease are claimable, except on sites that already have as
+        many pages in flight under a live lease as ``site_limits`` allows
+        them (one for sites it does not list), which bounds the requests
+        per site at a time across all workers. An item whose lease ran out
+        on its last attempt is failed instead of claimed again.
+        """
+        now = time.time()
+        lease = uuid.uuid4().hex
+        site_limits = site_limits or {}
+        # IMMEDIATE takes the write lock up front, so two workers never pick the same row
+        conn = self._claim_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE crawl_queue SET status = ?, error = ?, lease_token = NULL, updated_at = ? "
+                "WHERE run_id = ? AND status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, "lease expired on the last attempt", datetime.now().isoformat(sep=' '),
+                 run_id, RUNNING, now, max_attempts)
+            )
+            busy = [
+                site for site, running in conn.execute(
+                    "SELECT site, COUNT(*) FROM crawl_queue "
+                    "WHERE run_id = ? AND status = ? AND lease_expires >= ? GROUP BY site",
+                    (run_id, RUNNING, now)
+                )
+                if running >= site_limits.get(site, 1)
+            ]
+            row = conn.execute(
+                "SELECT id, site, base_url, search_url_template, discovery_url, query, page, attempts "
+                "FROM crawl_queue "
+                "WHERE run_id = ? AND ((status = ? AND (not_before IS NULL OR not_before <= ?)) "
+                "                      OR (status = ? AND lease_expires < ?)) "
+                f"AND site NOT IN ({', '.join('?' for _ in busy)}) "
+                "ORDER BY attempts, id LIMIT 1",
+                (run_id, PENDING, now, RUNNING, now, *busy)
+            ).fetchone()
+            if row is None:
+                # Keeps the items failed above
+                conn.execute("COMMIT")
+                return None
+
+            item_id, site, base_url, template, discovery_url, search_query, page, attempts = row
+            conn.execute(
+                "UPDATE crawl_queue SET status = ?, attempts = attempts + 1, lease_token = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, lease, now + lease_seconds, datetime.now().isoformat(sep=' '), item_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        site = JobSite(name=site, base_url=base_url, search_url_template=template, discovery_url=discovery_url)
+        return WorkItem(item_id, run_id, site, search_query, page, attempts + 1, lease)
+
+    def _mark_done(self, item: WorkItem, job_count: int) -> bool:
+        """Mark a leased item done in the current transaction; False if the lease was lost"""
+        return self.conn.execute(
+            "UPDATE crawl_queue SET status = ?, job_count = ?, error = NULL, lease_token = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_token = ?",
+            (DONE, job_count, datetime.now().isoformat(sep=' '), item.id, RUNNING, item.lease)
+        ).rowcount == 1
+
+    def complete(self, item: WorkItem, jobs: List[JobListing], skill_categories: Dict[str, str]) -> bool:
+        """Store the item's jobs in its run's session and mark it done, atomically.
+
+        Statements issued on the store's connection just before the call are
+        committed with it. Returns False, storing nothing and rolling them
+        back, if the lease expired and the item was claimed again meanwhile.
+        """
+        if not self._mark_done(item, len(jobs)):
+            self.conn.rollback()
+            return False
+        # Commits the status update above together with the jobs
+        self.job_store.add_session_jobs(self.session_id(item.run_id), jobs, skill_categories)
+        return True
+
+    def stage(self, item: WorkItem, jobs: List[JobListing]) -> bool:
+        """Mark the item done and stage its jobs for the coordinator to merge.
+
+        Like ``complete``, commits or rolls back the statements issued just before it.
+        """
+        with self.conn:
+            if not self._mark_done(item, len(jobs)):
+                self.conn.rollback()
+                return False
+            self.conn.execute(
+                "INSERT OR REPLACE INTO crawl_results (item_id, run_id, payload) VALUES (?, ?, ?)",
+                (item.id, item.run_id, json.dumps([_job_to_dict(job) for job in jobs], ensure_ascii=False))
+            )
+        return True
+
+    def staged_results(self, run_id: int) -> List[Tuple[int, List[JobListing]]]:
+        """(item id, jobs) of staged results not merged yet, in queue order"""
+        return [
+            (item_id, [_job_from_dict(data) for data in json.loads(payload)])
+            for item_id, payload in self.conn.execute(
+                "SELECT item_id, payload FROM crawl_results WHERE run_id = ? AND merged = 0 ORDER BY item_id",
+                (run_id,)
+            )
+        ]
+
+    def merge(self, run_id: int, item_ids: List[int], jobs: List[JobListing], skill_categories: Dict[str, str]):
+        """Add deduplicated staged jobs to the run's session and mark their results merged"""
+        self.conn.executemany(
+            "UPDATE crawl_results SET merged = 1, payload = '[]' WHERE item_id = ?",
+            [(item_id,) for item_id in item_ids]
+        )
+        # Commits the updates above together with the jobs
+        self.job_store.add_session_jobs(self.session_id(run_id), jobs, skill_categories)
+
+    def fail(self, item: WorkItem, error: str, max_attempts: int = MAX_ATTEMPTS) -> Optional[float]:
+        """Requeue a failed item after a backoff, or give up on it after max_attempts.
+
+        Returns the seconds until it may be retried, or None if it failed for good.
+        """
+        if item.attempts >= max_attempts:
+            status, backoff = FAILED, None
+        else:
+            status, backoff = PENDING, min(RETRY_BACKOFF * 2 ** (item.attempts - 1), RETRY_BACKOFF_MAX)
+        with self.conn:
+            self.conn.execute(
+                "UPDATE crawl_queue SET status = ?, error = ?, lease_token = NULL, not_before = ?, updated_at = ? "
+                "WHERE id = ? AND lease_token = ?",
+                (status, error, time.time() + backoff if backoff is not None else None,
+                 datetime.now().isoformat(sep=' '), item.id, item.lease)
+            )
+        return backoff
+
+    def next_retry_at(self, run_id: int) -> Optional[float]:
+        """Epoch seconds at which the next pending item becomes claimable; None if nothing is pending"""
+        row = self.conn.execute(
+            "SELECT COUNT(*), MAX(0, MIN(COALESCE(not_before, 0))) FROM crawl_queue WHERE run_id = ? AND status = ?",
+            (run_id, PENDING)
+        ).fetchone()
+        return row[1] if row[0] else None
+
+    def finish_run(self, run_id: int, status: str = "finished"):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE crawl_runs SET status = ?, finished_at = ? WHERE id = ?",
+                (status, datetime.now().isoformat(sep=' '), run_id)
+            )
+
+    def progress(self, run_id: int) -> Dict[str, int]:
+        """Item counts per status"""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for status, count in self.conn.execute(
+            "SELECT status, COUNT(*) FROM crawl_queue WHERE run_id = ? GROUP BY status", (run_id,)
+        ):
+            counts[status] = count
+        return counts
+
+    def renew(self, item: WorkItem, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend a live lease; False if the item is no longer held under it"""
+        return self._claim_connection().execute(
+            _RENEW_SQL, (time.time() + lease_seconds, item.id, RUNNING, item.lease)
+        ).rowcount == 1
+
+    def latest_finished_session(self) -> Optional[Tuple[int, int]]:
+        """(id, total jobs) of the newest session with jobs that no run is still adding to"""
+        return self.conn.execute(
+            "SELECT s.id, s.total_jobs FROM scraping_sessions s WHERE s.total_jobs > 0 AND NOT EXISTS "
+            "(SELECT 1 FROM crawl_runs r WHERE r.session_id = s.id AND r.status = 'running') "
+            "ORDER BY s.id DESC LIMIT 1"
+        ).fetchone()
+
+    def latest_run(self) -> Optional[Dict]:
+        """Status of the most recent run, for display"""
+        row = self.conn.execute(
+            "SELECT id, session_id, started_at, finished_at, status FROM crawl_runs ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        run_id, session_id, started_at, finished_at, status = row
+        return {'id': run_id, 'session_id': session_id, 'started_at': started_at,
+                'finished_at': finished_at, 'status': status, 'items': self.progress(run_id)}
+
+
+class LeaseHeartbeat:
+    """Renews the leases of the items a worker has in progress from a background thread.
+
+    A page that takes longer than its lease (a discovery item fetching many
+    postings, or a slow site) would otherwise be claimed a second time by
+    another worker. Leases are renewed every third of their length, so a
+    late beat does not lose them, and stop being renewed when the worker
+    process dies.
+    """
+
+    def __init__(self, job_store: JobStore, lease_seconds: float = LEASE_SECONDS):
+        self.db_path = job_store.db_path
+        self.lease_seconds = lease_seconds
+        self._items: Dict[int, WorkItem] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop_event.set()
+        self._thread.join()
+
+    def track(self, item: WorkItem):
+        with self._lock:
+            self._items[item.id] = item
+
+    def untrack(self, item: WorkItem):
+        with self._lock:
+            self._items.pop(item.id, None)
+
+    def _run(self):
+        # The queue's connections belong to the worker's thread
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            while not self._stop_event.wait(self.lease_seconds / 3):
+                with self._lock:
+                    items = list(self._items.values())
+                for item in items:
+                    try:
+                        conn.execute(_RENEW_SQL, (time.time() + self.lease_seconds, item.id, RUNNING, item.lease))
+                    except sqlite3.Error as e:
+                        print(f"Error renewing the lease of {item}: {e}")
+        finally:
+            conn.close()
@@ -1,21 +1,96 @@
+import sys
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Tuple, Union, Callable
 from datetime import datetime
 
-@dataclass
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
 class JobListing:
-    title: str
-    company: str
-    location: str
-    description: str
-    url: str
-    source_site: str
-    scraped_at: datetime = field(default_factory=datetime.now)
-    identified_skills: List[str] = field(default_factory=list)
+    """A scraped job posting.
+
+    Slotted to avoid a per-instance ``__dict__``. Company, location, source
+    site and skill names repeat across many rows, so they are interned, and
+    ``scraped_at`` is kept as integer epoch seconds.
+
+    Jobs read back from the job store carry their ``job_id`` and a loader
+    instead of the description text, which is only fetched when shown.
+    """
+    
+    __slots__ = ('title', 'company', 'location', '_description', 'url', 'source_site',
+                 '_scraped_ts', '_identified_skills', 'matched_queries', 'job_id', '_description_loader')
+    
+    def __init__(self, title: str, company: str, location: str, description: Optional[str], url: str,
+                 source_site: str, scraped_at: Optional[datetime] = None,
+                 identified_skills: Optional[Iterable[str]] = None,
+                 matched_queries: Iterable[str] = (), job_id: Optional[int] = None,
+                 description_loader: Optional[Callable[[int], str]] = None):
+        self.title = title
+        self.company = _intern(company)
+        self.location = _intern(location)
+        # Row id in the job store, once saved
+        self.job_id = job_id
+        self._description = description
+        self._description_loader = description_loader
+        self.url = url
+        self.source_site = _intern(source_site)
+        self.scraped_at = scraped_at or datetime.now()
+        self.identified_skills = identified_skills or ()
+        # Search queries that returned the posting during its run
+        self.matched_queries: Tuple[str, ...] = tuple(matched_queries)
+    
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            loader = self._description_loader
+            return loader(self.job_id) if loader is not None and self.job_id is not None else ""
+        return self._description
+    
+    @description.setter
+    def description(self, value: str):
+        self._description = value
+    
+    @property
+    def description_loaded(self) -> bool:
+        """Whether the description is held in memory rather than read from the store"""
+        return self._description is not None or self._description_loader is None
+    
+    def defer_description(self, loader: Callable[[int], str]):
+        """Drop the description text of a saved job; ``loader(job_id)`` returns it when needed"""
+        if self.job_id is not None:
+            self._description = None
+            self._description_loader = loader
+    
+    @property
+    def scraped_at(self) -> datetime:
+        return datetime.fromtimestamp(self._scraped_ts)
+    
+    @scraped_at.setter
+    def scraped_at(self, value: datetime):
+        self._scraped_ts = int(value.timestamp())
+    
+    @property
+    def scraped_ts(self) -> int:
+        return self._scraped_ts
+    
+    @property
+    def identified_skills(self) -> Tuple[str, ...]:
+        return self._identified_skills
+    
+    @identified_skills.setter
+    def identified_skills(self, skills: Iterable[str]):
+        self._identified_skills = tuple(sys.intern(skill) for skill in skills)
     
     def __str__(self):
         return f"{self.title} at {self.company} ({self.location})"
     
+    def __repr__(self):
+        return (f"JobListing(title={self.title!r}, company={self.company!r}, "
+                f"location={self.location!r}, url={self.url!r}, source_site={self.source_site!r})")
+    
     def __hash__(self):
         return hash((self.title, self.company, self.url, self.source_site))
     
@@ -27,21 +102,160 @@ class JobListing:
                 self.url == other.url and 
                 self.source_site == other.source_site)
 
+
+class JobTable:
+    """Array-backed, column-oriented storage for large job histories.
+
+    Repeated values (company, location, source site and whole skill sets)
+    are stored once in pools and referenced by index from typed arrays.
+    Rows are materialized as ``JobListing`` objects only when accessed.
+    Descriptions of stored jobs are left to ``description_loader``.
+    """
+    
+    def __init__(self, jobs: Optional[Iterable[JobListing]] = None,
+                 description_loader: Optional[Callable[[int], str]] = None):
+        self.description_loader = description_loader
+        self._values: List[Optional[str]] = []
+        self._value_ids: Dict[Optional[str], int] = {}
+        self._skill_sets: List[Tuple[str, ...]] = []
+        self._skill_set_ids: Dict[Tuple[str, ...], int] = {}
+        
+        self.titles: List[str] = []
+        self.descriptions: List[Optional[str]] = []
+        self.urls: List[str] = []
+        # 0 for jobs that are not in the job store
+        self.job_ids = array('q')
+        self.company_ids = array('I')
+        self.location_ids = array('I')
+        self.source_ids = array('I')
+        self.scraped_ts = array('q')
+        self.skill_set_ids = array('I')
+        
+        if jobs:
+            self.extend(jobs)
+    
+    def _value_id(self, value: Optional[str]) -> int:
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = len(self._values)
+            self._values.append(_intern(value))
+            self._value_ids[value] = value_id
+        return value_id
+    
+    def _skill_set_id(self, skills: Iterable[str]) -> int:
+        skills = tuple(sys.intern(skill) for skill in skills)
+        set_id = self._skill_set_ids.get(skills)
+        if set_id is None:
+            set_id = len(self._skill_sets)
+            self._skill_sets.append(skills)
+            self._skill_set_ids[skills] = set_id
+        return set_id
+    
+    def append(self, job: JobListing) -> int:
+        """Add a job and return its row number"""
+        self.titles.append(job.title)
+        if job.job_id is not None and not job.description_loaded:
+            self.descriptions.append(None)
+        else:
+            self.descriptions.append(job.description)
+        self.urls.append(job.url)
+        self.job_ids.append(job.job_id or 0)
+        self.company_ids.append(self._value_id(job.company))
+        self.location_ids.append(self._value_id(job.location))
+        self.source_ids.append(self._value_id(job.source_site))
+        self.scraped_ts.append(job.scraped_ts)
+        self.skill_set_ids.append(self._skill_set_id(job.identified_skills))
+        return len(self.titles) - 1
+    
+    def extend(self, jobs: Iterable[JobListing]):
+        for job in jobs:
+            self.append(job)
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        
+        job = JobListing(
+            title=self.titles[index],
+            company=self._values[self.company_ids[index]],
+            location=self._values[self.location_ids[index]],
+            description=self.descriptions[index],
+            url=self.urls[index],
+            source_site=self._values[self.source_ids[index]],
+            identified_skills=self._skill_sets[self.skill_set_ids[index]],
+            job_id=self.job_ids[index] or None,
+            description_loader=self.description_loader
+        )
+        job._scraped_ts = self.scraped_ts[index]
+        return job
+    
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+    
+    def company(self, row: int) -> str:
+        return self._values[self.company_ids[row]]
+    
+    def location(self, row: int) -> str:
+        return self._values[self.location_ids[row]]
+    
+    def source_site(self, row: int) -> str:
+        return self._values[self.source_ids[row]]
+    
+    def identified_skills(self, row: int) -> Tuple[str, ...]:
+        return self._skill_sets[self.skill_set_ids[row]]
+    
+    def set_identified_skills(self, row: int, skills: Iterable[str]):
+        self.skill_set_ids[row] = self._skill_set_id(skills)
+    
+    def distinct_values(self, column: str) -> List[str]:
+        """Distinct company, location or source_site values present in the table"""
+        ids = {'company': self.company_ids, 'location': self.location_ids, 'source_site': self.source_ids}[column]
+        return [self._values[value_id] for value_id in sorted(set(ids))]
+    
+    def rows_matching(self, column: str, value: str) -> array:
+        """Row numbers whose company, location or source_site equals value"""
+        ids = {'company': self.company_ids, 'location': self.location_ids, 'source_site': self.source_ids}[column]
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            return array('I')
+        return array('I', (row for row, row_value in enumerate(ids) if row_value == value_id))
+
 @dataclass
 class JobSite:
     name: str
     base_url: str
     search_url_template: str
     is_active: bool = True
+    # Sitemap or RSS/Atom feed listing the site's postings; replaces per-query searches
+    discovery_url: str = ""
+    # Seconds between requests to the site; None uses delay_between_requests. A robots.txt Crawl-delay raises it
+    crawl_delay: Optional[float] = None
+    # Pages of the site fetched at once by the scheduler, unless its robots.txt sets a Crawl-delay
+    max_concurrency: int = 1
+    respect_robots: bool = True
+    
+    def get_search_url(self, query: str, page: int = 1) -> str:
+        return self.search_url_template.format(query=query, page=page)
+    
+    @property
+    def supports_paging(self) -> bool:
+        """Whether the search template has a {page} placeholder"""
+        return "{page}" in self.search_url_template
     
-    def get_search_url(self, query: str) -> str:
-        return self.search_url_template.format(query=query)
+    @property
+    def uses_discovery(self) -> bool:
+        return bool(self.discovery_url)
 
 @dataclass
 class SkillCategory:
     name: str
     skills: List[str]
     color: str = "#3498db"
+    aliases: Dict[str, List[str]] = field(default_factory=dict)
     
 @dataclass
 class ScrapingConfig:
@@ -51,3 +265,18 @@ class ScrapingConfig:
     max_pages_per_site: int = 5
     delay_between_requests: float = 1.0
     use_selenium: bool = False
+    detect_duplicates: bool = True
+    duplicate_threshold: float = 0.8
+    metrics_file: str = "scrape_metrics.json"
+    archive_responses: bool = False
+    archive_dir: str = "archives"
+    schedule: str = "0 */6 * * *"
+    scheduler_workers: int = 4
+    discovery_fetch_limit: int = 50
+    # A site's circuit opens after this many failed pages in a row and is probed again after the cooldown
+    circuit_failure_threshold: int = 3
+    circuit_cooldown: float = 1800.0
+    # Listing pages are read no further than this (and usually stop much earlier); larger feeds and postings fail
+    max_response_bytes: int = 4 * 1024 * 1024
+    # Seconds a fetched robots.txt is reused, across runs
+    robots_cache_ttl: float = 86400.0
@@ -0,0 +1,182 @@
+"""
+Posting discovery through sitemaps and RSS/Atom feeds.
+
+A site with a ``discovery_url`` is crawled by reading its sitemap or feed
+once per run instead of issuing one search per query. Only postings that
+are new or whose ``lastmod``/``pubDate`` moved since they were last fetched
+are downloaded, and the jobs are matched against the search queries
+locally. What was fetched, and when, is kept in the job store.
+"""
+
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from job_store import JobStore
+
+
+class FeedEntry:
+    """A posting (or child sitemap) URL with its modification time, if the feed gave one"""
+
+    __slots__ = ('url', 'modified', 'title', 'summary')
+
+    def __init__(self, url: str, modified: Optional[float] = None, title: str = "", summary: str = ""):
+        self.url = url
+        self.modified = modified
+        self.title = title
+        self.summary = summary
+
+    def __repr__(self):
+        return f"FeedEntry({self.url!r}, modified={self.modified})"
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def _child_text(element, *names: str) -> str:
+    for child in element:
+        if _local_name(child.tag) in names and child.text:
+            return child.text.strip()
+    return ""
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Epoch seconds of a W3C (sitemap, Atom) or RFC 822 (RSS) date; naive dates are taken as UTC"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_feed(content: bytes) -> Tuple[List[FeedEntry], List[FeedEntry]]:
+    """Posting entries and child sitemaps of a sitemap, sitemap index, RSS or Atom document.
+
+    Namespaces are ignored, so sitemap extensions and RSS modules parse
+    the same as the plain formats.
+    """
+    root = ElementTree.fromstring(content)
+    kind = _local_name(root.tag)
+    entries, sitemaps = [], []
+
+    if kind in ('urlset', 'sitemapindex'):
+        target = sitemaps if kind == 'sitemapindex' else entries
+        for element in root:
+            url = _child_text(element, 'loc')
+            if url:
+                target.append(FeedEntry(url, parse_timestamp(_child_text(element, 'lastmod'))))
+
+    elif kind == 'feed':  # Atom
+        for element in root:
+            if _local_name(element.tag) != 'entry':
+                continue
+            url = ""
+            for link in element:
+                if _local_name(link.tag) == 'link' and link.get('rel', 'alternate') == 'alternate':
+                    url = link.get('href', '').strip()
+                    break
+            if url:
+                entries.append(FeedEntry(
+                    url, parse_timestamp(_child_text(element, 'updated', 'published')),
+                    _child_text(element, 'title'), _child_text(element, 'summary', 'content')
+                ))
+
+    else:  # RSS 2.0 (<rss><channel><item>) and RSS 1.0 (<rdf:RDF><item>)
+        for element in root.iter():
+            if _local_name(element.tag) != 'item':
+                continue
+            url = _child_text(element, 'link') or _child_text(element, 'guid')
+            if url:
+                entries.append(FeedEntry(
+                    url, parse_timestamp(_child_text(element, 'pubdate', 'date', 'updated')),
+                    _child_text(element, 'title'), _child_text(element, 'description')
+                ))
+
+    return entries, sitemaps
+
+
+_TOKEN = re.compile(r'[a-z0-9+#]+(?:\.[a-z0-9]+)*')
+
+
+def matching_queries(text: str, queries: Iterable[str]) -> List[str]:
+    """The queries all of whose words occur in the text, case-insensitively"""
+    words = set(_TOKEN.findall(text.lower()))
+    return [query for query in queries
+            if words.issuperset(_TOKEN.findall(query.lower())) and query.strip()]
+
+
+# (site, entries fetched, start time if every changed entry was fetched) of one pass over a feed
+DiscoveryPass = Tuple[str, List[FeedEntry], Optional[float]]
+
+
+class DiscoveryState:
+    """When each discovered URL was last fetched, stored next to the jobs"""
+
+    def __init__(self, job_store: JobStore):
+        self.conn = job_store.conn
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS discovered_urls (
+                    site TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    modified REAL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (site, url)
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS discovery_sites (
+                    site TEXT PRIMARY KEY,
+                    checked_at REAL NOT NULL
+                )
+            ''')
+
+    def changed(self, site: str, entries: List[FeedEntry]) -> List[FeedEntry]:
+        """Entries never fetched before or modified since, newest first.
+
+        An entry without a modification time is only fetched once.
+        """
+        known: Dict[str, Optional[float]] = dict(self.conn.execute(
+            "SELECT url, modified FROM discovered_urls WHERE site = ?", (site,)
+        ))
+        changed = [
+            entry for entry in entries
+            if entry.url not in known
+            or (entry.modified is not None and (known[entry.url] is None or entry.modified > known[entry.url]))
+        ]
+        changed.sort(key=lambda entry: entry.modified or 0.0, reverse=True)
+        return changed
+
+    def record(self, passes: Iterable[DiscoveryPass]):
+        """Mark each pass's entries fetched, and its site checked if the pass was complete.
+
+        Runs in the connection's current transaction without committing, so
+        callers issue it just before storing the jobs from those entries and
+        both are committed (or rolled back) together.
+        """
+        now = time.time()
+        for site, entries, checked_at in passes:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO discovered_urls (site, url, modified, fetched_at) VALUES (?, ?, ?, ?)",
+                [(site, entry.url, entry.modified, now) for entry in entries]
+            )
+            if checked_at is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO discovery_sites (site, checked_at) VALUES (?, ?)", (site, checked_at)
+                )
+
+    def last_checked(self, site: str) -> Optional[float]:
+        """When every change in the site's feed was last fetched"""
+        row = self.conn.execute("SELECT checked_at FROM discovery_sites WHERE site = ?", (site,)).fetchone()
+        return row[0] if row else None
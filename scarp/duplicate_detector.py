@@ -0,0 +1,139 @@
+"""
+Near-duplicate job detection with MinHash signatures and LSH banding
+"""
+
+import re
+import random
+import zlib
+from typing import List, Dict, Optional, Set, Tuple
+from data_models import JobListing
+
+_MAX_HASH = (1 << 32) - 1
+_GOLDEN_RATIO = 0x9E3779B1
+
+
+class DuplicateDetector:
+    """Finds job postings that are near-duplicates of ones already seen.
+
+    Each job is reduced to a set of shingles (character 5-grams of the
+    title and company, word 3-grams of the description) and a MinHash
+    signature. Signatures are split into bands that are hashed into
+    buckets, so a new job is only compared against jobs sharing at least
+    one bucket instead of against every job seen so far.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # XOR with a random mask stands in for a permutation of the mixed
+        # 32-bit shingle hashes; it is several times cheaper than a*x+b mod p
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(32) for _ in range(num_perm)]
+
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[Tuple[int, ...]] = []
+        self._jobs: List[Optional[JobListing]] = []
+        self._removed = 0
+        self.duplicates: Dict[int, List[JobListing]] = {}
+
+    def _normalize(self, text: str) -> str:
+        return " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+
+    def _shingles(self, job: JobListing) -> Set[int]:
+        header = self._normalize(f"{job.title} {job.company}")
+        shingles = {header[i:i + 5] for i in range(max(1, len(header) - 4))}
+
+        words = self._normalize(job.description).split()
+        shingles.update(" ".join(words[i:i + 3]) for i in range(len(words) - 2))
+
+        return {(zlib.crc32(shingle.encode("utf-8")) * _GOLDEN_RATIO) & _MAX_HASH for shingle in shingles}
+
+    def signature(self, job: JobListing) -> Tuple[int, ...]:
+        """MinHash signature of a job"""
+        hashes = self._shingles(job)
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(min(value ^ mask for value in hashes) for mask in self._masks)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def similarity(self, first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for a, b in zip(first, second) if a == b) / self.num_perm
+
+    def find_duplicate(self, job: JobListing,
+                       signature: Optional[Tuple[int, ...]] = None) -> Optional[JobListing]:
+        """Return the most similar job already seen, if it is a near-duplicate"""
+        signature = signature or self.signature(job)
+
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best, best_score = None, self.threshold
+        for index in candidates:
+            score = self.similarity(signature, self._signatures[index])
+            if score >= best_score:
+                best, best_score = index, score
+
+        return self._jobs[best] if best is not None else None
+
+    def add(self, job: JobListing) -> Optional[JobListing]:
+        """Index a job unless it duplicates one already seen.
+
+        Returns the original job when ``job`` is a near-duplicate, otherwise
+        None after adding ``job`` to the index.
+        """
+        signature = self.signature(job)
+        original = self.find_duplicate(job, signature)
+        if original is not None:
+            self.duplicates.setdefault(id(original), []).append(job)
+            return original
+
+        index = len(self._jobs)
+        self._jobs.append(job)
+        self._signatures.append(signature)
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(index)
+        return None
+
+    def remove(self, job: JobListing):
+        """Forget a job passed to add(), e.g. when storing it failed and it will be seen again.
+
+        An indexed job stops matching later ones; a duplicate is no longer
+        counted. Recently added jobs are found fastest.
+        """
+        for index in range(len(self._jobs) - 1, -1, -1):
+            if self._jobs[index] is job:
+                for band, key in self._band_keys(self._signatures[index]):
+                    self._buckets[band][key].remove(index)
+                # Kept as a placeholder so the other indexes stay valid
+                self._jobs[index] = None
+                self._removed += 1
+                return
+        for original_id, duplicates in list(self.duplicates.items()):
+            for position, duplicate in enumerate(duplicates):
+                if duplicate is job:
+                    del duplicates[position]
+                    if not duplicates:
+                        del self.duplicates[original_id]
+                    return
+
+    def filter(self, jobs: List[JobListing]) -> List[JobListing]:
+        """Keep the first posting of each group of near-duplicates"""
+        return [job for job in jobs if self.add(job) is None]
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(len(jobs) for jobs in self.duplicates.values())
+
+    def __len__(self) -> int:
+        return len(self._jobs) - self._removed
@@ -3,8 +3,6 @@ import csv
 import os
 from datetime import datetime
 from typing import List, Dict
-from docx import Document
-from docx.shared import Inches
 from data_models import JobListing
 
 class ExportManager:
@@ -51,6 +49,9 @@ class ExportManager:
         filepath = os.path.join(self.export_dir, filename)
         
         try:
+            # python-docx is slow to import, so load it only when exporting
+            from docx import Document
+            
             doc = Document()
             
             title = doc.add_heading('Cambodian Software Engineering Job Market Analysis', 0)
@@ -0,0 +1,285 @@
+"""
+Read-only HTTP/JSON API over the job store, for other local tools.
+
+    GET /jobs?limit=50&after=<cursor>&source=&location=&session=&skill=&q=
+    GET /jobs/<id>
+    GET /search?q=python+dev&limit=20
+    GET /skills?granularity=week&since=2024-01-01&limit=20
+    GET /trends?granularity=week&since=2024-01-01&skills=Python,React
+    GET /sessions
+
+/jobs pages newest first with a keyset cursor (the ``next`` link), so deep
+pages cost the same as the first one. Responses carry a weak ETag derived
+from the store's contents; a matching If-None-Match is answered with 304
+before any query runs. Bodies are gzipped for clients that accept it. Only
+the standard library is used, so the API runs without PyQt6.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, urlencode
+from job_store import JobStore, GRANULARITIES, search_match_expression
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+GZIP_MIN_SIZE = 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class JobApi:
+    """Answers API requests from a read-only job store connection"""
+
+    def __init__(self, db_path: str):
+        self.store = JobStore(db_path, read_only=True)
+        # One connection, shared by the server's request threads
+        self._lock = threading.Lock()
+        self._routes = {
+            "/jobs": self.list_jobs,
+            "/search": self.search,
+            "/skills": self.skills,
+            "/trends": self.trends,
+            "/sessions": self.sessions,
+        }
+
+    def close(self):
+        self.store.close()
+
+    def data_version(self) -> str:
+        """Changes whenever jobs or sessions are added, or stored skills and rollups are rewritten.
+
+        Jobs are never updated or deleted, but re-analysis rewrites their
+        skills, the rollups and the search index; the store counts those
+        rewrites in its generation.
+        """
+        with self._lock:
+            max_id, sessions, total = self.store.conn.execute(
+                "SELECT (SELECT IFNULL(MAX(id), 0) FROM jobs), COUNT(*), IFNULL(SUM(total_jobs), 0) "
+                "FROM scraping_sessions"
+            ).fetchone()
+            generation = self.store.generation()
+        return f"{max_id}.{sessions}.{total}.{generation}"
+
+    def etag(self, target: str) -> str:
+        digest = hashlib.sha1(f"{self.data_version()} {target}".encode("utf-8")).hexdigest()[:20]
+        return f'W/"{digest}"'
+
+    def handle(self, path: str, params: Dict[str, str]) -> Dict:
+        if path.startswith("/jobs/"):
+            return self.get_job(_int_param({"id": path[len("/jobs/"):]}, "id"))
+        route = self._routes.get(path.rstrip("/") or "/")
+        if route is None:
+            raise ApiError(404, f"No such endpoint: {path}")
+        with self._lock:
+            return route(params)
+
+    def _jobs_with_skills(self, rows: List[Tuple]) -> List[Dict]:
+        skills: Dict[int, List[str]] = {}
+        job_ids = [row[0] for row in rows]
+        if job_ids:
+            for job_id, skill in self.store.conn.execute(
+                "SELECT js.job_id, s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+                f"WHERE js.job_id IN ({', '.join('?' * len(job_ids))}) ORDER BY s.name",
+                job_ids
+            ):
+                skills.setdefault(job_id, []).append(skill)
+        return [
+            {'id': job_id, 'title': title, 'company': company, 'location': location,
+             'description': description, 'url': url, 'source_site': source_site,
+             'scraped_at': scraped_at, 'session_id': session_id, 'skills': skills.get(job_id, [])}
+            for job_id, title, company, location, description, url, source_site, scraped_at, session_id in rows
+        ]
+
+    def list_jobs(self, params: Dict[str, str]) -> Dict:
+        limit = min(_int_param(params, "limit", DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        after = _int_param(params, "after", None)
+
+        conditions, values = [], []
+        if after is not None:
+            conditions.append("j.id < ?")
+            values.append(after)
+        for name, column in (("source", "j.source_site"), ("location", "j.location"), ("session", "j.session_id")):
+            if params.get(name):
+                conditions.append(f"{column} = ?")
+                values.append(params[name])
+        if params.get("skill"):
+            conditions.append("j.id IN (SELECT js.job_id FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+                              "WHERE s.name = ? COLLATE NOCASE)")
+            values.append(params["skill"])
+        if params.get("q"):
+            expression = search_match_expression(params["q"])
+            if self.store.has_search_index and expression:
+                conditions.append("j.id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+                values.append(expression)
+            else:
+                for word in params["q"].split():
+                    conditions.append(f"(j.title || ' ' || {self.store.description_sql('j.')}) LIKE ?")
+                    values.append(f"%{word}%")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.store.conn.execute(
+            f"SELECT j.id, j.title, j.company, j.location, {self.store.description_sql('j.')}, j.url, j.source_site, "
+            f"j.scraped_at, j.session_id FROM jobs j {where} ORDER BY j.id DESC LIMIT ?",
+            values + [limit + 1]
+        ).fetchall()
+
+        jobs = self._jobs_with_skills(rows[:limit])
+        next_link = None
+        if len(rows) > limit:
+            next_params = {name: value for name, value in params.items() if name != "after"}
+            next_params["after"] = jobs[-1]['id']
+            next_link = f"/jobs?{urlencode(next_params)}"
+        return {'jobs': jobs, 'count': len(jobs), 'next': next_link}
+
+    def get_job(self, job_id: int) -> Dict:
+        with self._lock:
+            rows = self.store.conn.execute(
+                f"SELECT id, title, company, location, {self.store.description_sql()}, url, source_site, scraped_at, session_id "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchall()
+            if not rows:
+                raise ApiError(404, f"No job with id {job_id}")
+            return self._jobs_with_skills(rows)[0]
+
+    def search(self, params: Dict[str, str]) -> Dict:
+        text = params.get("q", "")
+        if not text.strip():
+            raise ApiError(400, "Missing search text: q")
+        limit = min(_int_param(params, "limit", 20), MAX_PAGE_SIZE)
+        results = self.store.search_jobs(text, source_site=params.get("source") or None,
+                                         location=params.get("location") or None, limit=limit)
+        return {'query': text, 'results': [
+            {'title': job.title, 'company': job.company, 'location': job.location, 'url': job.url,
+             'source_site': job.source_site, 'scraped_at': job.scraped_at.isoformat(sep=' '),
+             'skills': list(job.identified_skills), 'snippet': snippet}
+            for job, snippet in results
+        ]}
+
+    def skills(self, params: Dict[str, str]) -> Dict:
+        granularity = _granularity(params)
+        since = params.get("since") or None
+        limit = min(_int_param(params, "limit", 20), MAX_PAGE_SIZE)
+        top = self.store.get_top_skills(granularity, since, limit)
+        categories: Dict[str, int] = {}
+        for _, category, count in self.store.get_category_rollups(granularity, since):
+            categories[category] = categories.get(category, 0) + count
+        total_jobs = sum(count for _, count in self.store.get_period_totals(granularity, since))
+        return {
+            'since': since,
+            'total_jobs': total_jobs,
+            'skills': [{'skill': skill, 'jobs': count,
+                        'share': round(count / total_jobs, 4) if total_jobs else 0.0} for skill, count in top],
+            'categories': [{'category': category, 'mentions': count}
+                           for category, count in sorted(categories.items(), key=lambda item: -item[1])]
+        }
+
+    def trends(self, params: Dict[str, str]) -> Dict:
+        granularity = _granularity(params)
+        since = params.get("since") or None
+        skills = [skill.strip() for skill in params.get("skills", "").split(",") if skill.strip()]
+        if not skills:
+            skills = [skill for skill, _ in self.store.get_top_skills(granularity, since, 10)]
+
+        periods: Dict[str, Dict] = {
+            period: {'period': period, 'total_jobs': total, 'skills': {}, 'categories': {}}
+            for period, total in self.store.get_period_totals(granularity, since)
+        }
+        for period, skill, count in self.store.get_skill_rollups(granularity, since, skills):
+            if period in periods:
+                periods[period]['skills'][skill] = count
+        for period, category, count in self.store.get_category_rollups(granularity, since):
+            if period in periods:
+                periods[period]['categories'][category] = count
+        return {'granularity': granularity, 'skills': skills, 'periods': list(periods.values())}
+
+    def sessions(self, params: Dict[str, str]) -> Dict:
+        limit = min(_int_param(params, "limit", DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        rows = self.store.conn.execute(
+            "SELECT id, session_date, total_jobs, sites_scraped, queries_used FROM scraping_sessions "
+            "ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return {'sessions': [
+            {'id': session_id, 'date': date, 'total_jobs': total, 'sites': sites.split(", ") if sites else [],
+             'queries': queries.split(", ") if queries else []}
+            for session_id, date, total, sites, queries in rows
+        ]}
+
+
+def _int_param(params: Dict[str, str], name: str, default: Optional[int] = 0) -> Optional[int]:
+    value = params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+    if number < 0:
+        raise ApiError(400, f"{name} must not be negative")
+    return number
+
+
+def _granularity(params: Dict[str, str]) -> str:
+    granularity = params.get("granularity", "week")
+    if granularity not in GRANULARITIES:
+        raise ApiError(400, f"granularity must be one of {', '.join(GRANULARITIES)}")
+    return granularity
+
+
+def make_handler(api: JobApi):
+    class JobApiHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            target = urlsplit(self.path)
+            params = {name: values[-1] for name, values in parse_qs(target.query).items()}
+
+            etag = api.etag(self.path)
+            if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            try:
+                status, payload = 200, api.handle(target.path, params)
+            except ApiError as e:
+                status, payload, etag = e.status, {'error': str(e)}, None
+            self.send_json(status, payload, etag)
+
+        def send_json(self, status: int, payload: Dict, etag: Optional[str]):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            gzipped = len(body) >= GZIP_MIN_SIZE and "gzip" in self.headers.get("Accept-Encoding", "")
+            if gzipped:
+                body = gzip.compress(body, compresslevel=6)
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Vary", "Accept-Encoding")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            if etag:
+                self.send_header("ETag", etag)
+                # Cached copies may be kept but must be revalidated
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return JobApiHandler
+
+
+def make_server(db_path: str, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """An API server for the job store; call serve_forever() on it"""
+    api = JobApi(db_path)
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.api = api
+    return server
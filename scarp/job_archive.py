@@ -0,0 +1,443 @@
+"""
+Memory-mapped columnar snapshot of the whole job history.
+
+Loading a large history from SQLite into JobListing objects takes seconds,
+so the jobs table is also kept in a compact file that is mapped into memory
+on startup and read in place:
+
+    8 bytes     magic and format version
+    16 bytes    offset and length of the JSON directory at the end of the file
+    columns     fixed-width arrays (ids, timestamps, pool references) and
+                string columns stored as an offsets array plus a UTF-8 heap,
+                each starting on an 8-byte boundary
+    directory   {"rows", "max_job_id", "columns": {name: [offset, length, typecode]}}
+
+Company, location, source site and skill sets are stored once in pools, as
+in JobTable. Descriptions stay in the job store and are loaded by job id.
+The store only ever appends jobs, so the file is brought up to date by
+copying it and adding the rows past its ``max_job_id``.
+
+Each update writes a new generation (job_data.1.cols, job_data.2.cols, ...)
+rather than replacing the file, so readers keep their mapping of the
+previous one, which Windows would not let a writer replace anyway. Writers
+take a lock file, so the window and the scrape daemon never build from the
+same generation at once, and remove the generations before theirs once
+nobody maps them.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate, islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from PyQt6.QtCore import QThread, pyqtSignal
+from data_models import JobListing
+from job_store import JobStore
+
+MAGIC = b"SCJA"
+VERSION = 1
+_PREFIX = struct.Struct("<4sIQQ")
+_SKILL_SEPARATOR = "\x1f"
+
+# Fixed-width columns and their array typecodes
+_FIXED_COLUMNS = {'job_id': 'q', 'scraped_ts': 'q', 'company': 'I', 'location': 'I', 'source_site': 'I',
+                  'skill_set': 'I'}
+_STRING_COLUMNS = ('title', 'url', 'values', 'skill_sets')
+
+# Seconds a writer waits for another's lock, and after which a lock or temp file is taken as left by a crash
+LOCK_TIMEOUT = 120.0
+STALE_SECONDS = 600.0
+
+
+def archive_path(db_path: str) -> str:
+    """Base name of a job store's archive, e.g. job_data.db -> job_data.cols.
+
+    The generations are written next to it as job_data.<n>.cols; a file at
+    the base name itself, from before generations, counts as generation 0.
+    """
+    return os.path.splitext(db_path)[0] + ".cols"
+
+
+def _generations(path: str) -> List[Tuple[int, str]]:
+    """(generation, file) of the archive's files on disk, newest first"""
+    directory, name = os.path.split(os.path.abspath(path))
+    pattern = re.compile(re.escape(os.path.splitext(name)[0]) + r"\.(\d+)\.cols$")
+    generations = [(0, os.path.join(directory, name))] if os.path.exists(path) else []
+    for entry in os.listdir(directory):
+        match = pattern.match(entry)
+        if match:
+            generations.append((int(match.group(1)), os.path.join(directory, entry)))
+    return sorted(generations, reverse=True)
+
+
+def _generation_path(path: str, generation: int) -> str:
+    return f"{os.path.splitext(os.path.abspath(path))[0]}.{generation}.cols"
+
+
+def latest_archive_path(path: str) -> Optional[str]:
+    """File of the newest generation of an archive, if it has any"""
+    generations = _generations(path)
+    return generations[0][1] if generations else None
+
+
+def open_job_archive(path: str, description_loader: Optional[Callable[[int], str]] = None) -> Optional["JobArchive"]:
+    """Map the newest readable generation of an archive; None if there is none"""
+    for _, file in _generations(path):
+        try:
+            return JobArchive(file, description_loader)
+        except (OSError, ValueError) as e:
+            # Removed by a writer since it was listed, or not an archive
+            print(f"Skipping job archive {file}: {e}")
+    return None
+
+
+@contextmanager
+def _writer_lock(path: str):
+    """Hold the archive's lock file; a lock older than STALE_SECONDS is taken as left by a crash"""
+    lock_path = f"{path}.lock"
+    deadline = time.time() + LOCK_TIMEOUT
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                # Released or removed by another writer meanwhile
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"{lock_path} is held by another writer")
+            time.sleep(0.1)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_old_files(path: str, current: str):
+    """Remove the generations before ``current`` and leftover temp files, skipping any still mapped"""
+    directory, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    old = [file for _, file in _generations(path) if file != current]
+    old += [os.path.join(directory, entry) for entry in os.listdir(directory)
+            if entry.startswith(f"{stem}.") and entry.endswith(".cols.tmp")]
+    for file in old:
+        try:
+            os.remove(file)
+        except OSError:
+            # Windows keeps a mapped file; it is removed by a later update
+            pass
+
+
+class JobArchive:
+    """Read-only, memory-mapped view of an archive file.
+
+    Offers the row accessors of ``JobTable``; rows are materialized as
+    ``JobListing`` objects only when indexed, with descriptions left to
+    ``description_loader``.
+    """
+
+    def __init__(self, path: str, description_loader: Optional[Callable[[int], str]] = None):
+        self.path = path
+        self.description_loader = description_loader
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, directory_offset, directory_size = _PREFIX.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} job archive")
+            directory = json.loads(self._mmap[directory_offset:directory_offset + directory_size])
+        except Exception:
+            self._mmap.close()
+            raise
+
+        self.rows: int = directory['rows']
+        self.max_job_id: int = directory['max_job_id']
+        self._view = memoryview(self._mmap)
+        self._columns: Dict[str, memoryview] = {
+            name: self._view[offset:offset + length].cast(typecode)
+            for name, (offset, length, typecode) in directory['columns'].items()
+        }
+        self.job_ids = self._columns['job_id']
+        self.scraped_ts = self._columns['scraped_ts']
+        self.company_ids = self._columns['company']
+        self.location_ids = self._columns['location']
+        self.source_ids = self._columns['source_site']
+        self.skill_set_ids = self._columns['skill_set']
+        # The pools are small and read on every row, so they are decoded once
+        self._values = [sys.intern(value) for value in self._strings('values')]
+        self._value_ids = {value: value_id for value_id, value in enumerate(self._values)}
+        self._skill_sets = [tuple(sys.intern(skill) for skill in skills.split(_SKILL_SEPARATOR)) if skills else ()
+                            for skills in self._strings('skill_sets')]
+
+    def close(self):
+        for column in self._columns.values():
+            column.release()
+        self._columns.clear()
+        self._view.release()
+        self._mmap.close()
+
+    def _string(self, column: str, index: int) -> str:
+        offsets = self._columns[f"{column}_offsets"]
+        return self._columns[f"{column}_heap"][offsets[index]:offsets[index + 1]].tobytes().decode("utf-8")
+
+    def _strings(self, column: str) -> List[str]:
+        offsets = self._columns[f"{column}_offsets"]
+        heap = self._columns[f"{column}_heap"].tobytes()
+        return [heap[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, index: int) -> JobListing:
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        job = JobListing(
+            title=self.title(index),
+            company=self.company(index),
+            location=self.location(index),
+            description=None,
+            url=self.url(index),
+            source_site=self.source_site(index),
+            identified_skills=self.identified_skills(index),
+            job_id=self.job_ids[index],
+            description_loader=self.description_loader
+        )
+        job._scraped_ts = self.scraped_ts[index]
+        return job
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def title(self, row: int) -> str:
+        return self._string('title', row)
+
+    def url(self, row: int) -> str:
+        return self._string('url', row)
+
+    def company(self, row: int) -> str:
+        return self._values[self.company_ids[row]]
+
+    def location(self, row: int) -> str:
+        return self._values[self.location_ids[row]]
+
+    def source_site(self, row: int) -> str:
+        return self._values[self.source_ids[row]]
+
+    def identified_skills(self, row: int) -> Tuple[str, ...]:
+        return self._skill_sets[self.skill_set_ids[row]]
+
+    def distinct_values(self, column: str) -> List[str]:
+        """Distinct company, location or source_site values present in the archive"""
+        ids = {'company': self.company_ids, 'location': self.location_ids, 'source_site': self.source_ids}[column]
+        return [self._values[value_id] for value_id in sorted(set(ids))]
+
+    def rows_where(self, **conditions: str) -> "ArchiveRows":
+        """Rows whose company, location or source_site equal the given values, e.g. rows_where(location="Phnom Penh")"""
+        checks = []
+        for column, value in conditions.items():
+            ids = {'company': self.company_ids, 'location': self.location_ids, 'source_site': self.source_ids}[column]
+            if value not in self._value_ids:
+                return ArchiveRows(self, array('I'))
+            checks.append((ids, self._value_ids[value]))
+
+        if not checks:
+            return ArchiveRows(self, range(self.rows))
+        (first_ids, first_value), rest = checks[0], checks[1:]
+        rows = array('I', (row for row, value_id in enumerate(first_ids) if value_id == first_value))
+        for ids, value_id in rest:
+            rows = array('I', (row for row in rows if ids[row] == value_id))
+        return ArchiveRows(self, rows)
+
+
+class ArchiveRows:
+    """A selection of archive rows, indexed like a list of jobs"""
+
+    def __init__(self, archive: JobArchive, rows: Sequence[int]):
+        self.archive = archive
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> JobListing:
+        return self.archive[self.rows[index]]
+
+    def __iter__(self):
+        for row in self.rows:
+            yield self.archive[row]
+
+
+class _ColumnBuilder:
+    """Columns of an archive being written, starting from the rows of an existing one"""
+
+    def __init__(self, archive: Optional[JobArchive]):
+        self.fixed = {name: array(typecode) for name, typecode in _FIXED_COLUMNS.items()}
+        # Offsets and the encoded values, joined into the heap when written
+        self.strings: Dict[str, Tuple[array, List[bytes]]] = {name: (array('Q', [0]), []) for name in ('title', 'url')}
+        self.values: List[str] = []
+        self.value_ids: Dict[str, int] = {}
+        # Skill sets are pooled in their stored form, joined with _SKILL_SEPARATOR
+        self.skill_sets: List[str] = []
+        self.skill_set_ids: Dict[str, int] = {}
+
+        if archive is not None:
+            for name in self.fixed:
+                self.fixed[name].frombytes(archive._columns[name].tobytes())
+            for name in self.strings:
+                self.strings[name] = (array('Q', archive._columns[f"{name}_offsets"].tobytes()),
+                                      [archive._columns[f"{name}_heap"].tobytes()])
+            self.values = list(archive._values)
+            self.value_ids = dict(archive._value_ids)
+            self.skill_sets = [_SKILL_SEPARATOR.join(skills) for skills in archive._skill_sets]
+            self.skill_set_ids = {skills: set_id for set_id, skills in enumerate(self.skill_sets)}
+
+    def extend(self, rows: Iterable[Tuple[int, str, str, str, str, str, int, str]]):
+        """Append (job id, title, company, location, url, source site, scraped_ts, skill set) rows"""
+        job_ids, scraped_ts = self.fixed['job_id'], self.fixed['scraped_ts']
+        companies, locations, sources = self.fixed['company'], self.fixed['location'], self.fixed['source_site']
+        skill_set_column = self.fixed['skill_set']
+        values, value_ids = self.values, self.value_ids
+        skill_sets, skill_set_ids = self.skill_sets, self.skill_set_ids
+        titles, urls = [], []
+
+        # Hot loop over every stored job on a rebuild, so lookups are bound to locals
+        for job_id, title, company, location, url, source_site, timestamp, skills in rows:
+            job_ids.append(job_id)
+            scraped_ts.append(timestamp)
+            for column, value in ((companies, company), (locations, location), (sources, source_site)):
+                value_id = value_ids.get(value)
+                if value_id is None:
+                    value_id = value_ids[value] = len(values)
+                    values.append(value)
+                column.append(value_id)
+            set_id = skill_set_ids.get(skills)
+            if set_id is None:
+                set_id = skill_set_ids[skills] = len(skill_sets)
+                skill_sets.append(skills)
+            skill_set_column.append(set_id)
+            titles.append(title.encode("utf-8"))
+            urls.append(url.encode("utf-8"))
+
+        for name, encoded in (('title', titles), ('url', urls)):
+            offsets, chunks = self.strings[name]
+            offsets.extend(islice(accumulate(map(len, encoded), initial=offsets[-1]), 1, None))
+            chunks.extend(encoded)
+
+    def write(self, path: str, max_job_id: int):
+        """Write the archive to a temp file next to path, then move it to path, which must not exist yet"""
+        blobs: List[Tuple[str, str, bytes]] = [
+            (name, column.typecode, column.tobytes()) for name, column in self.fixed.items()
+        ]
+        pools = {'values': self.values, 'skill_sets': self.skill_sets}
+        for name in _STRING_COLUMNS:
+            if name in pools:
+                encoded = [value.encode("utf-8") for value in pools[name]]
+                offsets = array('Q', accumulate(map(len, encoded), initial=0))
+            else:
+                offsets, encoded = self.strings[name]
+            blobs.append((f"{name}_offsets", 'Q', offsets.tobytes()))
+            blobs.append((f"{name}_heap", 'B', b"".join(encoded)))
+
+        columns, offset = {}, _PREFIX.size
+        for name, typecode, data in blobs:
+            columns[name] = [offset, len(data), typecode]
+            offset += (len(data) + 7) // 8 * 8
+        directory = json.dumps({'rows': len(self.fixed['job_id']), 'max_job_id': max_job_id,
+                                'columns': columns}).encode("utf-8")
+
+        directory_name, file_name = os.path.split(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory_name, prefix=f"{file_name}.", suffix=".cols.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_PREFIX.pack(MAGIC, VERSION, offset, len(directory)))
+                for name, _, data in blobs:
+                    f.seek(columns[name][0])
+                    f.write(data)
+                f.seek(offset)
+                f.write(directory)
+            # Readers never see a partly written generation
+            os.rename(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+def update_job_archive(job_store: JobStore, path: str, rebuild: bool = False) -> JobArchive:
+    """Bring the archive of a job store up to date and return its newest generation, mapped.
+
+    ``path`` is the archive's base name (see ``archive_path``). Only jobs
+    added since the newest generation was written are read from the store,
+    unless ``rebuild`` is set (e.g. after stored skills changed).
+    """
+    with _writer_lock(path):
+        generations = _generations(path)
+        archive = open_job_archive(path, job_store.get_description) if not rebuild else None
+
+        max_job_id = job_store.conn.execute("SELECT IFNULL(MAX(id), 0) FROM jobs").fetchone()[0]
+        if archive is not None and archive.max_job_id == max_job_id:
+            return archive
+
+        builder = _ColumnBuilder(archive)
+        after = archive.max_job_id if archive is not None else 0
+        if archive is not None:
+            archive.close()
+
+        # scraped_at is naive local time, read back as JobListing does ('utc' converts from local time)
+        builder.extend(job_store.conn.execute(
+            "SELECT j.id, j.title, IFNULL(j.company, ''), IFNULL(j.location, ''), IFNULL(j.url, ''), "
+            "IFNULL(j.source_site, ''), IFNULL(CAST(strftime('%s', j.scraped_at, 'utc') AS INTEGER), 0), "
+            "IFNULL((SELECT group_concat(name, char(31)) FROM ("
+            "    SELECT s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+            "    WHERE js.job_id = j.id ORDER BY s.name)), '') "
+            "FROM jobs j WHERE j.id > ? AND j.id <= ? ORDER BY j.id",
+            (after, max_job_id)
+        ))
+
+        new_path = _generation_path(path, generations[0][0] + 1 if generations else 1)
+        builder.write(new_path, max_job_id)
+        _remove_old_files(path, new_path)
+    return JobArchive(new_path, job_store.get_description)
+
+
+class ArchiveUpdateThread(QThread):
+    """Runs update_job_archive on its own connection and reports the file of the new generation"""
+
+    archive_updated = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, db_path: str, rebuild: bool = False):
+        super().__init__()
+        self.db_path = db_path
+        self.rebuild = rebuild
+
+    def run(self):
+        store = None
+        try:
+            store = JobStore(self.db_path)
+            archive = update_job_archive(store, archive_path(self.db_path), rebuild=self.rebuild)
+            archive.close()
+            self.archive_updated.emit(archive.path)
+        except Exception as e:
+            self.error_occurred.emit(f"Error updating the job history archive: {str(e)}")
+        finally:
+            if store is not None:
+                store.close()
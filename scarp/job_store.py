@@ -0,0 +1,677 @@
+"""
+Persistent SQLite job store with incremental trend rollups
+"""
+
+import re
+import sqlite3
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Tuple, Set
+from data_models import JobListing, JobTable
+
+GRANULARITIES = ("day", "week")
+
+# bm25 weights of the search index columns: title, company, location, description, skills
+SEARCH_WEIGHTS = (10.0, 4.0, 2.0, 1.0, 6.0)
+
+# Decompressed descriptions kept by get_description, e.g. for moving through the jobs table
+DESCRIPTION_CACHE_SIZE = 128
+
+# SQL for the text of a jobs row's description, stored zlib-compressed in description_z
+DESCRIPTION_SQL = "job_description({0}description, {0}description_z)"
+
+
+def compress_description(text: Optional[str]) -> Optional[bytes]:
+    return zlib.compress(text.encode("utf-8")) if text else None
+
+
+def description_text(description: Optional[str], compressed: Optional[bytes]) -> str:
+    """Text of a stored description; rows written before compression keep it in the plain column"""
+    if compressed:
+        return zlib.decompress(compressed).decode("utf-8")
+    return description or ""
+
+
+def search_match_expression(text: str) -> str:
+    """FTS5 query matching every word of the text as a prefix, e.g. 'pyth dev' -> '"pyth"* "dev"*'"""
+    return " ".join(f'"{word}"*' for word in re.findall(r'[^\s"]+', text))
+
+
+def search_tokens(text: str) -> List[str]:
+    """Words of a text as the search index's tokenizer sees them: runs of letters and digits, folded"""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    return re.findall(r'[^\W_]+', "".join(char for char in folded if not unicodedata.combining(char)))
+
+
+def text_matches(text: str, fields: Iterable[Optional[str]]) -> bool:
+    """Whether the fields match the search text the way the index matches search_match_expression(text).
+    
+    For jobs not stored yet: every word of the text must occur in one field
+    as a phrase of tokens, the last of them as a prefix ('node.j' matches
+    'Node.js').
+    """
+    columns = [search_tokens(field) for field in fields if field]
+    for word in re.findall(r'[^\s"]+', text):
+        *exact, prefix = search_tokens(word) or [""]
+        if not prefix or not any(
+            tokens[start:start + len(exact)] == exact and tokens[start + len(exact)].startswith(prefix)
+            for tokens in columns for start in range(len(tokens) - len(exact))
+        ):
+            return False
+    return True
+
+
+def period_start(moment: datetime, granularity: str) -> str:
+    """Return the ISO date of the day/week bucket a timestamp falls into"""
+    day = moment.date()
+    if granularity == "week":
+        day = day - timedelta(days=day.weekday())
+    elif granularity != "day":
+        raise ValueError(f"Unknown granularity: {granularity}")
+    return day.isoformat()
+
+
+class JobStore:
+    """Stores scraped jobs and keeps skill demand rollups up to date"""
+
+    def __init__(self, db_path: str = "job_data.db", read_only: bool = False, check_same_thread: bool = True):
+        self.db_path = db_path
+        self._descriptions: "OrderedDict[int, str]" = OrderedDict()
+        if read_only:
+            # For readers such as the HTTP API: the schema is left alone and the
+            # connection may be shared between threads under the caller's lock
+            self.conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True,
+                                        timeout=30, check_same_thread=False)
+            self._register_functions()
+            self.has_search_index = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+            ).fetchone() is not None
+            # Databases written before descriptions were compressed have no description_z yet
+            self.has_compressed_descriptions = any(
+                row[1] == "description_z" for row in self.conn.execute("PRAGMA table_info(jobs)")
+            )
+            self.has_generation = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'store_generation'"
+            ).fetchone() is not None
+            return
+        self.has_compressed_descriptions = True
+        self.has_generation = True
+        # Without check_same_thread another thread may close the store once its user has finished
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=check_same_thread)
+        self._register_functions()
+        # Lets the main window read while the scrape daemon writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    def _register_functions(self):
+        self.conn.create_function("job_description", 2, description_text, deterministic=True)
+        self.conn.create_function("compress_description", 1, compress_description, deterministic=True)
+
+    def _create_tables(self):
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                company TEXT,
+                location TEXT,
+                description TEXT,
+                url TEXT,
+                source_site TEXT,
+                scraped_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS skills (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                category TEXT
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_skills (
+                job_id INTEGER,
+                skill_id INTEGER,
+                PRIMARY KEY (job_id, skill_id),
+                FOREIGN KEY (job_id) REFERENCES jobs (id),
+                FOREIGN KEY (skill_id) REFERENCES skills (id)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scraping_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                total_jobs INTEGER,
+                sites_scraped TEXT,
+                queries_used TEXT
+            )
+        ''')
+
+        # Rollups are only ever incremented, so trend queries never touch jobs
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS skill_demand_rollups (
+                granularity TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                category TEXT,
+                job_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, period_start, skill)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_demand_rollups (
+                granularity TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                category TEXT NOT NULL,
+                mention_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, period_start, category)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS period_job_totals (
+                granularity TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                total_jobs INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, period_start)
+            )
+        ''')
+
+        # Counts rewrites of stored data (skills, rollups, the search index), which readers
+        # cannot see in the job and session counts since those only grow with new jobs
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS store_generation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO store_generation (id, generation) VALUES (1, 0)")
+
+        self.add_column_if_missing("jobs", "session_id", "INTEGER REFERENCES scraping_sessions (id)")
+        if self.add_column_if_missing("jobs", "description_z", "BLOB"):
+            # One-time upgrade; the freed pages are reused by later inserts
+            cursor.execute(
+                "UPDATE jobs SET description_z = compress_description(description), description = NULL "
+                "WHERE description IS NOT NULL"
+            )
+
+        self.has_search_index = self._create_search_index(cursor)
+
+        self.conn.commit()
+
+    def _create_search_index(self, cursor) -> bool:
+        """Create the full-text index over stored jobs, filling it from existing rows the first time.
+
+        Returns False when SQLite was built without FTS5; searches then fall
+        back to LIKE scans.
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            # rowid is jobs.id; the prefix indexes keep short prefix queries cheap
+            cursor.execute(
+                "CREATE VIRTUAL TABLE jobs_fts USING fts5("
+                "title, company, location, description, skills, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except sqlite3.OperationalError:
+            return False
+
+        cursor.execute('''
+            INSERT INTO jobs_fts (rowid, title, company, location, description, skills)
+            SELECT j.id, j.title, j.company, j.location, job_description(j.description, j.description_z),
+                   (SELECT group_concat(s.name, ' ') FROM job_skills js
+                    JOIN skills s ON s.id = js.skill_id WHERE js.job_id = j.id)
+            FROM jobs j
+        ''')
+        return True
+
+    def description_sql(self, prefix: str = "") -> str:
+        """SQL for the text of a jobs row's description, e.g. description_sql('j.')"""
+        if self.has_compressed_descriptions:
+            return DESCRIPTION_SQL.format(prefix)
+        return f"{prefix}description"
+
+    def generation(self) -> int:
+        """How many times stored jobs' skills and the rollups have been rewritten"""
+        if not self.has_generation:
+            return 0
+        return self.conn.execute("SELECT generation FROM store_generation WHERE id = 1").fetchone()[0]
+
+    def _bump_generation(self, cursor: sqlite3.Cursor):
+        cursor.execute("UPDATE store_generation SET generation = generation + 1 WHERE id = 1")
+
+    def add_column_if_missing(self, table: str, column: str, definition: str) -> bool:
+        """Upgrade databases created by older versions of the schema; returns True if the column was added"""
+        columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+        if column in columns:
+            return False
+        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+
+    def close(self):
+        self.conn.close()
+
+    def save_session(self, jobs: List[JobListing], sites: Iterable[str], queries: Iterable[str],
+                     skill_categories: Dict[str, str]) -> int:
+        """Store a finished scraping session and fold it into the rollups.
+
+        ``skill_categories`` maps lowercased skill names to their category,
+        as in ``SkillAnalyzer.all_skills``.
+        """
+        with self.conn:
+            session_id = self._insert_session(sites, queries)
+            self._insert_jobs(session_id, jobs, skill_categories)
+
+        return session_id
+
+    def start_session(self, sites: Iterable[str], queries: Iterable[str]) -> int:
+        """Create an empty session that jobs are added to as they arrive"""
+        with self.conn:
+            return self._insert_session(sites, queries)
+
+    def add_session_jobs(self, session_id: int, jobs: List[JobListing], skill_categories: Dict[str, str]):
+        """Append jobs to a session and fold them into the rollups.
+
+        Runs in the connection's current transaction, so statements issued
+        just before the call are committed (or rolled back) together with it.
+        """
+        with self.conn:
+            self._insert_jobs(session_id, jobs, skill_categories)
+
+    def _insert_session(self, sites: Iterable[str], queries: Iterable[str]) -> int:
+        cursor = self.conn.execute(
+            "INSERT INTO scraping_sessions (session_date, total_jobs, sites_scraped, queries_used) "
+            "VALUES (?, 0, ?, ?)",
+            (datetime.now().isoformat(sep=' '), ", ".join(sites), ", ".join(queries))
+        )
+        return cursor.lastrowid
+
+    def _insert_jobs(self, session_id: int, jobs: List[JobListing], skill_categories: Dict[str, str]):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "UPDATE scraping_sessions SET total_jobs = total_jobs + ? WHERE id = ?",
+            (len(jobs), session_id)
+        )
+
+        skill_ids = {}
+        index_rows = []
+        for job in jobs:
+            cursor.execute(
+                "INSERT INTO jobs (title, company, location, description_z, url, source_site, scraped_at, session_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.title, job.company, job.location, compress_description(job.description), job.url,
+                 job.source_site, job.scraped_at.isoformat(sep=' '), session_id)
+            )
+            job_id = job.job_id = cursor.lastrowid
+
+            for skill in set(job.identified_skills):
+                if skill not in skill_ids:
+                    skill_ids[skill] = self._get_skill_id(cursor, skill, skill_categories.get(skill.lower()))
+                cursor.execute(
+                    "INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)",
+                    (job_id, skill_ids[skill])
+                )
+
+            index_rows.append((job_id, job.title, job.company, job.location, job.description,
+                               " ".join(job.identified_skills)))
+
+        if self.has_search_index:
+            cursor.executemany(
+                "INSERT INTO jobs_fts (rowid, title, company, location, description, skills) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                index_rows
+            )
+
+        self._update_rollups(cursor, jobs, skill_categories)
+
+    def _get_skill_id(self, cursor, name: str, category: Optional[str]) -> int:
+        cursor.execute("INSERT OR IGNORE INTO skills (name, category) VALUES (?, ?)", (name, category))
+        if category:
+            cursor.execute("UPDATE skills SET category = ? WHERE name = ?", (category, name))
+        cursor.execute("SELECT id FROM skills WHERE name = ?", (name,))
+        return cursor.fetchone()[0]
+
+    def _update_rollups(self, cursor, jobs: List[JobListing], skill_categories: Dict[str, str]):
+        """Add the jobs of one session to the day and week rollups"""
+        for granularity in GRANULARITIES:
+            job_totals = Counter()
+            skill_counts = Counter()
+            category_counts = Counter()
+
+            for job in jobs:
+                period = period_start(job.scraped_at, granularity)
+                job_totals[period] += 1
+                for skill in set(job.identified_skills):
+                    skill_counts[(period, skill)] += 1
+                    category = skill_categories.get(skill.lower())
+                    if category:
+                        category_counts[(period, category)] += 1
+
+            cursor.executemany(
+                "INSERT INTO period_job_totals (granularity, period_start, total_jobs) VALUES (?, ?, ?) "
+                "ON CONFLICT (granularity, period_start) DO UPDATE SET total_jobs = total_jobs + excluded.total_jobs",
+                [(granularity, period, count) for period, count in job_totals.items()]
+            )
+            cursor.executemany(
+                "INSERT INTO skill_demand_rollups (granularity, period_start, skill, category, job_count) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (granularity, period_start, skill) DO UPDATE SET "
+                "job_count = job_count + excluded.job_count, category = excluded.category",
+                [(granularity, period, skill, skill_categories.get(skill.lower()), count)
+                 for (period, skill), count in skill_counts.items()]
+            )
+            cursor.executemany(
+                "INSERT INTO category_demand_rollups (granularity, period_start, category, mention_count) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (granularity, period_start, category) DO UPDATE SET "
+                "mention_count = mention_count + excluded.mention_count",
+                [(granularity, period, category, count)
+                 for (period, category), count in category_counts.items()]
+            )
+
+    def replace_job_skills(self, found: List[Tuple[int, List[str]]], skills: Set[str],
+                           skill_categories: Dict[str, str], update_categories: bool = False) -> int:
+        """Replace some of the skills of stored jobs, e.g. after the vocabulary changed.
+
+        ``found`` holds (job id, skills now found) for the lowercased
+        ``skills``; the jobs' other skills are left alone. Rollups and the
+        search index follow in the same transaction, as do the category
+        rollups if ``update_categories`` is set, and statements issued on
+        the connection just before the call are committed with it. Returns
+        the number of jobs whose skills changed.
+        """
+        job_ids = [job_id for job_id, _ in found]
+        placeholders = ', '.join('?' for _ in job_ids)
+
+        with self.conn:
+            current: Dict[int, Dict[str, Tuple[int, str]]] = {}
+            for job_id, skill_id, name in self.conn.execute(
+                "SELECT js.job_id, s.id, s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+                f"WHERE js.job_id IN ({placeholders})", job_ids
+            ):
+                if name.lower() in skills:
+                    current.setdefault(job_id, {})[name.lower()] = (skill_id, name)
+            scraped_at = dict(self.conn.execute(
+                f"SELECT id, scraped_at FROM jobs WHERE id IN ({placeholders})", job_ids
+            ))
+
+            cursor = self.conn.cursor()
+            skill_ids = {}
+            deltas = Counter()
+            changed = []
+            for job_id, job_skills in found:
+                old = current.get(job_id, {})
+                new = {skill.lower(): skill for skill in job_skills}
+                removed = [old[key] for key in old.keys() - new.keys()]
+                added = [new[key] for key in new.keys() - old.keys()]
+                if not removed and not added:
+                    continue
+                changed.append(job_id)
+
+                cursor.executemany("DELETE FROM job_skills WHERE job_id = ? AND skill_id = ?",
+                                   [(job_id, skill_id) for skill_id, _ in removed])
+                for skill in added:
+                    if skill not in skill_ids:
+                        skill_ids[skill] = self._get_skill_id(cursor, skill, skill_categories.get(skill.lower()))
+                    cursor.execute("INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)",
+                                   (job_id, skill_ids[skill]))
+
+                moment = datetime.fromisoformat(scraped_at[job_id])
+                for granularity in GRANULARITIES:
+                    period = period_start(moment, granularity)
+                    for _, skill in removed:
+                        deltas[(granularity, period, skill)] -= 1
+                    for skill in added:
+                        deltas[(granularity, period, skill)] += 1
+
+            # Category rollups are rebuilt from these by _apply_skill_categories
+            cursor.executemany(
+                "INSERT INTO skill_demand_rollups (granularity, period_start, skill, category, job_count) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (granularity, period_start, skill) DO UPDATE SET job_count = job_count + excluded.job_count",
+                [(granularity, period, skill, skill_categories.get(skill.lower()), delta)
+                 for (granularity, period, skill), delta in deltas.items() if delta]
+            )
+            cursor.execute("DELETE FROM skill_demand_rollups WHERE job_count <= 0")
+
+            if changed and self.has_search_index:
+                cursor.execute(
+                    "UPDATE jobs_fts SET skills = (SELECT group_concat(s.name, ' ') FROM job_skills js "
+                    "JOIN skills s ON s.id = js.skill_id WHERE js.job_id = jobs_fts.rowid) "
+                    f"WHERE rowid IN ({', '.join('?' for _ in changed)})",
+                    changed
+                )
+
+            if update_categories:
+                self._apply_skill_categories(cursor, skill_categories)
+            if changed or update_categories:
+                self._bump_generation(cursor)
+        return len(changed)
+
+    def set_skill_categories(self, skill_categories: Dict[str, str]):
+        """Move skills to their current categories and rebuild the category rollups to match"""
+        with self.conn:
+            cursor = self.conn.cursor()
+            self._apply_skill_categories(cursor, skill_categories)
+            self._bump_generation(cursor)
+
+    def _apply_skill_categories(self, cursor: sqlite3.Cursor, skill_categories: Dict[str, str]):
+        cursor.executemany("UPDATE skills SET category = ? WHERE lower(name) = ?",
+                           [(category, skill) for skill, category in skill_categories.items()])
+        cursor.execute(
+            "UPDATE skill_demand_rollups SET category = "
+            "(SELECT s.category FROM skills s WHERE s.name = skill_demand_rollups.skill) "
+            "WHERE skill IN (SELECT name FROM skills)"
+        )
+        # Each job counts once per skill, so a category's mentions are the job counts of its skills
+        cursor.execute("DELETE FROM category_demand_rollups")
+        cursor.execute(
+            "INSERT INTO category_demand_rollups (granularity, period_start, category, mention_count) "
+            "SELECT granularity, period_start, category, SUM(job_count) FROM skill_demand_rollups "
+            "WHERE category IS NOT NULL AND category != '' GROUP BY granularity, period_start, category"
+        )
+
+    def get_description(self, job_id: int) -> str:
+        """A stored job's description, decompressed on demand and kept in a small LRU cache"""
+        description = self._descriptions.get(job_id)
+        if description is not None:
+            self._descriptions.move_to_end(job_id)
+            return description
+
+        row = self.conn.execute(f"SELECT {self.description_sql()} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        description = (row[0] or "") if row else ""
+        self._descriptions[job_id] = description
+        if len(self._descriptions) > DESCRIPTION_CACHE_SIZE:
+            self._descriptions.popitem(last=False)
+        return description
+
+    def matching_job_ids(self, text: str, session_id: Optional[int] = None) -> Set[int]:
+        """Ids of stored jobs, of one session if given, matching every word of the text as a prefix.
+        
+        Words may match any field or skill of a job, as in text_matches.
+        """
+        expression = search_match_expression(text)
+        if not expression:
+            return set()
+        session_filter, params = ("AND j.session_id = ?", [session_id]) if session_id is not None else ("", [])
+        if self.has_search_index:
+            return {job_id for job_id, in self.conn.execute(
+                f"SELECT j.id FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid WHERE jobs_fts MATCH ? {session_filter}",
+                [expression] + params
+            )}
+
+        skills_by_job: Dict[int, List[str]] = {}
+        for job_id, skill in self.conn.execute(
+            f"SELECT js.job_id, s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+            f"JOIN jobs j ON j.id = js.job_id WHERE 1 = 1 {session_filter}", params
+        ):
+            skills_by_job.setdefault(job_id, []).append(skill)
+        return {
+            job_id
+            for job_id, title, company, location, description in self.conn.execute(
+                f"SELECT j.id, j.title, j.company, j.location, {self.description_sql('j.')} FROM jobs j "
+                f"WHERE 1 = 1 {session_filter}", params
+            )
+            if text_matches(text, (title, company, location, description, *skills_by_job.get(job_id, ())))
+        }
+
+    def load_session_jobs(self, session_id: int) -> JobTable:
+        """Load the jobs of one stored session with their identified skills.
+
+        Descriptions are not read; the jobs load them through get_description.
+        """
+        skills_by_job = {}
+        for job_id, skill in self.conn.execute(
+            "SELECT js.job_id, s.name FROM job_skills js "
+            "JOIN skills s ON s.id = js.skill_id "
+            "JOIN jobs j ON j.id = js.job_id WHERE j.session_id = ?",
+            (session_id,)
+        ):
+            skills_by_job.setdefault(job_id, []).append(skill)
+
+        jobs = JobTable(description_loader=self.get_description)
+        for row in self.conn.execute(
+            "SELECT id, title, company, location, url, source_site, scraped_at "
+            "FROM jobs WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        ):
+            job_id, title, company, location, url, source_site, scraped_at = row
+            jobs.append(JobListing(
+                title=title,
+                company=company or "",
+                location=location or "",
+                description=None,
+                url=url or "",
+                source_site=source_site or "",
+                scraped_at=datetime.fromisoformat(scraped_at) if scraped_at else datetime.now(),
+                identified_skills=skills_by_job.get(job_id, []),
+                job_id=job_id,
+                description_loader=self.get_description
+            ))
+        return jobs
+
+    def search_jobs(self, text: str, source_site: Optional[str] = None, location: Optional[str] = None,
+                    limit: int = 500) -> List[Tuple[JobListing, str]]:
+        """Stored jobs of every session matching all words of the text as prefixes, best first.
+
+        Each job comes with a snippet of the text around the match, the
+        matched terms in [brackets].
+        """
+        expression = search_match_expression(text)
+        if not expression:
+            return []
+
+        filters, params = "", []
+        if source_site:
+            filters += " AND j.source_site = ?"
+            params.append(source_site)
+        if location:
+            filters += " AND j.location = ?"
+            params.append(location)
+
+        if self.has_search_index:
+            weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+            rows = self.conn.execute(
+                "SELECT j.id, j.title, j.company, j.location, j.url, j.source_site, "
+                "j.scraped_at, snippet(jobs_fts, -1, '[', ']', '...', 12) "
+                "FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid "
+                f"WHERE jobs_fts MATCH ?{filters} ORDER BY bm25(jobs_fts, {weights}) LIMIT ?",
+                [expression] + params + [limit]
+            ).fetchall()
+        else:
+            words = text.split()
+            conditions = " AND (j.title || ' ' || IFNULL(j.company, '') || ' ' || IFNULL(j.location, '') " \
+                         f"|| ' ' || {self.description_sql('j.')}) LIKE ?" * len(words)
+            rows = self.conn.execute(
+                "SELECT j.id, j.title, j.company, j.location, j.url, j.source_site, "
+                "j.scraped_at, '' "
+                f"FROM jobs j WHERE 1 = 1{conditions}{filters} ORDER BY j.id DESC LIMIT ?",
+                [f"%{word}%" for word in words] + params + [limit]
+            ).fetchall()
+
+        skills_by_job: Dict[int, List[str]] = {}
+        job_ids = [row[0] for row in rows]
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            for job_id, skill in self.conn.execute(
+                "SELECT js.job_id, s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+                f"WHERE js.job_id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ):
+                skills_by_job.setdefault(job_id, []).append(skill)
+
+        return [
+            (JobListing(
+                title=title,
+                company=company or "",
+                location=location or "",
+                description=None,
+                url=url or "",
+                source_site=source_site or "",
+                scraped_at=datetime.fromisoformat(scraped_at) if scraped_at else datetime.now(),
+                identified_skills=skills_by_job.get(job_id, []),
+                job_id=job_id,
+                description_loader=self.get_description
+            ), snippet)
+            for job_id, title, company, location, url, source_site, scraped_at, snippet in rows
+        ]
+
+    def get_session_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM scraping_sessions").fetchone()[0]
+
+    def get_latest_session(self) -> Optional[Tuple[int, int]]:
+        """(id, total jobs) of the most recent session that has any jobs"""
+        return self.conn.execute(
+            "SELECT id, total_jobs FROM scraping_sessions WHERE total_jobs > 0 ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+
+    def get_period_totals(self, granularity: str = "week", since: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Number of jobs stored per period"""
+        return self.conn.execute(
+            "SELECT period_start, total_jobs FROM period_job_totals "
+            "WHERE granularity = ? AND period_start >= ? ORDER BY period_start",
+            (granularity, since or "")
+        ).fetchall()
+
+    def get_skill_rollups(self, granularity: str = "week", since: Optional[str] = None,
+                          skills: Optional[List[str]] = None) -> List[Tuple[str, str, int]]:
+        """(period, skill, job count) rows from the skill rollup"""
+        query = ("SELECT period_start, skill, job_count FROM skill_demand_rollups "
+                 "WHERE granularity = ? AND period_start >= ?")
+        params = [granularity, since or ""]
+        if skills:
+            query += f" AND skill IN ({', '.join('?' for _ in skills)})"
+            params.extend(skills)
+        return self.conn.execute(query + " ORDER BY period_start", params).fetchall()
+
+    def get_category_rollups(self, granularity: str = "week",
+                             since: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        """(period, category, mention count) rows from the category rollup"""
+        return self.conn.execute(
+            "SELECT period_start, category, mention_count FROM category_demand_rollups "
+            "WHERE granularity = ? AND period_start >= ? ORDER BY period_start",
+            (granularity, since or "")
+        ).fetchall()
+
+    def get_top_skills(self, granularity: str = "week", since: Optional[str] = None,
+                       limit: int = 10) -> List[Tuple[str, int]]:
+        """Skills with the most demand over the selected periods"""
+        return self.conn.execute(
+            "SELECT skill, SUM(job_count) AS total FROM skill_demand_rollups "
+            "WHERE granularity = ? AND period_start >= ? "
+            "GROUP BY skill ORDER BY total DESC, skill LIMIT ?",
+            (granularity, since or "", limit)
+        ).fetchall()
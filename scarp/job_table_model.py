@@ -0,0 +1,76 @@
+"""
+Table model behind the jobs view.
+
+The view asks only for the rows on screen, so the model can show a list of
+scraped jobs or the whole memory-mapped history (JobArchive/ArchiveRows)
+without creating an item per cell up front.
+"""
+
+from collections import OrderedDict
+from typing import Sequence
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from data_models import JobListing
+
+HEADERS = ("Title", "Company", "Location", "Source", "Skills", "URL")
+
+# Rows kept materialized; sizing columns to their contents samples rows once per column
+ROW_CACHE_SIZE = 1024
+
+
+class JobTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: Sequence[JobListing] = []
+        # Archive rows are materialized on access, and the view reads each row once per column
+        self._cache: "OrderedDict[int, JobListing]" = OrderedDict()
+
+    def set_rows(self, rows: Sequence[JobListing]):
+        self.beginResetModel()
+        self.rows = rows
+        self._cache.clear()
+        self.endResetModel()
+
+    def append(self, job: JobListing):
+        """Add a job to the rows shown, which must be a list"""
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append(job)
+        self.endInsertRows()
+
+    def job(self, row: int) -> JobListing:
+        job = self._cache.get(row)
+        if job is None:
+            job = self._cache[row] = self.rows[row]
+            if len(self._cache) > ROW_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(row)
+        return job
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        job = self.job(index.row())
+        column = index.column()
+        if column == 0:
+            return job.title
+        if column == 1:
+            return job.company
+        if column == 2:
+            return job.location
+        if column == 3:
+            return job.source_site
+        if column == 4:
+            return ", ".join(job.identified_skills)
+        return job.url
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
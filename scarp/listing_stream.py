@@ -0,0 +1,114 @@
+"""
+Incremental parsing of search pages while they download.
+
+The body is decoded and fed to lxml's incremental HTML parser chunk by
+chunk. Reading can stop as soon as the first ``limit`` listing elements
+(in page order, as ``find_all`` would return them) are complete, or as
+soon as ``limit`` JSON-LD job postings have been seen. The rest of a heavy
+page is then neither downloaded nor parsed. Only the listing elements are
+turned into BeautifulSoup elements for the extraction heuristics.
+"""
+
+import codecs
+from typing import Optional, Pattern, Sequence
+
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
+from lxml import etree
+from structured_data import block_postings
+
+# Bytes read from the network per chunk
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Chunks a download may run ahead of the parser
+STREAM_READ_AHEAD = 2
+
+# A charset declared in the page is looked for in this many leading bytes
+_SNIFF_BYTES = 1024
+
+
+class ListingCutoff:
+    """Collects the first ``limit`` elements with one of ``tags`` and a class matching ``class_pattern``"""
+
+    def __init__(self, limit: int, tags: Sequence[str], class_pattern: Pattern,
+                 encoding: Optional[str] = None):
+        self.limit = limit
+        self.tags = frozenset(tags)
+        self.class_pattern = class_pattern
+        # From the Content-Type header if given; otherwise from the page, else UTF-8
+        self.encoding = encoding
+        self.postings = 0
+        self.complete = False
+        self._parser = etree.HTMLPullParser(events=("start", "end"))
+        self._decoder = None
+        self._pending = b""
+        self._listings = []
+        self._closed = 0
+        self._closed_parser = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parse the next chunk of the body; returns True once the rest is not needed"""
+        if self.complete:
+            return True
+        if self._decoder is None:
+            self._pending += chunk
+            if len(self._pending) < _SNIFF_BYTES:
+                return False
+            chunk, self._pending = self._pending, b""
+            self._start_decoding(chunk)
+        self._parser.feed(self._decoder.decode(chunk))
+        self._read_events()
+        return self.complete
+
+    def _start_decoding(self, head: bytes):
+        encoding = self.encoding or EncodingDetector.find_declared_encoding(head, is_html=True) or "utf-8"
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def _read_events(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag
+            if not isinstance(tag, str):
+                # Comments and processing instructions
+                continue
+            if event == "start":
+                if (len(self._listings) < self.limit and tag in self.tags
+                        and self.class_pattern.search(element.get("class") or "")):
+                    self._listings.append(element)
+            elif tag in self.tags and any(element is listing for listing in self._listings):
+                self._closed += 1
+                if self._closed == self.limit:
+                    self.complete = True
+            elif tag == "script" and "ld+json" in (element.get("type") or ""):
+                self.postings += len(block_postings((element.text or "").encode("utf-8")))
+                if self.postings >= self.limit:
+                    self.complete = True
+
+    def close(self):
+        """Finish parsing after the last chunk, closing any open elements"""
+        if self._closed_parser:
+            return
+        self._closed_parser = True
+        if self._decoder is None:
+            self._start_decoding(self._pending)
+            self._parser.feed(self._decoder.decode(self._pending))
+        self._parser.feed(self._decoder.decode(b"", final=True))
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            # Nothing parseable, e.g. an empty body
+            pass
+        self._read_events()
+
+    def elements(self) -> list:
+        """The listing elements found, as BeautifulSoup elements in page order"""
+        self.close()
+        elements = []
+        for listing in self._listings:
+            markup = etree.tostring(listing, encoding="unicode", method="html", with_tail=False)
+            element = BeautifulSoup(markup, 'html.parser').find(listing.tag)
+            if element is not None:
+                elements.append(element)
+        return elements
@@ -1,5 +1,4 @@
 import sys
-import os
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
 from main_window import MainWindow
@@ -1,26 +1,33 @@
-import sys
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
-    QPushButton, QTableWidget, QTableWidgetItem, QTextEdit, QLabel,
-    QProgressBar, QSplitter, QGroupBox, QListWidget, QListWidgetItem,
-    QMessageBox, QFileDialog, QStatusBar, QHeaderView, QAbstractItemView,
-    QLineEdit, QComboBox
+    QPushButton, QTableView, QTextEdit, QLabel,
+    QProgressBar, QGroupBox, QListWidget, QListWidgetItem,
+    QMessageBox, QStatusBar, QHeaderView, QAbstractItemView,
+    QLineEdit, QComboBox, QCheckBox
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSlot
-from PyQt6.QtGui import QFont, QIcon, QPixmap
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import numpy as np
+from PyQt6.QtCore import QTimer, pyqtSlot
 
+# matplotlib (charts), requests/bs4 (scraper) and python-docx (exports) are
+# imported where they are first needed so they stay off the startup path
 from config_manager import ConfigManager
-from scraper import JobScraper
 from skill_analyzer import SkillAnalyzer
 from export_manager import ExportManager
 from data_models import JobListing, ScrapingConfig
-from config_dialog import ConfigDialog
+from job_store import JobStore, text_matches
+from trend_analyzer import TrendAnalyzer
+from analytics_cache import AnalyticsCache
+from scrape_metrics import ScrapeMetrics
+from scrape_progress import ProgressSnapshot
+from crawl_queue import CrawlQueue
+from discovery import DiscoveryState
+from job_archive import JobArchive, ArchiveRows, ArchiveUpdateThread, archive_path, open_job_archive
+from job_table_model import JobTableModel
+from skill_reanalysis import SkillReanalyzer, ReanalysisThread
+
+# History searches show at most this many of the best matches
+HISTORY_SEARCH_LIMIT = 500
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -29,18 +36,121 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1400, 900)
         
         self.config_manager = ConfigManager()
-        self.config = self.config_manager.load_config()
-        self.skill_analyzer = SkillAnalyzer(self.config.skill_categories)
         self.export_manager = ExportManager()
         
+        # Filled in by load_startup_data once the window is on screen
+        self.config: ScrapingConfig = None
+        self.skill_analyzer: SkillAnalyzer = None
+        self.job_store: JobStore = None
+        self.trend_analyzer: TrendAnalyzer = None
+        self.analytics: AnalyticsCache = None
+        self.crawl_queue: CrawlQueue = None
+        # Memory-mapped copy of every stored job, browsed with "All history"
+        self.history_archive: Optional[JobArchive] = None
+        # Writes the archive's next generation off the UI thread; None, or whether a rebuild is due
+        self.archive_update: Optional[ArchiveUpdateThread] = None
+        self._archive_update_pending: Optional[bool] = None
+        self._startup_scheduled = False
+        
         self.jobs: List[JobListing] = []
-        self.filtered_jobs: List[JobListing] = []
+        self.filtered_jobs: List[JobListing] = self.jobs
+        # Matched text of each history search result
+        self.search_snippets: Dict[JobListing, str] = {}
         self.skill_stats: Dict = {}
         
         self.scraper = None
+        # Set while a run's scraping_finished has not been handled, so its jobs are saved once
+        self._run_pending = False
+        # Set once the window was asked to close while threads were still running
+        self._closing = False
+        # Brings stored job skills in line with the vocabulary after it changes
+        self.reanalysis: Optional[ReanalysisThread] = None
+        self._reanalysis_pending = False
+        # Replaced by the scraper's own metrics when a run starts
+        self.run_metrics = ScrapeMetrics()
+        self.skill_canvas = None
+        self.trend_canvas = None
+        self._skill_charts_dirty = False
+        self._trend_charts_dirty = True
+        
+        # Coalesces analysis refreshes while jobs stream in during a scrape
+        self.live_analysis_timer = QTimer(self)
+        self.live_analysis_timer.setSingleShot(True)
+        self.live_analysis_timer.setInterval(500)
+        self.live_analysis_timer.timeout.connect(self.refresh_live_analysis)
+        
+        # Picks up sessions that the scrape daemon writes into the store
+        self._shown_session = None
+        self.store_poll_timer = QTimer(self)
+        self.store_poll_timer.setInterval(30000)
+        self.store_poll_timer.timeout.connect(self.check_for_new_sessions)
+        
+        # Filters once typing pauses rather than on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.filter_jobs)
         
         self.init_ui()
         self.setup_status_bar()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._startup_scheduled:
+            self._startup_scheduled = True
+            QTimer.singleShot(0, self.load_startup_data)
+    
+    def load_startup_data(self):
+        """Load configuration, the job store and cached analytics after the first paint"""
+        self.config = self.config_manager.load_config()
+        self.skill_analyzer = SkillAnalyzer(self.config.skill_categories)
+        self.job_store = JobStore()
+        self.trend_analyzer = TrendAnalyzer(self.job_store)
+        self.analytics = AnalyticsCache(self.job_store)
+        self.crawl_queue = CrawlQueue(self.job_store)
+        self.update_history_archive()
+        
+        self.update_config_summary()
+        self.load_cached_analytics()
+        self.refresh_visible_charts()
+        self.start_reanalysis()
+        
+        self.start_button.setEnabled(True)
+        for button in self.config_buttons:
+            button.setEnabled(True)
+        self.status_bar.showMessage("Ready to scrape job listings")
+        
+        self.check_for_new_sessions()
+        self.store_poll_timer.start()
+    
+    def check_for_new_sessions(self):
+        """Show the newest stored session once it is complete, e.g. after a scheduled run.
+        
+        Sessions of a scheduled run still in progress are left alone until
+        the run finishes; the search text and filters are kept.
+        """
+        if self.scraper and self.scraper.isRunning():
+            return
+        
+        latest = self.crawl_queue.latest_finished_session()
+        if latest is None or latest == self._shown_session:
+            return
+        
+        self._shown_session = latest
+        session_id, total_jobs = latest
+        self.update_history_archive()
+        self.jobs[:] = self.job_store.load_session_jobs(session_id)
+        self.update_filter_options()
+        self.filter_jobs()
+        self.load_cached_analytics()
+        self.update_trend_charts()
+        
+        message = f"Showing {total_jobs} jobs from stored session {session_id}"
+        run = self.crawl_queue.latest_run()
+        if run and run['status'] == "running":
+            items = run['items']
+            message += f" (scheduled run in progress: {items['done']}/{sum(items.values())} pages)"
+        self.status_bar.showMessage(message)
         
     def init_ui(self):
         central_widget = QWidget()
@@ -56,6 +166,7 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.progress_bar)
         
         self.tab_widget = QTabWidget()
+        self.tab_widget.currentChanged.connect(self.refresh_visible_charts)
         
         self.jobs_tab = self.create_jobs_tab()
         self.tab_widget.addTab(self.jobs_tab, "Job Listings")
@@ -63,6 +174,9 @@ class MainWindow(QMainWindow):
         self.analysis_tab = self.create_analysis_tab()
         self.tab_widget.addTab(self.analysis_tab, "Skill Analysis")
         
+        self.trends_tab = self.create_trends_tab()
+        self.tab_widget.addTab(self.trends_tab, "Demand Trends")
+        
         self.config_tab = self.create_config_tab()
         self.tab_widget.addTab(self.config_tab, "Configuration")
         
@@ -91,6 +205,7 @@ class MainWindow(QMainWindow):
             }
         """)
         self.start_button.clicked.connect(self.start_scraping)
+        self.start_button.setEnabled(False)
         layout.addWidget(self.start_button)
         
         self.stop_button = QPushButton("⏹ Stop")
@@ -124,7 +239,9 @@ class MainWindow(QMainWindow):
         
         config_btn = QPushButton("⚙ Configure")
         config_btn.clicked.connect(self.open_config_dialog)
+        config_btn.setEnabled(False)
         layout.addWidget(config_btn)
+        self.config_buttons = [config_btn]
         
         return panel
     
@@ -135,11 +252,9 @@ class MainWindow(QMainWindow):
         search_panel = self.create_search_panel()
         layout.addWidget(search_panel)
         
-        self.jobs_table = QTableWidget()
-        self.jobs_table.setColumnCount(6)
-        self.jobs_table.setHorizontalHeaderLabels([
-            "Title", "Company", "Location", "Source", "Skills", "URL"
-        ])
+        self.jobs_model = JobTableModel(self)
+        self.jobs_table = QTableView()
+        self.jobs_table.setModel(self.jobs_model)
         
         header = self.jobs_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
@@ -148,10 +263,12 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
+        # Columns are sized from a sample of rows, which matters when the whole history is shown
+        header.setResizeContentsPrecision(200)
         
         self.jobs_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.jobs_table.setAlternatingRowColors(True)
-        self.jobs_table.itemSelectionChanged.connect(self.on_job_selected)
+        self.jobs_table.selectionModel().selectionChanged.connect(self.on_job_selected)
         
         layout.addWidget(self.jobs_table)
         
@@ -170,9 +287,14 @@ class MainWindow(QMainWindow):
         layout.addWidget(QLabel("Search:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by title, company, location, or skills...")
-        self.search_input.textChanged.connect(self.filter_jobs)
+        self.search_input.textChanged.connect(self.search_timer.start)
         layout.addWidget(self.search_input)
         
+        self.history_check = QCheckBox("All history")
+        self.history_check.setToolTip("Browse and search every stored session instead of the jobs shown")
+        self.history_check.toggled.connect(self.toggle_history)
+        layout.addWidget(self.history_check)
+        
         layout.addWidget(QLabel("Source:"))
         self.source_filter = QComboBox()
         self.source_filter.addItem("All Sources")
@@ -221,17 +343,66 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(left_panel, 1)
         
-        right_panel = QWidget()
-        right_layout = QVBoxLayout(right_panel)
+        # The chart canvas is created the first time the tab is shown
+        self.analysis_charts_panel = QWidget()
+        QVBoxLayout(self.analysis_charts_panel)
+        layout.addWidget(self.analysis_charts_panel, 2)
+        
+        return widget
+    
+    def create_trends_tab(self) -> QWidget:
+        """Create the skill demand trends tab"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        controls = QHBoxLayout()
+        
+        controls.addWidget(QLabel("Group by:"))
+        self.trend_granularity = QComboBox()
+        self.trend_granularity.addItem("Week", "week")
+        self.trend_granularity.addItem("Day", "day")
+        self.trend_granularity.currentIndexChanged.connect(self.update_trend_charts)
+        controls.addWidget(self.trend_granularity)
+        
+        self.trend_normalize = QCheckBox("Show as share of jobs")
+        self.trend_normalize.toggled.connect(self.update_trend_charts)
+        controls.addWidget(self.trend_normalize)
         
-        self.figure = Figure(figsize=(10, 8))
-        self.canvas = FigureCanvas(self.figure)
-        right_layout.addWidget(self.canvas)
+        controls.addStretch()
         
-        layout.addWidget(right_panel, 2)
+        self.trend_sessions_label = QLabel()
+        controls.addWidget(self.trend_sessions_label)
+        
+        layout.addLayout(controls)
+        
+        self.trend_charts_panel = QWidget()
+        QVBoxLayout(self.trend_charts_panel)
+        layout.addWidget(self.trend_charts_panel, 1)
         
         return widget
     
+    def refresh_visible_charts(self):
+        """Build and redraw the charts of the current tab if they are out of date"""
+        current = self.tab_widget.currentWidget()
+        if self.config is None:
+            return
+        
+        if current is self.analysis_tab and self._skill_charts_dirty:
+            if self.skill_canvas is None:
+                from charts import SkillChartCanvas
+                self.skill_canvas = SkillChartCanvas(self.analysis_charts_panel)
+                self.analysis_charts_panel.layout().addWidget(self.skill_canvas)
+            self._skill_charts_dirty = False
+            self.skill_canvas.update_charts(self.skill_stats)
+        
+        elif current is self.trends_tab and self._trend_charts_dirty:
+            if self.trend_canvas is None:
+                from charts import TrendChartCanvas
+                self.trend_canvas = TrendChartCanvas(self.trend_charts_panel)
+                self.trend_charts_panel.layout().addWidget(self.trend_canvas)
+            self._trend_charts_dirty = False
+            self.draw_trend_charts()
+    
     def create_config_tab(self) -> QWidget:
         widget = QWidget()
         layout = QVBoxLayout(widget)
@@ -241,7 +412,7 @@ class MainWindow(QMainWindow):
         
         self.config_summary = QTextEdit()
         self.config_summary.setReadOnly(True)
-        self.update_config_summary()
+        self.config_summary.setPlaceholderText("Loading configuration...")
         config_layout.addWidget(self.config_summary)
         
         layout.addWidget(config_group)
@@ -250,11 +421,14 @@ class MainWindow(QMainWindow):
         
         edit_config_btn = QPushButton("Edit Configuration")
         edit_config_btn.clicked.connect(self.open_config_dialog)
+        edit_config_btn.setEnabled(False)
         button_layout.addWidget(edit_config_btn)
         
         reload_config_btn = QPushButton("Reload Configuration")
         reload_config_btn.clicked.connect(self.reload_config)
+        reload_config_btn.setEnabled(False)
         button_layout.addWidget(reload_config_btn)
+        self.config_buttons.extend([edit_config_btn, reload_config_btn])
         
         button_layout.addStretch()
         
@@ -266,19 +440,50 @@ class MainWindow(QMainWindow):
     def setup_status_bar(self):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
-        self.status_bar.showMessage("Ready to scrape job listings")
+        self.status_bar.showMessage("Loading configuration...")
     
     def filter_jobs(self):
-        search_text = self.search_input.text().lower()
+        search_text = self.search_input.text().strip()
         source_filter = self.source_filter.currentText()
         location_filter = self.location_filter.currentText()
+        self.search_snippets.clear()
+        self.search_timer.stop()
+        
+        if len(search_text) >= 2 and self.history_check.isChecked():
+            self.search_history()
+            return
+        
+        if self.history_check.isChecked() and self.history_archive is not None:
+            conditions = {}
+            if source_filter != "All Sources":
+                conditions['source_site'] = source_filter
+            if location_filter != "All Locations":
+                conditions['location'] = location_filter
+            self.filtered_jobs = self.history_archive.rows_where(**conditions)
+            self.update_jobs_table()
+            self.update_results_count()
+            return
+        
+        if not search_text and source_filter == "All Sources" and location_filter == "All Locations":
+            self.filtered_jobs = self.jobs
+            self.update_jobs_table()
+            self.update_results_count()
+            return
         
         self.filtered_jobs = []
+        # Stored jobs are matched through the search index, without loading their descriptions;
+        # text_matches applies the same rule to jobs of a run that is not stored yet
+        stored_matches = self.job_store.matching_job_ids(
+            search_text, self._shown_session[0] if self._shown_session else None
+        ) if search_text else set()
         
         for job in self.jobs:
             if search_text:
-                searchable_text = f"{job.title} {job.company} {job.location} {job.description} {' '.join(job.identified_skills)}".lower()
-                if search_text not in searchable_text:
+                if job.job_id is not None:
+                    if job.job_id not in stored_matches:
+                        continue
+                elif not text_matches(search_text, (job.title, job.company, job.location, job.description,
+                                                    *job.identified_skills)):
                     continue
             
             if source_filter != "All Sources" and job.source_site != source_filter:
@@ -292,45 +497,104 @@ class MainWindow(QMainWindow):
         self.update_jobs_table()
         self.update_results_count()
     
+    def search_history(self):
+        """Full-text search over every stored session, without loading them"""
+        search_text = self.search_input.text()
+        source_filter = self.source_filter.currentText()
+        location_filter = self.location_filter.currentText()
+        results = self.job_store.search_jobs(
+            search_text,
+            source_site=source_filter if source_filter != "All Sources" else None,
+            location=location_filter if location_filter != "All Locations" else None,
+            limit=HISTORY_SEARCH_LIMIT
+        )
+        self.filtered_jobs = [job for job, _ in results]
+        self.search_snippets = {job: snippet for job, snippet in results if snippet}
+        self.update_jobs_table()
+        
+        count = len(results)
+        self.results_label.setText(f"{'top ' if count == HISTORY_SEARCH_LIMIT else ''}{count} in history")
+    
     def clear_search(self):
         self.search_input.clear()
         self.source_filter.setCurrentText("All Sources")
         self.location_filter.setCurrentText("All Locations")
-        self.filtered_jobs = self.jobs.copy()
+        self.filtered_jobs = self.jobs
         self.update_jobs_table()
         self.update_results_count()
     
-    def update_filter_options(self):
-        sources = set(job.source_site for job in self.jobs)
-        self.source_filter.clear()
-        self.source_filter.addItem("All Sources")
-        for source in sorted(sources):
-            self.source_filter.addItem(source)
+    def toggle_history(self):
+        self.update_filter_options()
+        self.filter_jobs()
+    
+    def update_history_archive(self, rebuild: bool = False):
+        """Add the jobs stored since the archive was written, in the background, then map it"""
+        if self.history_archive is None:
+            # The last generation written is usable right away, before the update catches up
+            self.history_archive = open_job_archive(archive_path(self.job_store.db_path), self.job_store.get_description)
+        if self.archive_update is not None and self.archive_update.isRunning():
+            # Run again once it ends, as the running update may have read the store too early
+            self._archive_update_pending = bool(self._archive_update_pending) or rebuild
+            return
         
-        locations = set(job.location for job in self.jobs if job.location)
-        self.location_filter.clear()
-        self.location_filter.addItem("All Locations")
-        for location in sorted(locations):
-            self.location_filter.addItem(location)
+        self.archive_update = ArchiveUpdateThread(self.job_store.db_path, rebuild)
+        self.archive_update.archive_updated.connect(self.history_archive_updated)
+        self.archive_update.error_occurred.connect(print)
+        self.archive_update.finished.connect(self.archive_update_stopped)
+        self.archive_update.start()
+    
+    @pyqtSlot(str)
+    def history_archive_updated(self, path: str):
+        if self.history_archive is not None and self.history_archive.path == path:
+            return
+        try:
+            archive = JobArchive(path, self.job_store.get_description)
+        except (OSError, ValueError) as e:
+            print(f"Error mapping the job history archive: {e}")
+            return
+        previous, self.history_archive = self.history_archive, archive
+        if self.history_check.isChecked():
+            self.update_filter_options()
+            self.filter_jobs()
+        if previous is not None:
+            # Its rows are no longer shown; unmapped so its writer can remove the file
+            previous.close()
+    
+    def archive_update_stopped(self):
+        if self._archive_update_pending is not None and not self._closing:
+            rebuild, self._archive_update_pending = self._archive_update_pending, None
+            self.update_history_archive(rebuild)
+    
+    def update_filter_options(self):
+        if self.history_check.isChecked() and self.history_archive is not None:
+            sources = set(self.history_archive.distinct_values('source_site'))
+            locations = set(location for location in self.history_archive.distinct_values('location') if location)
+        else:
+            sources = set(job.source_site for job in self.jobs)
+            locations = set(job.location for job in self.jobs if job.location)
+        
+        # Refilter once at most, rather than for every item the combos go through
+        changed = False
+        for combo, everything, values in ((self.source_filter, "All Sources", sources),
+                                          (self.location_filter, "All Locations", locations)):
+            selected = combo.currentText()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(everything)
+            combo.addItems(sorted(values))
+            combo.setCurrentText(selected if selected in values else everything)
+            combo.blockSignals(False)
+            changed = changed or combo.currentText() != selected
+        if changed:
+            self.filter_jobs()
     
     def update_jobs_table(self):
-        self.jobs_table.setRowCount(0)
-        
-        jobs_to_display = self.filtered_jobs if hasattr(self, 'filtered_jobs') else self.jobs
-        
-        for job in jobs_to_display:
-            row = self.jobs_table.rowCount()
-            self.jobs_table.insertRow(row)
-            
-            self.jobs_table.setItem(row, 0, QTableWidgetItem(job.title))
-            self.jobs_table.setItem(row, 1, QTableWidgetItem(job.company))
-            self.jobs_table.setItem(row, 2, QTableWidgetItem(job.location))
-            self.jobs_table.setItem(row, 3, QTableWidgetItem(job.source_site))
-            self.jobs_table.setItem(row, 4, QTableWidgetItem(", ".join(job.identified_skills)))
-            self.jobs_table.setItem(row, 5, QTableWidgetItem(job.url))
+        self.jobs_model.set_rows(self.filtered_jobs if hasattr(self, 'filtered_jobs') else self.jobs)
     
     def update_results_count(self):
-        if hasattr(self, 'filtered_jobs'):
+        if isinstance(self.filtered_jobs, ArchiveRows):
+            self.results_label.setText(f"{len(self.filtered_jobs)} in history")
+        elif hasattr(self, 'filtered_jobs'):
             count = len(self.filtered_jobs)
             total = len(self.jobs)
             if count == total:
@@ -350,8 +614,9 @@ class MainWindow(QMainWindow):
             return
         
         self.jobs.clear()
-        self.filtered_jobs.clear()
-        self.jobs_table.setRowCount(0)
+        self.filtered_jobs = self.jobs
+        self.analytics.reset()
+        self.jobs_model.set_rows(self.jobs)
         self.job_details.clear()
         self.clear_search()
         
@@ -360,75 +625,196 @@ class MainWindow(QMainWindow):
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         
-        self.scraper = JobScraper(self.config)
-        self.scraper.progress_updated.connect(self.update_progress)
+        from scraper import JobScraper
+        self.scraper = JobScraper(self.config, db_path=self.job_store.db_path)
+        self.run_metrics = self.scraper.metrics
+        self.scraper.progress_changed.connect(self.update_progress)
         self.scraper.job_found.connect(self.add_job_to_table)
         self.scraper.scraping_finished.connect(self.scraping_finished)
         self.scraper.error_occurred.connect(self.handle_scraping_error)
+        self.scraper.finished.connect(self.scraper_stopped)
+        self._run_pending = True
         self.scraper.start()
         
         self.status_bar.showMessage("Scraping in progress...")
     
     def stop_scraping(self):
-        if self.scraper:
-            self.scraper.stop_scraping()
-            self.scraper.wait() 
+        """Cancel the run without blocking the UI.
         
-        self.scraping_finished(self.jobs)
+        The scraper abandons its in-flight request and emits scraping_finished
+        with the jobs found so far, which saves them like a completed run.
+        If the thread has already ended, its queued signal is still on the way.
+        """
+        self.stop_button.setEnabled(False)
+        if self.scraper and self.scraper.isRunning():
+            self.status_bar.showMessage("Stopping...")
+            self.scraper.stop_scraping()
     
-    @pyqtSlot(str, int, int)
-    def update_progress(self, message: str, current: int, total: int):
-        if total > 0:
-            progress = int((current / total) * 100)
-            self.progress_bar.setValue(progress)
-        
-        self.status_bar.showMessage(f"{message} ({current}/{total})")
+    def scraper_stopped(self):
+        """The scraper thread ended; scraping_finished, if emitted, has been handled before this"""
+        if self._run_pending:
+            # The run failed before it could report its jobs
+            self.scraping_finished(self.jobs)
+    
+    def closeEvent(self, event):
+        threads = [thread for thread in (self.scraper, self.reanalysis, self.archive_update)
+                   if thread is not None and thread.isRunning()]
+        if threads:
+            # A QThread must not be destroyed while it runs: stop the threads and close once they have
+            # ended, so the jobs found so far are still saved. A re-analysis stops after the chunk being
+            # written; the rest is redone on the next start.
+            self._closing = True
+            # Kept on screen: closing a hidden window would not end the application
+            self.setEnabled(False)
+            self.status_bar.showMessage("Closing once the current request stops...")
+            for thread in threads:
+                thread.finished.connect(self.close)
+            if self.scraper in threads:
+                self.scraper.stop_scraping()
+            if self.reanalysis in threads:
+                self.reanalysis.stop()
+            event.ignore()
+            return
+        super().closeEvent(event)
+    
+    @pyqtSlot(object)
+    def update_progress(self, snapshot: ProgressSnapshot):
+        self.progress_bar.setValue(snapshot.percent)
+        self.status_bar.showMessage(str(snapshot))
     
     @pyqtSlot(object)
     def add_job_to_table(self, job: JobListing):
         """Add a job to the table"""
-        self.jobs.append(job)
+        with self.run_metrics.timer("analyze", job.source_site):
+            self.analytics.add_jobs([job], self.skill_analyzer)
+        if self.scraper is not None:
+            self.scraper.progress.advance("analyses")
+        if self.jobs_model.rows is self.jobs:
+            # Unfiltered: the table shows self.jobs itself
+            self.jobs_model.append(job)
+        else:
+            self.jobs.append(job)
         
         self.update_filter_options()
-        
-        if not hasattr(self, 'filtered_jobs') or not self.search_input.text() and self.source_filter.currentText() == "All Sources" and self.location_filter.currentText() == "All Locations":
-            row = self.jobs_table.rowCount()
-            self.jobs_table.insertRow(row)
-            
-            self.jobs_table.setItem(row, 0, QTableWidgetItem(job.title))
-            self.jobs_table.setItem(row, 1, QTableWidgetItem(job.company))
-            self.jobs_table.setItem(row, 2, QTableWidgetItem(job.location))
-            self.jobs_table.setItem(row, 3, QTableWidgetItem(job.source_site))
-            self.jobs_table.setItem(row, 4, QTableWidgetItem(", ".join(job.identified_skills)))
-            self.jobs_table.setItem(row, 5, QTableWidgetItem(job.url))
-        
         self.update_results_count()
+        
+        if not self.live_analysis_timer.isActive():
+            self.live_analysis_timer.start()
+    
+    def refresh_live_analysis(self):
+        self.skill_stats = self.analytics.get_statistics(self.skill_analyzer)
+        self.update_analysis_tab()
     
     @pyqtSlot(list)
     def scraping_finished(self, jobs: List[JobListing]):
+        if not self._run_pending:
+            return
+        self._run_pending = False
+        self.live_analysis_timer.stop()
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.progress_bar.setVisible(False)
         
-        self.filtered_jobs = self.jobs.copy()
+        self.filtered_jobs = self.jobs
         self.update_filter_options()
         self.update_results_count()
         
         if jobs:
-            self.skill_stats = self.skill_analyzer.get_skill_statistics(jobs)
+            self.skill_stats = self.analytics.get_statistics(self.skill_analyzer)
             self.update_analysis_tab()
-            
+            self.save_scraping_session(jobs)
+        else:
+            self.record_discovery_passes()
+        
+        metrics = self.run_metrics
+        metrics.finish()
+        metrics_path = self.write_run_metrics()
+        run_summary = (f"Fetched {metrics.total_pages} pages ({metrics.total_bytes / 1024:.0f} KiB) "
+                       f"in {metrics.duration:.1f}s with {metrics.total_errors} errors")
+        if metrics_path:
+            run_summary += f"\nRun metrics written to {metrics_path}"
+        
+        if self._closing:
+            return
+        if jobs:
             self.status_bar.showMessage(f"Scraping completed. Found {len(jobs)} jobs.")
             
+            duplicates = self.scraper.duplicate_count if self.scraper else 0
+            overlap = self.scraper.query_overlap if self.scraper else None
+            repeats = overlap.repeats if overlap is not None else 0
+            
             QMessageBox.information(
                 self, 
                 "Scraping Complete", 
                 f"Successfully scraped {len(jobs)} job listings!\n\n"
-                f"Unique skills identified: {self.skill_stats.get('unique_skills_found', 0)}"
+                f"Unique skills identified: {self.skill_stats.get('unique_skills_found', 0)}\n"
+                f"Near-duplicate postings collapsed: {duplicates}\n"
+                f"Repeated results across queries dropped: {repeats}\n\n"
+                f"{run_summary}"
             )
         else:
             self.status_bar.showMessage("Scraping completed. No jobs found.")
-            QMessageBox.warning(self, "No Results", "No job listings were found. Please check your configuration.")
+            QMessageBox.warning(self, "No Results", "No job listings were found. Please check your configuration.\n\n"
+                                f"{run_summary}")
+    
+    def write_run_metrics(self) -> str:
+        """Print the run summary and write the metrics file, returning its path"""
+        print(self.run_metrics.summary())
+        overlap = self.scraper.query_overlap if self.scraper else None
+        if overlap is not None and overlap.results:
+            print()
+            print(overlap.summary())
+        health = self.scraper.site_health.summary() if self.scraper and self.scraper.site_health else ""
+        if health:
+            print()
+            print(health)
+        if not self.config.metrics_file:
+            return ""
+        
+        try:
+            self.run_metrics.write_json(self.config.metrics_file)
+            return os.path.abspath(self.config.metrics_file)
+        except OSError as e:
+            print(f"Error writing run metrics: {e}")
+            return ""
+    
+    def save_scraping_session(self, jobs: List[JobListing]):
+        """Persist the finished run so it shows up in the demand trends"""
+        try:
+            with self.run_metrics.timer("store"):
+                passes = self.scraper.discovery_passes if self.scraper else []
+                discovery_state = DiscoveryState(self.job_store) if passes else None
+                # One transaction, so feed postings count as fetched only once their jobs are stored
+                with self.job_store.conn:
+                    if discovery_state is not None:
+                        discovery_state.record(passes)
+                    session_id = self.job_store.save_session(
+                        jobs,
+                        [site.name for site in self.config.job_sites if site.is_active],
+                        self.config.search_queries,
+                        self.skill_analyzer.all_skills
+                    )
+                self.analytics.save(f"session:{session_id}")
+            # The store has the descriptions now; keep only the list view's fields in memory
+            for job in jobs:
+                job.defer_description(self.job_store.get_description)
+            self._shown_session = (session_id, len(jobs))
+            self.update_history_archive()
+            self.update_trend_charts()
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to save scraping session:\n{str(e)}")
+    
+    def record_discovery_passes(self):
+        """Record the feed postings of a run without jobs, so those that matched no query are skipped next run"""
+        passes = self.scraper.discovery_passes if self.scraper else []
+        if not passes:
+            return
+        try:
+            discovery_state = DiscoveryState(self.job_store)
+            with self.job_store.conn:
+                discovery_state.record(passes)
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to save the discovery state:\n{str(e)}")
     
     @pyqtSlot(str)
     def handle_scraping_error(self, error_message: str):
@@ -436,11 +822,10 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "Scraping Error", error_message)
     
     def on_job_selected(self):
-        current_row = self.jobs_table.currentRow()
-        jobs_to_display = self.filtered_jobs if hasattr(self, 'filtered_jobs') else self.jobs
+        current_row = self.jobs_table.currentIndex().row()
         
-        if 0 <= current_row < len(jobs_to_display):
-            job = jobs_to_display[current_row]
+        if 0 <= current_row < self.jobs_model.rowCount():
+            job = self.jobs_model.job(current_row)
             
             details = f"Title: {job.title}\n"
             details += f"Company: {job.company}\n"
@@ -449,6 +834,10 @@ class MainWindow(QMainWindow):
             details += f"URL: {job.url}\n"
             details += f"Scraped: {job.scraped_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
             
+            snippet = self.search_snippets.get(job)
+            if snippet:
+                details += f"Match: {snippet}\n"
+            
             if job.identified_skills:
                 details += f"Skills: {', '.join(job.identified_skills)}\n"
             
@@ -479,67 +868,24 @@ class MainWindow(QMainWindow):
         self.update_charts()
     
     def update_charts(self):
-        if not self.skill_stats or 'category_breakdown' not in self.skill_stats:
-            return
+        self._skill_charts_dirty = True
+        self.refresh_visible_charts()
+    
+    def update_trend_charts(self):
+        self._trend_charts_dirty = True
+        self.refresh_visible_charts()
+    
+    def draw_trend_charts(self):
+        granularity = self.trend_granularity.currentData()
+        normalize = self.trend_normalize.isChecked()
         
-        self.figure.clear()
+        skill_trends = self.trend_analyzer.get_skill_trends(granularity, normalize=normalize)
+        category_trends = self.trend_analyzer.get_category_trends(granularity)
         
-        ax1 = self.figure.add_subplot(2, 2, 1)
-        ax2 = self.figure.add_subplot(2, 2, 2)
-        ax3 = self.figure.add_subplot(2, 1, 2)
+        self.trend_sessions_label.setText(f"{self.job_store.get_session_count()} stored sessions")
         
-        if 'most_demanded_skills' in self.skill_stats:
-            top_skills = self.skill_stats['most_demanded_skills'][:10]
-            if top_skills:
-                skills, counts = zip(*top_skills)
-                ax1.barh(range(len(skills)), counts, color='#3498db')
-                ax1.set_yticks(range(len(skills)))
-                ax1.set_yticklabels(skills)
-                ax1.set_xlabel('Frequency')
-                ax1.set_title('Top 10 Most Demanded Skills')
-                ax1.invert_yaxis()
-        
-        category_data = self.skill_stats['category_breakdown']
-        if category_data:
-            categories = []
-            totals = []
-            colors = []
-            
-            for cat_name, cat_data in category_data.items():
-                if cat_data['total_mentions'] > 0:
-                    categories.append(cat_name)
-                    totals.append(cat_data['total_mentions'])
-                    colors.append(cat_data['color'])
-            
-            if categories:
-                ax2.pie(totals, labels=categories, colors=colors, autopct='%1.1f%%')
-                ax2.set_title('Skills Distribution by Category')
-        
-        if category_data:
-            cat_names = []
-            cat_totals = []
-            cat_colors = []
-            
-            for cat_name, cat_data in category_data.items():
-                if cat_data['total_mentions'] > 0:
-                    cat_names.append(cat_name)
-                    cat_totals.append(cat_data['total_mentions'])
-                    cat_colors.append(cat_data['color'])
-            
-            if cat_names:
-                bars = ax3.bar(cat_names, cat_totals, color=cat_colors)
-                ax3.set_xlabel('Skill Categories')
-                ax3.set_ylabel('Total Mentions')
-                ax3.set_title('Skill Demand by Category')
-                ax3.tick_params(axis='x', rotation=45)
-                
-                for bar, total in zip(bars, cat_totals):
-                    height = bar.get_height()
-                    ax3.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                            str(total), ha='center', va='bottom')
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        colors = {cat.name: cat.color for cat in self.config.skill_categories}
+        self.trend_canvas.update_charts(skill_trends, category_trends, colors, normalize)
     
     def export_csv(self):
         jobs_to_export = self.filtered_jobs if hasattr(self, 'filtered_jobs') and self.filtered_jobs else self.jobs
@@ -578,24 +924,98 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Export Error", f"Failed to export Word document:\n{str(e)}")
     
     def open_config_dialog(self):
+        from config_dialog import ConfigDialog
         dialog = ConfigDialog(self.config, self)
         if dialog.exec() == dialog.DialogCode.Accepted:
             self.config = dialog.get_config()
             self.config_manager.save_scraping_config(self.config)
             self.skill_analyzer = SkillAnalyzer(self.config.skill_categories)
+            self.refresh_analytics()
             self.update_config_summary()
             self.status_bar.showMessage("Configuration updated")
+            self.start_reanalysis()
     
     def reload_config(self):
         try:
             self.config = self.config_manager.load_config()
             self.skill_analyzer = SkillAnalyzer(self.config.skill_categories)
+            self.refresh_analytics()
             self.update_config_summary()
             self.status_bar.showMessage("Configuration reloaded")
+            self.start_reanalysis()
             QMessageBox.information(self, "Success", "Configuration reloaded successfully!")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to reload configuration:\n{str(e)}")
     
+    def load_cached_analytics(self):
+        """Show the analytics of the last job set without recomputing them"""
+        try:
+            if self.analytics.load_latest(self.skill_analyzer):
+                self.skill_stats = self.analytics.get_statistics(self.skill_analyzer)
+                self.update_analysis_tab()
+        except Exception as e:
+            print(f"Error loading cached analytics: {e}")
+    
+    def refresh_analytics(self):
+        """Rescan only the skills affected by a vocabulary change"""
+        if self.jobs:
+            self.analytics.update_vocabulary(self.skill_analyzer, self.jobs)
+        elif self.analytics.dataset_key.startswith("session:"):
+            session_id = int(self.analytics.dataset_key.split(":", 1)[1])
+            self.analytics.update_vocabulary(self.skill_analyzer, self.job_store.load_session_jobs(session_id))
+        else:
+            return
+        
+        self.analytics.save()
+        self.skill_stats = self.analytics.get_statistics(self.skill_analyzer)
+        self.update_analysis_tab()
+        self.update_jobs_table()
+    
+    def start_reanalysis(self):
+        """Re-analyze the stored jobs affected by a vocabulary change, in the background"""
+        if self.reanalysis is not None and self.reanalysis.isRunning():
+            # The running pass works from the previous vocabulary; start over once it stops
+            self._reanalysis_pending = True
+            self.reanalysis.stop()
+            return
+        
+        try:
+            if not SkillReanalyzer(self.job_store).needs_update(self.skill_analyzer):
+                return
+        except Exception as e:
+            print(f"Error checking the stored skill vocabulary: {e}")
+            return
+        
+        self.reanalysis = ReanalysisThread(self.job_store.db_path, self.config.skill_categories)
+        self.reanalysis.progress_updated.connect(self.update_reanalysis_progress)
+        self.reanalysis.reanalysis_finished.connect(self.reanalysis_finished)
+        self.reanalysis.error_occurred.connect(self.status_bar.showMessage)
+        self.reanalysis.finished.connect(self.reanalysis_stopped)
+        self.reanalysis.start()
+    
+    @pyqtSlot(int, int)
+    def update_reanalysis_progress(self, done: int, total: int):
+        if not (self.scraper and self.scraper.isRunning()):
+            self.status_bar.showMessage(f"Updating skills of stored jobs... {done}/{total}")
+    
+    @pyqtSlot(dict)
+    def reanalysis_finished(self, summary: Dict):
+        if not summary['complete']:
+            return
+        if summary['jobs_changed']:
+            # Maps the generation the thread wrote, or writes one with the new skills
+            self.update_history_archive(rebuild=not summary['archive_rebuilt'])
+            self.update_trend_charts()
+        if not (self.scraper and self.scraper.isRunning()):
+            self.status_bar.showMessage(
+                f"Skills of {summary['jobs_changed']} stored jobs updated ({summary['jobs_scanned']} re-analyzed)"
+            )
+    
+    def reanalysis_stopped(self):
+        if self._reanalysis_pending and not self._closing:
+            self._reanalysis_pending = False
+            self.start_reanalysis()
+    
     def update_config_summary(self):
         summary = "=== JOB SITES ===\n"
         for site in self.config.job_sites:
@@ -618,5 +1038,6 @@ class MainWindow(QMainWindow):
         summary += f"Max pages per site: {self.config.max_pages_per_site}\n"
         summary += f"Delay between requests: {self.config.delay_between_requests}s\n"
         summary += f"Use Selenium: {'Yes' if self.config.use_selenium else 'No'}\n"
+        summary += f"Collapse near-duplicates: {'Yes' if self.config.detect_duplicates else 'No'}\n"
         
         self.config_summary.setPlainText(summary)
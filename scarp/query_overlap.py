@@ -0,0 +1,136 @@
+"""
+Run-scoped URL deduplication across overlapping search queries.
+
+Similar queries ("Software Engineer", "Backend Developer", ...) return
+largely the same postings. Results are keyed on a normalized URL so a
+posting seen under one query is dropped before it is extracted again, and
+the queries that matched each posting are kept to report how much every
+query adds beyond the others.
+"""
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from data_models import JobListing
+
+# Parameters that identify a visit rather than a posting
+_IGNORED_PARAMS = {'ref', 'referrer', 'src', 'source', 'from', 'fbclid', 'gclid', 'msclkid',
+                   'highlight', 'q', 'query', 'keyword', 'keywords', 'search', 'page'}
+
+
+def normalize_url(url: str) -> str:
+    """A canonical form of a posting URL.
+
+    Lowercases the scheme and host and drops ``www.``, default ports, the
+    fragment, a trailing slash, and tracking and search parameters. The
+    remaining parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    params = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in _IGNORED_PARAMS and not name.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    # http and https serve the same posting
+    return urlunsplit(("", host, path, urlencode(params), ""))
+
+
+class QueryOverlap:
+    """URLs seen during one run and the queries that returned each of them"""
+
+    def __init__(self):
+        self._jobs: Dict[str, JobListing] = {}
+        self._queries: Dict[str, List[str]] = {}
+        self.results: Dict[str, int] = {}
+        self.repeats = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def repeat(self, url: str, query: str) -> Optional[JobListing]:
+        """The job already seen at this URL, now also credited to the query, or None if it is new"""
+        if not url:
+            return None
+        key = normalize_url(url)
+        job = self._jobs.get(key)
+        if job is None:
+            return None
+
+        self.results[query] = self.results.get(query, 0) + 1
+        self.repeats += 1
+        queries = self._queries[key]
+        if query not in queries:
+            queries.append(query)
+            job.matched_queries += (query,)
+        return job
+
+    def add(self, job: JobListing, queries: Iterable[str]):
+        """Record a newly extracted job and the queries that returned it"""
+        queries = list(dict.fromkeys(queries))
+        for query in queries:
+            self.results[query] = self.results.get(query, 0) + 1
+        if job.url:
+            key = normalize_url(job.url)
+            self._jobs[key] = job
+            self._queries[key] = queries
+
+    def to_dict(self) -> Dict:
+        """Per-query result counts and pairwise overlaps.
+
+        ``exclusive`` counts postings no other query returned; a query
+        with none adds nothing the others do not find.
+        """
+        first_seen: Dict[str, int] = {}
+        exclusive: Dict[str, int] = {}
+        shared: Dict[tuple, int] = {}
+        for queries in self._queries.values():
+            if not queries:
+                continue
+            first_seen[queries[0]] = first_seen.get(queries[0], 0) + 1
+            if len(queries) == 1:
+                exclusive[queries[0]] = exclusive.get(queries[0], 0) + 1
+            for pair in combinations(sorted(queries), 2):
+                shared[pair] = shared.get(pair, 0) + 1
+
+        postings = {query: 0 for query in self.results}
+        for queries in self._queries.values():
+            for query in queries:
+                postings[query] += 1
+
+        return {
+            'unique_urls': len(self._jobs),
+            'repeats_dropped': self.repeats,
+            'queries': [
+                {'query': query, 'results': results, 'postings': postings[query],
+                 'first_seen': first_seen.get(query, 0), 'exclusive': exclusive.get(query, 0)}
+                for query, results in self.results.items()
+            ],
+            'pairs': [
+                {'queries': list(pair), 'shared': count,
+                 'jaccard': round(count / (postings[pair[0]] + postings[pair[1]] - count), 3)}
+                for pair, count in sorted(shared.items(), key=lambda item: -item[1])
+            ]
+        }
+
+    def summary(self, top_pairs: int = 5) -> str:
+        """Multi-line overlap report for the console"""
+        data = self.to_dict()
+        lines = [
+            f"{data['unique_urls']} unique postings, {data['repeats_dropped']} repeats across queries dropped",
+            "",
+            f"{'query':<30} {'results':>8} {'first seen':>11} {'exclusive':>10}"
+        ]
+        for row in sorted(data['queries'], key=lambda row: row['exclusive']):
+            lines.append(f"{row['query'][:30]:<30} {row['results']:>8} {row['first_seen']:>11} {row['exclusive']:>10}")
+        if data['pairs']:
+            lines += ["", "Most overlapping queries:"]
+            for pair in data['pairs'][:top_pairs]:
+                first, second = pair['queries']
+                lines.append(f"  {first} / {second}: {pair['shared']} shared (Jaccard {pair['jaccard']:.2f})")
+        return "\n".join(lines)
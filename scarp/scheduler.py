@@ -0,0 +1,471 @@
+"""
+Unattended scraping on a cron-like schedule.
+
+Each run queues every (site, query, page) of the configuration in the
+CrawlQueue and works through it with a bounded pool of fetch workers, either
+threads in this process or, for sharded runs, separate worker processes.
+Jobs are deduplicated, analyzed and written to the JobStore one work item at
+a time, so a run that is stopped or killed resumes where it left off.
+"""
+
+import multiprocessing
+import queue as queue_module
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from config_manager import ConfigManager
+from data_models import JobListing, ScrapingConfig
+from job_store import JobStore
+from skill_analyzer import SkillAnalyzer
+from analytics_cache import AnalyticsCache
+from duplicate_detector import DuplicateDetector
+from scrape_metrics import ScrapeMetrics
+from scrape_progress import ScrapeProgress
+from crawl_queue import CrawlQueue, LeaseHeartbeat, WorkItem, PENDING, RUNNING, MAX_ATTEMPTS, lease_seconds
+from scraper import JobScraper
+from discovery import DiscoveryPass, DiscoveryState
+from site_health import SiteUnavailable
+from crawl_policy import CrawlPolicies, CrawlDisallowed
+from skill_reanalysis import SkillReanalyzer
+from job_archive import archive_path, latest_archive_path, update_job_archive
+
+# Seconds between progress lines while a run drains
+PROGRESS_LOG_INTERVAL = 30.0
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(value) for value in spec.split("-", 1))
+        else:
+            start = int(spec)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {field!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Standard five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports ``*``, lists, ranges and steps, plus the @hourly, @daily,
+    @weekly and @monthly shorthands. As in cron, when both day fields are
+    restricted a day matching either of them qualifies.
+    """
+
+    ALIASES = {
+        "@hourly": "0 * * * *",
+        "@daily": "0 0 * * *",
+        "@weekly": "0 0 * * 0",
+        "@monthly": "0 0 1 * *"
+    }
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = self.ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {expression!r}")
+
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # Sunday is both 0 and 7
+        self.weekdays = {day % 7 for day in _parse_cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first matching minute strictly after ``moment``"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+def crawl_worker(db_path: str, config: ScrapingConfig, run_id: int, max_attempts: int,
+                 site_limits: Dict[str, int], lease: float, stop_event, metrics_queue):
+    """Worker process of a sharded run.
+
+    Claims pages from the shared queue under a lease, fetches and parses
+    them, and stages the jobs for the coordinator, until nothing is left
+    to claim or the coordinator asks it to stop. Leases are renewed while
+    a page is in progress. Its metrics are sent back when it exits.
+    """
+    # Ctrl+C reaches the whole process group; the coordinator decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    store = JobStore(db_path)
+    queue = CrawlQueue(store)
+    discovery_state = DiscoveryState(store)
+    scraper = JobScraper(config, db_path=db_path)
+    try:
+        with LeaseHeartbeat(store, lease) as heartbeat:
+            while not stop_event.is_set():
+                item = queue.claim(run_id, lease, site_limits, max_attempts)
+                if item is None:
+                    progress = queue.progress(run_id)
+                    if not progress[PENDING] and not progress[RUNNING]:
+                        break
+                    # The remaining pages are leased by other workers, on busy sites or waiting to be retried
+                    stop_event.wait(0.2)
+                    continue
+
+                heartbeat.track(item)
+                try:
+                    requested = True
+                    try:
+                        jobs = scraper.scrape_page(item.site, item.query, item.page)
+                    except Exception as e:
+                        requested = not isinstance(e, (SiteUnavailable, CrawlDisallowed))
+                        # Asking again would get the same answer from the cached robots.txt
+                        queue.fail(item, str(e), item.attempts if isinstance(e, CrawlDisallowed) else max_attempts)
+                        continue
+                    finally:
+                        # A page skipped for its site's open circuit or robots.txt made no request to space out
+                        if requested:
+                            stop_event.wait(scraper.crawl_delay(item.site))
+
+                    # Feed postings count as fetched once their jobs are staged
+                    discovery_state.record(scraper.discovery_passes)
+                    queue.stage(item, jobs)
+                finally:
+                    heartbeat.untrack(item)
+    finally:
+        scraper.metrics.finish()
+        metrics_queue.put(scraper.metrics)
+        scraper.close()
+        queue.close()
+        store.close()
+
+
+class ScrapeScheduler:
+    """Runs the work queue on a schedule with a bounded pool of fetch workers.
+
+    With ``processes`` unset, fetching happens on worker threads while
+    deduplication, analysis and all database writes happen on the thread
+    that called ``run`` or ``serve_forever``. With ``processes`` set, that
+    many worker processes claim and parse pages in parallel and stage their
+    jobs, and this process acts as the coordinator that merges staged jobs
+    through one duplicate detector into the run's session.
+
+    Either way at most ``max_concurrency`` pages per site are in flight at
+    a time (one on hosts whose robots.txt sets a Crawl-delay) and each
+    worker waits the site's delay after its page (see CrawlPolicies), so
+    adding workers spreads load across sites rather than hammering one.
+    """
+
+    def __init__(self, config_manager: ConfigManager, job_store: JobStore,
+                 schedule: Optional[str] = None, workers: Optional[int] = None, max_attempts: int = MAX_ATTEMPTS,
+                 processes: Optional[int] = None):
+        self.config_manager = config_manager
+        self.job_store = job_store
+        self.queue = CrawlQueue(job_store)
+        self.discovery_state = DiscoveryState(job_store)
+        self.analytics = AnalyticsCache(job_store)
+        self.metrics = ScrapeMetrics()
+        # Logged at most every PROGRESS_LOG_INTERVAL seconds while a run drains
+        self.progress = ScrapeProgress(min_interval=PROGRESS_LOG_INTERVAL)
+        self.max_attempts = max_attempts
+        self.stop_event = threading.Event()
+
+        self.config: ScrapingConfig = None
+        self.analyzer: SkillAnalyzer = None
+        self.duplicate_detector: Optional[DuplicateDetector] = None
+        # Pages in flight per site, and the lease that covers a page at the sites' delays; set per run
+        self.site_limits: Dict[str, int] = {}
+        self.lease = 0.0
+        self._schedule_override = schedule
+        self._workers_override = workers
+        self.processes = processes
+        self.reload_config()
+
+    def reload_config(self):
+        """Pick up config changes (sites, queries, vocabulary) before each run"""
+        self.config = self.config_manager.load_config()
+        self.analyzer = SkillAnalyzer(self.config.skill_categories)
+        self.schedule = CronSchedule(self._schedule_override or self.config.schedule)
+        self.workers = max(1, self._workers_override or self.config.scheduler_workers)
+
+    def stop(self):
+        """Ask the scheduler to stop; pages in flight are finished and stored first"""
+        self.stop_event.set()
+
+    def log(self, message: str):
+        print(f"[{datetime.now().isoformat(sep=' ', timespec='seconds')}] {message}", flush=True)
+
+    def serve_forever(self):
+        """Resume an interrupted run, then run on the schedule until stopped"""
+        run_id = self.queue.unfinished_run()
+        if run_id is not None:
+            self.run(run_id)
+
+        while not self.stop_event.is_set():
+            next_run = self.schedule.next_after(datetime.now())
+            self.log(f"Next run at {next_run.isoformat(sep=' ')}")
+            if self.stop_event.wait(max(0.0, (next_run - datetime.now()).total_seconds())):
+                break
+            self.reload_config()
+            self.run()
+
+    def run(self, run_id: Optional[int] = None) -> int:
+        """Work through a run's queue; a new run is created unless run_id is given"""
+        self._reanalyze()
+        resuming = run_id is not None
+        if resuming:
+            requeued = self.queue.requeue_interrupted(run_id)
+            self.log(f"Resuming run {run_id} ({requeued} interrupted items requeued)")
+        else:
+            run_id = self.queue.create_run(self.config)
+            self.log(f"Started run {run_id} with {sum(self.queue.progress(run_id).values())} work items")
+
+        # Fetches any robots.txt not cached yet, so workers find them all in the store
+        policies = CrawlPolicies(self.job_store, self.config)
+        self.site_limits = policies.site_limits()
+        self.lease = lease_seconds(self.config, policies.site_delays())
+
+        session_id = self.queue.session_id(run_id)
+        self.metrics.reset()
+        self.progress.reset()
+        counts = self.queue.progress(run_id)
+        # Pages finished before a resume count towards completion but not towards the rate
+        self.progress.start_at("pages", counts['done'] + counts['failed'], total=sum(counts.values()))
+        self.analytics.reset(f"session:{session_id}")
+        self.duplicate_detector = (DuplicateDetector(self.config.duplicate_threshold)
+                                   if self.config.detect_duplicates else None)
+
+        if resuming:
+            # Rebuild the run's dedup and analytics state from what is already stored
+            stored = list(self.job_store.load_session_jobs(session_id))
+            if self.duplicate_detector is not None:
+                for job in stored:
+                    self.duplicate_detector.add(job)
+            self.analytics.add_jobs(stored, self.analyzer)
+            # A sharded run may have stopped with staged jobs not merged yet
+            self._merge_staged(run_id)
+
+        if self.processes:
+            self._drain_sharded(run_id)
+        else:
+            self._drain(run_id)
+
+        self._report_progress(run_id, force=True)
+        progress = self.queue.progress(run_id)
+        if self.stop_event.is_set() and (progress['pending'] or progress['running']):
+            self.log(f"Run {run_id} stopped with {progress['pending']} items left; it resumes on the next start")
+        else:
+            self.queue.finish_run(run_id, "finished" if not progress['failed'] else "finished_with_errors")
+            self.log(f"Run {run_id} finished: {progress['done']} pages done, {progress['failed']} failed, "
+                     f"{self.analytics.total_jobs} jobs in session {session_id}")
+
+        self.metrics.finish()
+        if self.config.metrics_file:
+            try:
+                self.metrics.write_json(self.config.metrics_file)
+            except OSError as e:
+                self.log(f"Error writing run metrics: {e}")
+        return run_id
+
+    def _reanalyze(self):
+        """Bring the skills of stored jobs in line with a changed vocabulary before adding more"""
+        reanalyzer = SkillReanalyzer(self.job_store, processes=self.processes)
+        if not reanalyzer.needs_update(self.analyzer):
+            return
+        summary = reanalyzer.reanalyze(self.analyzer, stop_event=self.stop_event)
+        self.log(f"Skill vocabulary changed ({len(summary['skills'])} skills): "
+                 f"{summary['jobs_scanned']} stored jobs re-analyzed, {summary['jobs_changed']} changed")
+        path = archive_path(self.job_store.db_path)
+        if summary['jobs_changed'] and latest_archive_path(path) is not None:
+            update_job_archive(self.job_store, path, rebuild=True).close()
+
+    def _drain(self, run_id: int):
+        local = threading.local()
+        # One per pool thread; their stores are closed here once the pool has shut down
+        scrapers: List[JobScraper] = []
+
+        def fetch(item: WorkItem) -> Tuple[List[JobListing], List[DiscoveryPass]]:
+            scraper = getattr(local, 'scraper', None)
+            if scraper is None:
+                scraper = local.scraper = JobScraper(self.config, db_path=self.job_store.db_path)
+                scraper.metrics = self.metrics
+                scraper.thread_bound_store = False
+                scrapers.append(scraper)
+            requested = True
+            try:
+                return scraper.scrape_page(item.site, item.query, item.page), scraper.discovery_passes
+            except (SiteUnavailable, CrawlDisallowed):
+                requested = False
+                raise
+            finally:
+                # Holding the site's slot through the delay keeps requests to it spaced out
+                if requested:
+                    self.stop_event.wait(scraper.crawl_delay(item.site))
+
+        in_flight: Dict[Future, WorkItem] = {}
+        try:
+            with LeaseHeartbeat(self.job_store, self.lease) as heartbeat, \
+                    ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scrape") as pool:
+                while not self.stop_event.is_set():
+                    while len(in_flight) < self.workers:
+                        item = self.queue.claim(run_id, self.lease, self.site_limits, self.max_attempts)
+                        if item is None:
+                            break
+                        heartbeat.track(item)
+                        in_flight[pool.submit(fetch, item)] = item
+
+                    if not in_flight:
+                        retry_at = self.queue.next_retry_at(run_id)
+                        if retry_at is None:
+                            break
+                        # Only failed pages waiting out their backoff are left
+                        self.stop_event.wait(min(max(1.0, retry_at - time.time()), PROGRESS_LOG_INTERVAL))
+                        self._report_progress(run_id)
+                        continue
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item = in_flight.pop(future)
+                        self._finish_item(item, future)
+                        heartbeat.untrack(item)
+                    self._report_progress(run_id)
+
+                # Pages already fetched are stored rather than fetched again on resume
+                for future in list(in_flight):
+                    future.exception()
+                    item = in_flight.pop(future)
+                    self._finish_item(item, future)
+                    heartbeat.untrack(item)
+        finally:
+            for scraper in scrapers:
+                scraper.close()
+
+    def _finish_item(self, item: WorkItem, future: Future):
+        error = future.exception()
+        if error is not None:
+            # Asking again would get the same answer from the cached robots.txt
+            backoff = self.queue.fail(item, str(error),
+                                      item.attempts if isinstance(error, CrawlDisallowed) else self.max_attempts)
+            retry = f"; retrying in {backoff:.0f}s" if backoff is not None else ""
+            self.log(f"{item} failed (attempt {item.attempts}/{self.max_attempts}{retry}): {error}")
+            return
+
+        found, passes = future.result()
+        jobs = []
+        for job in found:
+            # Collapse reposts before they reach the analyzer
+            if self.duplicate_detector is not None and self.duplicate_detector.add(job) is not None:
+                continue
+            jobs.append(job)
+
+        with self.metrics.timer("analyze", item.site.name, item.query):
+            for job in jobs:
+                self.analyzer.analyze_job(job)
+        with self.metrics.timer("store", item.site.name, item.query):
+            # Feed postings count as fetched in the same transaction that stores their jobs
+            self.discovery_state.record(passes)
+            stored = self.queue.complete(item, jobs, self.analyzer.all_skills)
+            if stored:
+                # Counted only once stored, so the totals never include jobs another worker stores again
+                self.analytics.count_jobs(jobs, self.analyzer)
+                self.analytics.save()
+        if not stored:
+            # Its new worker sees these jobs again; left in the detector they would be dropped as duplicates
+            if self.duplicate_detector is not None:
+                for job in found:
+                    self.duplicate_detector.remove(job)
+            self.log(f"{item} lost its lease before it was stored; it is left to its new worker")
+            return
+        self.progress.plan("analyses", len(jobs))
+        self.progress.advance("analyses", len(jobs))
+
+    def _report_progress(self, run_id: int, force: bool = False):
+        """Sync page counts from the queue, which also sees pages done by worker processes, and log when due"""
+        counts = self.queue.progress(run_id)
+        self.progress.set_done("pages", counts['done'] + counts['failed'], total=sum(counts.values()))
+        if self.progress.due(force):
+            self.log(f"Run {run_id}: {self.progress.snapshot()}")
+
+    def _drain_sharded(self, run_id: int):
+        # spawn rather than fork: worker processes must not inherit Qt or SQLite state
+        context = multiprocessing.get_context("spawn")
+        worker_stop = context.Event()
+        metrics_queue = context.Queue()
+        workers = [
+            context.Process(target=crawl_worker, name=f"crawl-worker-{number}", daemon=True,
+                            args=(self.job_store.db_path, self.config, run_id, self.max_attempts,
+                                  self.site_limits, self.lease, worker_stop, metrics_queue))
+            for number in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.log(f"Started {len(workers)} worker processes")
+
+        reported = 0
+        while reported < len(workers):
+            if self.stop_event.is_set():
+                worker_stop.set()
+            try:
+                # Drained while waiting so exiting workers are never blocked on a full pipe
+                self.metrics.merge(metrics_queue.get(timeout=0.5))
+                reported += 1
+            except queue_module.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+            self._merge_staged(run_id)
+            self._report_progress(run_id)
+
+        for worker in workers:
+            worker.join()
+        self._merge_staged(run_id)
+
+    def _merge_staged(self, run_id: int):
+        """Deduplicate staged worker results into the run's session"""
+        staged = self.queue.staged_results(run_id)
+        if not staged:
+            return
+
+        item_ids, jobs = [], []
+        for item_id, item_jobs in staged:
+            item_ids.append(item_id)
+            for job in item_jobs:
+                if self.duplicate_detector is not None and self.duplicate_detector.add(job) is not None:
+                    continue
+                jobs.append(job)
+
+        with self.metrics.timer("analyze"):
+            self.analytics.add_jobs(jobs, self.analyzer)
+        self.progress.plan("analyses", len(jobs))
+        self.progress.advance("analyses", len(jobs))
+        with self.metrics.timer("store"):
+            self.queue.merge(run_id, item_ids, jobs, self.analyzer.all_skills)
+            self.analytics.save()
@@ -0,0 +1,324 @@
+"""
+Per-stage timing and volume metrics for scrape runs.
+
+The scraper thread records fetch, parse, extract and emit timings while the
+main window (or a headless run) records analyze and store, so every update
+goes through one lock. A run can be summarised as text, written as JSON or
+rendered in the Prometheus text exposition format.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+STAGES = ("fetch", "parse", "extract", "analyze", "store", "emit")
+
+# Upper bounds in seconds, Prometheus style; the implicit last bucket is +Inf
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound containing the q-th observation (the max for +Inf)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(LATENCY_BUCKETS[index], self.max) if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'max': round(self.max, 6),
+            'buckets': {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), self.counts)}
+        }
+
+
+class StageTimer:
+    """Times several blocks of one stage and records their total as a single observation"""
+
+    def __init__(self, metrics: 'ScrapeMetrics', stage: str, site: str = "", query: str = ""):
+        self.metrics = metrics
+        self.stage = stage
+        self.site = site
+        self.query = query
+        self.elapsed = 0.0
+
+    @contextmanager
+    def part(self):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.metrics.record_error(self.site, self.stage)
+            raise
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def record(self):
+        self.metrics.observe(self.stage, self.elapsed, self.site, self.query)
+
+
+class ScrapeMetrics:
+    """Latency histograms, bytes, items per page and errors for one scrape run.
+
+    Histograms are keyed by (stage, site, query). Stages that do not belong
+    to a single search page, such as store, use empty site/query labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now()
+            self._started = time.perf_counter()
+            self._finished = None
+            self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+            self.bytes_downloaded: Dict[str, int] = {}
+            self.pages: Dict[Tuple[str, str], List[int]] = {}  # (site, query) -> [pages, items]
+            self.errors: Dict[Tuple[str, str], int] = {}  # (site, stage) -> count
+
+    def __getstate__(self):
+        # Sent between processes by sharded crawls; the lock is recreated on arrival
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def merge(self, other: 'ScrapeMetrics'):
+        """Fold another run's metrics, e.g. a worker process's, into these"""
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                self.histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+            for site, size in other.bytes_downloaded.items():
+                self.bytes_downloaded[site] = self.bytes_downloaded.get(site, 0) + size
+            for key, (pages, items) in other.pages.items():
+                counts = self.pages.setdefault(key, [0, 0])
+                counts[0] += pages
+                counts[1] += items
+            for key, count in other.errors.items():
+                self.errors[key] = self.errors.get(key, 0) + count
+
+    def finish(self):
+        with self._lock:
+            self._finished = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    @contextmanager
+    def timer(self, stage: str, site: str = "", query: str = ""):
+        """Time a block; an exception escaping it also counts as an error for the stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_error(site, stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, site, query)
+
+    def stage_timer(self, stage: str, site: str = "", query: str = "") -> StageTimer:
+        """Timer for a stage split over several blocks, e.g. the parses of one page"""
+        return StageTimer(self, stage, site, query)
+
+    def observe(self, stage: str, seconds: float, site: str = "", query: str = ""):
+        key = (stage, site, query)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def add_bytes(self, site: str, size: int):
+        with self._lock:
+            self.bytes_downloaded[site] = self.bytes_downloaded.get(site, 0) + size
+
+    def record_page(self, site: str, query: str, items: int):
+        with self._lock:
+            counts = self.pages.setdefault((site, query), [0, 0])
+            counts[0] += 1
+            counts[1] += items
+
+    def record_error(self, site: str, stage: str):
+        with self._lock:
+            self.errors[(site, stage)] = self.errors.get((site, stage), 0) + 1
+
+    def stage_totals(self) -> Dict[str, LatencyHistogram]:
+        """Histograms merged across sites and queries, in pipeline order"""
+        totals: Dict[str, LatencyHistogram] = {}
+        with self._lock:
+            for (stage, _, _), histogram in self.histograms.items():
+                totals.setdefault(stage, LatencyHistogram()).merge(histogram)
+        ordered = {stage: totals.pop(stage) for stage in STAGES if stage in totals}
+        ordered.update(totals)
+        return ordered
+
+    @property
+    def total_pages(self) -> int:
+        with self._lock:
+            return sum(counts[0] for counts in self.pages.values())
+
+    @property
+    def total_items(self) -> int:
+        with self._lock:
+            return sum(counts[1] for counts in self.pages.values())
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self.bytes_downloaded.values())
+
+    @property
+    def total_errors(self) -> int:
+        with self._lock:
+            return sum(self.errors.values())
+
+    def summary(self) -> str:
+        """Multi-line run summary for the console or a message box"""
+        lines = [
+            f"Run time: {self.duration:.1f}s, {self.total_pages} pages, "
+            f"{self.total_bytes / 1024:.1f} KiB downloaded, {self.total_items} items, "
+            f"{self.total_errors} errors",
+            "",
+            f"{'stage':<10} {'count':>7} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        ]
+        for stage, histogram in self.stage_totals().items():
+            mean = histogram.total / histogram.count if histogram.count else 0.0
+            lines.append(f"{stage:<10} {histogram.count:>7} {histogram.total:>9.2f} {mean * 1000:>9.1f} "
+                         f"{histogram.quantile(0.95) * 1000:>9.1f} {histogram.max * 1000:>9.1f}")
+
+        with self._lock:
+            sites = sorted({site for site, _ in self.pages} | set(self.bytes_downloaded))
+            if sites:
+                lines += ["", f"{'site':<25} {'pages':>6} {'items/page':>11} {'KiB':>9} {'errors':>7}"]
+            for site in sites:
+                pages = sum(counts[0] for (name, _), counts in self.pages.items() if name == site)
+                items = sum(counts[1] for (name, _), counts in self.pages.items() if name == site)
+                errors = sum(count for (name, _), count in self.errors.items() if name == site)
+                per_page = items / pages if pages else 0.0
+                lines.append(f"{site:<25} {pages:>6} {per_page:>11.1f} "
+                             f"{self.bytes_downloaded.get(site, 0) / 1024:>9.1f} {errors:>7}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        stage_totals = self.stage_totals()
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration_seconds': round(self.duration, 3),
+                'totals': {
+                    'pages': sum(counts[0] for counts in self.pages.values()),
+                    'items': sum(counts[1] for counts in self.pages.values()),
+                    'bytes': sum(self.bytes_downloaded.values()),
+                    'errors': sum(self.errors.values())
+                },
+                'stages': {stage: histogram.to_dict() for stage, histogram in stage_totals.items()},
+                'latency': [
+                    {'stage': stage, 'site': site, 'query': query, **histogram.to_dict()}
+                    for (stage, site, query), histogram in sorted(self.histograms.items())
+                ],
+                'pages': [
+                    {'site': site, 'query': query, 'pages': counts[0], 'items': counts[1],
+                     'items_per_page': round(counts[1] / counts[0], 2) if counts[0] else 0.0}
+                    for (site, query), counts in sorted(self.pages.items())
+                ],
+                'bytes_downloaded': dict(sorted(self.bytes_downloaded.items())),
+                'errors': [
+                    {'site': site, 'stage': stage, 'count': count}
+                    for (site, stage), count in sorted(self.errors.items())
+                ]
+            }
+
+    def write_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "devkh_scrape") -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        with self._lock:
+            for (stage, site, query), histogram in sorted(self.histograms.items()):
+                labels = _labels(stage=stage, site=site, query=query)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {histogram.count}")
+
+            lines += [f"# HELP {prefix}_bytes_total Response bytes downloaded.",
+                      f"# TYPE {prefix}_bytes_total counter"]
+            for site, size in sorted(self.bytes_downloaded.items()):
+                lines.append(f"{prefix}_bytes_total{{{_labels(site=site)}}} {size}")
+
+            lines += [f"# HELP {prefix}_pages_total Search pages scraped.",
+                      f"# TYPE {prefix}_pages_total counter"]
+            for (site, query), counts in sorted(self.pages.items()):
+                lines.append(f"{prefix}_pages_total{{{_labels(site=site, query=query)}}} {counts[0]}")
+
+            lines += [f"# HELP {prefix}_items_total Job listings extracted.",
+                      f"# TYPE {prefix}_items_total counter"]
+            for (site, query), counts in sorted(self.pages.items()):
+                lines.append(f"{prefix}_items_total{{{_labels(site=site, query=query)}}} {counts[1]}")
+
+            lines += [f"# HELP {prefix}_errors_total Errors per site and stage.",
+                      f"# TYPE {prefix}_errors_total counter"]
+            for (site, stage), count in sorted(self.errors.items()):
+                lines.append(f"{prefix}_errors_total{{{_labels(site=site, stage=stage)}}} {count}")
+
+        lines += [f"# HELP {prefix}_duration_seconds Wall-clock time of the run.",
+                  f"# TYPE {prefix}_duration_seconds gauge",
+                  f"{prefix}_duration_seconds {self.duration:.3f}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
@@ -0,0 +1,175 @@
+"""
+Progress of a scraping run, in units of work, with a smoothed rate and ETA.
+
+A run is made of search and feed pages, posting pages fetched from feeds,
+and analyses of the jobs found. Pages are planned up front; postings and
+analyses are planned as they are discovered, so the total grows during a
+run. Throughput is an exponentially weighted moving average over time
+(time constant ``time_constant`` seconds), which follows changes in speed
+without jumping on every page, and decays while nothing completes so a
+stalled run shows a growing ETA rather than a stale one.
+
+Reports are meant to be sent at most every ``min_interval`` seconds; see
+``due``.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+UNITS = ("pages", "postings", "analyses")
+
+# Relative cost of a unit; fetching dominates, analysing a job takes milliseconds
+WEIGHTS = {"pages": 1.0, "postings": 1.0, "analyses": 0.02}
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class ProgressSnapshot:
+    """Immutable state of a run's progress at one moment, safe to pass between threads"""
+
+    __slots__ = ('message', 'done', 'total', 'fraction', 'rate', 'eta', 'elapsed')
+
+    def __init__(self, message: str, done: Dict[str, int], total: Dict[str, int], fraction: float,
+                 rate: float, eta: Optional[float], elapsed: float):
+        self.message = message
+        self.done = done
+        self.total = total
+        self.fraction = fraction
+        # Work units per second, smoothed
+        self.rate = rate
+        # Seconds left at the current rate, None until there is a rate
+        self.eta = eta
+        self.elapsed = elapsed
+
+    @property
+    def percent(self) -> int:
+        return int(self.fraction * 100)
+
+    def counts(self) -> str:
+        """e.g. '12/40 pages, 3/10 postings, 25/31 analyses'"""
+        return ", ".join(f"{self.done[unit]}/{self.total[unit]} {unit}" for unit in UNITS if self.total[unit])
+
+    def timing(self) -> str:
+        """e.g. '1.8 units/s, 0:42 left'; the rate is in weighted work units (see WEIGHTS), not pages"""
+        if self.eta is None:
+            return f"{format_duration(self.elapsed)} elapsed"
+        return f"{self.rate:.1f} units/s, {format_duration(self.eta)} left"
+
+    def __str__(self) -> str:
+        parts = [part for part in (self.message, self.counts(), self.timing()) if part]
+        return " | ".join(parts)
+
+
+class ScrapeProgress:
+    """Planned and completed work of a run; may be updated from several threads"""
+
+    def __init__(self, time_constant: float = 15.0, min_interval: float = 0.25, clock=time.monotonic):
+        self.time_constant = time_constant
+        self.min_interval = min_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            now = self._clock()
+            self.message = ""
+            self.total: Dict[str, int] = {unit: 0 for unit in UNITS}
+            self.done: Dict[str, int] = {unit: 0 for unit in UNITS}
+            self._started = now
+            self._sampled = now
+            self._last_report: Optional[float] = None
+            # EWMA of the rate and its total weight, which corrects the average's start-up bias
+            self._rate = 0.0
+            self._weight = 0.0
+
+    def plan(self, unit: str, count: int = 1):
+        """Add work to do"""
+        with self._lock:
+            self.total[unit] += count
+
+    def cancel(self, unit: str, count: int = 1):
+        """Remove planned work that will not be done, e.g. pages of a skipped site"""
+        with self._lock:
+            self.total[unit] = max(self.done[unit], self.total[unit] - count)
+
+    def advance(self, unit: str, count: int = 1, message: Optional[str] = None):
+        """Record completed work"""
+        with self._lock:
+            self.done[unit] += count
+            self.total[unit] = max(self.total[unit], self.done[unit])
+            if message is not None:
+                self.message = message
+            self._sample(WEIGHTS[unit] * count)
+
+    def set_done(self, unit: str, done: int, total: Optional[int] = None):
+        """Record absolute counts, e.g. from the crawl queue"""
+        with self._lock:
+            if total is not None:
+                self.total[unit] = total
+            added = done - self.done[unit]
+            self.done[unit] = done
+            self.total[unit] = max(self.total[unit], done)
+            if added > 0:
+                self._sample(WEIGHTS[unit] * added)
+
+    def start_at(self, unit: str, done: int, total: int):
+        """Set counts done before tracking began, e.g. when a run resumes; they do not count towards the rate"""
+        with self._lock:
+            self.done[unit] = done
+            self.total[unit] = max(total, done)
+
+    def set_message(self, message: str):
+        with self._lock:
+            self.message = message
+
+    def _sample(self, work: float):
+        now = self._clock()
+        dt = now - self._sampled
+        if dt <= 0:
+            # Completed in the same clock tick; counted with the next sample
+            dt = 1e-6
+        alpha = 1.0 - math.exp(-dt / self.time_constant)
+        self._rate += alpha * (work / dt - self._rate)
+        self._weight += alpha * (1.0 - self._weight)
+        self._sampled = now
+
+    def _current_rate(self, now: float) -> float:
+        """The rate with the time since the last completion counted as idle"""
+        if self._weight <= 0:
+            return 0.0
+        decay = math.exp(-(now - self._sampled) / self.time_constant)
+        return self._rate * decay / self._weight
+
+    def due(self, force: bool = False) -> bool:
+        """Whether a report should be sent now; at most one per min_interval unless forced"""
+        with self._lock:
+            now = self._clock()
+            if not force and self._last_report is not None and now - self._last_report < self.min_interval:
+                return False
+            self._last_report = now
+            return True
+
+    def snapshot(self) -> ProgressSnapshot:
+        with self._lock:
+            now = self._clock()
+            total_work = sum(WEIGHTS[unit] * self.total[unit] for unit in UNITS)
+            done_work = sum(WEIGHTS[unit] * self.done[unit] for unit in UNITS)
+            rate = self._current_rate(now)
+            eta = (total_work - done_work) / rate if rate > 0 else None
+            return ProgressSnapshot(
+                message=self.message,
+                done=dict(self.done),
+                total=dict(self.total),
+                fraction=done_work / total_work if total_work else 0.0,
+                rate=rate,
+                eta=eta,
+                elapsed=now - self._started
+            )
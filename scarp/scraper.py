@@ -1,74 +1,256 @@
 import requests
 from bs4 import BeautifulSoup
+import threading
 import time
+from collections import deque
 import re
-from typing import List, Optional, Callable
-from urllib.parse import urljoin, urlparse
+from typing import Dict, List, Optional, Callable, Tuple
+from urllib.parse import urljoin
 from PyQt6.QtCore import QThread, pyqtSignal
 from data_models import JobListing, JobSite, ScrapingConfig
+from duplicate_detector import DuplicateDetector
+from scrape_metrics import ScrapeMetrics
+from crawl_archive import CrawlArchiveWriter, CrawlArchiveReader
+from structured_data import find_job_postings, job_from_posting
+from job_store import JobStore
+from discovery import DiscoveryPass, DiscoveryState, FeedEntry, parse_feed, matching_queries
+from query_overlap import QueryOverlap
+from site_health import SiteHealth, SiteUnavailable
+from crawl_policy import ROBOTS_MAX_BYTES, USER_AGENT, CrawlPolicies, CrawlDisallowed
+from scrape_progress import ScrapeProgress
+from listing_stream import ListingCutoff, STREAM_CHUNK_SIZE, STREAM_READ_AHEAD
+
+
+class ScrapingCancelled(BaseException):
+    """Raised inside the scraper thread when stop_scraping interrupts a request.
+
+    Like asyncio.CancelledError it is not an Exception, so it passes through
+    the per-site ``except Exception`` handlers and is not counted as an error.
+    """
+
+
+class ResponseTooLarge(IOError):
+    """A feed or posting was larger than ``max_response_bytes``; a truncated copy would not parse"""
+
 
 class JobScraper(QThread):
-    progress_updated = pyqtSignal(str, int, int) 
+    # A ProgressSnapshot, sent at most every progress.min_interval seconds
+    progress_changed = pyqtSignal(object)
     job_found = pyqtSignal(object)
     scraping_finished = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, config: ScrapingConfig):
+    def __init__(self, config: ScrapingConfig, replay_archive: Optional[CrawlArchiveReader] = None,
+                 db_path: Optional[str] = None):
         super().__init__()
         self.config = config
+        # In replay mode pages come from a past run's archive instead of the network
+        self.replay_archive = replay_archive
+        self.archive_writer = None
+        # Discovery state, site health and robots.txt are kept in the job store; without one they last a run
+        self.db_path = db_path
+        # False if close() is called from another thread once the scraping thread has finished
+        self.thread_bound_store = True
+        self._store: Optional[JobStore] = None
+        self._discovery_state: Optional[DiscoveryState] = None
+        self.site_health: Optional[SiteHealth] = None
+        self._crawl_policies: Optional[CrawlPolicies] = None
         self.jobs = []
+        # Feed passes whose jobs are not stored yet; whoever stores the jobs records them (DiscoveryState.record)
+        self.discovery_passes: List[DiscoveryPass] = []
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': USER_AGENT
         })
-        self._stop_scraping = False
+        # stop_scraping sets both; _wakeup is also set by each finished request
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self.duplicate_detector = None
+        # Set for a full run only; a scheduler retrying a page must get all of its jobs back
+        self.query_overlap: Optional[QueryOverlap] = None
+        self.metrics = ScrapeMetrics()
+        # Receivers that analyse the jobs found advance its "analyses" unit
+        self.progress = ScrapeProgress()
+        self.last_fetch_error: Optional[str] = None
+        # Listings found on the last page, including repeats of earlier queries
+        self.last_page_items = 0
+    
+    @property
+    def duplicate_count(self) -> int:
+        return self.duplicate_detector.duplicate_count if self.duplicate_detector is not None else 0
     
     def stop_scraping(self):
-        self._stop_scraping = True
+        """Cancel the run from any thread; blocked requests and delays return at once"""
+        self._stop_event.set()
+        self._wakeup.set()
+    
+    @property
+    def stopping(self) -> bool:
+        return self._stop_event.is_set()
     
     def run(self):
         try:
             self.jobs = []
-            active_sites = [site for site in self.config.job_sites if site.is_active]
-            total_operations = len(active_sites) * len(self.config.search_queries)
-            current_operation = 0
+            self.discovery_passes = []
+            self.metrics.reset()
+            self.progress.reset()
+            self.query_overlap = QueryOverlap()
+            # Reloaded from the store, so a site found down by an earlier run stays skipped until its cooldown ends
+            self.site_health = None
+            if self.config.detect_duplicates:
+                self.duplicate_detector = DuplicateDetector(self.config.duplicate_threshold)
             
-            for site in active_sites:
-                if self._stop_scraping:
+            if self.replay_archive is not None:
+                pages = self.replay_archive.pages()
+                action = "Replaying"
+            else:
+                pages = []
+                for site in self.config.job_sites:
+                    if not site.is_active:
+                        continue
+                    if site.uses_discovery:
+                        # One pass over the feed covers every query
+                        pages.append((site, ""))
+                    else:
+                        pages.extend((site, query) for query in self.config.search_queries)
+                action = "Scraping"
+                if self.config.archive_responses:
+                    self.archive_writer = CrawlArchiveWriter(self.config.archive_dir)
+            
+            self.progress.plan("pages", len(pages))
+            self._report_progress(force=True)
+            
+            for site, query in pages:
+                if self._stop_event.is_set():
                     break
-                    
-                for query in self.config.search_queries:
-                    if self._stop_scraping:
-                        break
-                    
-                    current_operation += 1
-                    self.progress_updated.emit(
-                        f"Scraping {site.name} for '{query}'...",
-                        current_operation,
-                        total_operations
-                    )
+                
+                if not self._get_site_health().allow(site.name):
+                    # The rest of a failing site's pages would only wait out timeouts and delays
+                    self.progress.cancel("pages")
+                    self.progress.set_message(f"Skipping {site.name} (not responding)...")
+                    self._report_progress()
+                    continue
+                
+                self.progress.set_message(
+                    f"{action} {site.name} for '{query}'..." if query else f"{action} {site.name} feed..."
+                )
+                self._report_progress()
+                
+                try:
+                    if not self._allowed(site, self._page_url(site, query)):
+                        self.progress.cancel("pages")
+                        self.progress.set_message(f"Skipping {site.name} for '{query}' (not allowed by robots.txt)..."
+                                                  if query else f"Skipping {site.name} feed (not allowed by robots.txt)...")
+                        self._report_progress()
+                        continue
                     
                     try:
                         jobs = self._scrape_site(site, query)
+                    finally:
+                        self.progress.advance("pages")
+                    opened = self._record_health(site, 1)
+                    if opened:
+                        self.error_occurred.emit(opened)
+                    with self.metrics.timer("emit", site.name, query):
                         for job in jobs:
+                            # Collapse reposts before they reach the analyzer
+                            original = self.duplicate_detector.add(job) if self.duplicate_detector is not None else None
+                            if original is not None:
+                                original.matched_queries += tuple(
+                                    matched for matched in job.matched_queries if matched not in original.matched_queries
+                                )
+                                continue
+                            self.progress.plan("analyses")
                             self.job_found.emit(job)
                             self.jobs.append(job)
-                        
-                        time.sleep(self.config.delay_between_requests)
-                        
-                    except Exception as e:
-                        self.error_occurred.emit(f"Error scraping {site.name}: {str(e)}")
+                    self._report_progress()
+                    
+                    if self.replay_archive is None:
+                        self._stop_event.wait(self.crawl_delay(site, self._page_url(site, query)))
+                    
+                except ScrapingCancelled:
+                    break
+                except Exception as e:
+                    self.metrics.record_error(site.name, "scrape")
+                    self._get_site_health().record_failure(site.name, str(e))
+                    self.error_occurred.emit(f"Error scraping {site.name}: {str(e)}")
             
+            self.metrics.finish()
+            self.progress.set_message("Stopped" if self._stop_event.is_set() else "Finished")
+            self._report_progress(force=True)
             self.scraping_finished.emit(self.jobs)
             
         except Exception as e:
             self.error_occurred.emit(f"Scraping failed: {str(e)}")
+        finally:
+            if self.archive_writer:
+                self.archive_writer.close()
+            # The connection belongs to this thread, so close it before the thread ends
+            self.close()
+    
+    def close(self):
+        """Close the job store opened for scraping, once the scraper is done"""
+        if self.site_health is not None:
+            # Kept for the run summary, without the connection closed below
+            self.site_health.close()
+        if self._store:
+            self._store.close()
+            self._store = self._discovery_state = self._crawl_policies = None
     
-    def _scrape_site(self, site: JobSite, query: str) -> List[JobListing]:
+    def _report_progress(self, force: bool = False):
+        if self.progress.due(force):
+            self.progress_changed.emit(self.progress.snapshot())
+    
+    def scrape_page(self, site: JobSite, query: str, page: int = 1) -> List[JobListing]:
+        """Scrape one page of search results, raising if it could not be fetched.
+        
+        A feed page leaves its pass in ``discovery_passes``, to be recorded with its jobs.
+        """
+        self.discovery_passes = []
+        if not self._get_site_health().allow(site.name):
+            raise SiteUnavailable(f"{site.name} is skipped after repeated failures")
+        url = self._page_url(site, query, page)
+        if not self._allowed(site, url):
+            raise CrawlDisallowed(f"{url} is not allowed by robots.txt")
+        jobs = self._scrape_site(site, query, page)
+        self._record_health(site, page)
+        if self.last_fetch_error:
+            raise IOError(self.last_fetch_error)
+        return jobs
+    
+    def _record_health(self, site: JobSite, page: int) -> Optional[str]:
+        """Feed the outcome of the last page to the site's circuit breaker.
+        
+        A first results page without any listing counts as a failure, since
+        it usually means the site changed its markup; later pages may simply
+        be past the end of the results. Returns a message if the site's
+        circuit has just opened.
+        """
+        health = self._get_site_health()
+        if self.last_fetch_error:
+            error = self.last_fetch_error
+        elif page == 1 and not self.last_page_items and not site.uses_discovery:
+            error = "no job listings found"
+        else:
+            health.record_success(site.name, self.last_page_items)
+            return None
+        
+        if not health.record_failure(site.name, error):
+            return None
+        minutes = max(1, round(health.cooldown / 60))
+        return (f"{site.name} failed {health.failure_threshold} times in a row ({error}). "
+                f"Its remaining pages are skipped; it will be tried again in {minutes} min.")
+    
+    def _scrape_site(self, site: JobSite, query: str, page: int = 1) -> List[JobListing]:
+        self.last_fetch_error = None
+        self.last_page_items = 0
+        if site.uses_discovery:
+            return self._discover_site(site)
+        
         jobs = []
         
         try:
-            search_url = site.get_search_url(query)
+            search_url = site.get_search_url(query, page)
             
             if "khmer24" in site.base_url.lower():
                 jobs = self._scrape_khmer24(site, search_url, query)
@@ -89,19 +271,9 @@ class JobScraper(QThread):
         jobs = []
         
         try:
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_elements = soup.find_all(['div', 'article'], class_=re.compile(r'job|listing|item'))
-            
-            for element in job_elements[:20]:
-                if self._stop_scraping:
-                    break
-                
-                job = self._extract_job_info(element, site)
-                if job:
-                    jobs.append(job)
+            cutoff = ListingCutoff(20, ['div', 'article'], re.compile(r'job|listing|item'))
+            content = self._fetch(site, query, search_url, cutoff)
+            jobs = self._page_jobs(site, query, content, 20, cutoff.elements)
                     
         except Exception as e:
             print(f"Error scraping Khmer24: {e}")
@@ -113,19 +285,9 @@ class JobScraper(QThread):
         jobs = []
         
         try:
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_elements = soup.find_all(['div', 'article'], class_=re.compile(r'job|listing|item'))
-            
-            for element in job_elements[:20]:
-                if self._stop_scraping:
-                    break
-                
-                job = self._extract_job_info(element, site)
-                if job:
-                    jobs.append(job)
+            cutoff = ListingCutoff(20, ['div', 'article'], re.compile(r'job|listing|item'))
+            content = self._fetch(site, query, search_url, cutoff)
+            jobs = self._page_jobs(site, query, content, 20, cutoff.elements)
                     
         except Exception as e:
             print(f"Error scraping BongThom: {e}")
@@ -137,20 +299,10 @@ class JobScraper(QThread):
         jobs = []
         
         try:
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             # Generic job listing extraction
-            job_elements = soup.find_all(['div', 'article'], class_=re.compile(r'job|listing|item'))
-            
-            for element in job_elements[:20]:
-                if self._stop_scraping:
-                    break
-                
-                job = self._extract_job_info(element, site)
-                if job:
-                    jobs.append(job)
+            cutoff = ListingCutoff(20, ['div', 'article'], re.compile(r'job|listing|item'))
+            content = self._fetch(site, query, search_url, cutoff)
+            jobs = self._page_jobs(site, query, content, 20, cutoff.elements)
                     
         except Exception as e:
             print(f"Error scraping Jobtify: {e}")
@@ -162,28 +314,387 @@ class JobScraper(QThread):
         jobs = []
         
         try:
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             # Look for common job listing patterns
-            job_elements = soup.find_all(['div', 'article', 'li'], 
-                                       class_=re.compile(r'job|listing|item|card'))
+            cutoff = ListingCutoff(15, ['div', 'article', 'li'], re.compile(r'job|listing|item|card'))
+            content = self._fetch(site, query, search_url, cutoff)
+            jobs = self._page_jobs(site, query, content, 15, cutoff.elements)
+                    
+        except Exception as e:
+            print(f"Error with generic scraping: {e}")
+        
+        return jobs
+    
+    def _discover_site(self, site: JobSite) -> List[JobListing]:
+        """Fetch the postings a site's sitemap or feed lists as new or changed since the last run.
+        
+        Jobs are kept if they match at least one search query. The postings
+        fetched are added to ``discovery_passes`` rather than marked in the
+        store, so they are only skipped next time once their jobs are stored;
+        postings that could not be fetched are tried again next run.
+        """
+        jobs = []
+        fetched: List[FeedEntry] = []
+        state = self._get_discovery_state()
+        checked_at = time.time()
+        
+        try:
+            entries = self._read_feed(site, site.discovery_url, state)
+            if state is not None:
+                entries = state.changed(site.name, entries)
+            if self.replay_archive is not None:
+                entries = [entry for entry in entries if entry.url in self.replay_archive]
+            
+            queries = self.config.search_queries
+            # Feeds with titles let postings that match no query be skipped without fetching them
+            candidates = [entry for entry in entries
+                          if (not entry.title or matching_queries(f"{entry.title} {entry.summary}", queries))
+                          and self._allowed(site, entry.url)]
+            limit = self.config.discovery_fetch_limit
+            self.progress.plan("postings", len(candidates[:limit]))
+            
+            try:
+                for entry in candidates[:limit]:
+                    if self._stop_event.is_set():
+                        break
+                    
+                    try:
+                        content = self._fetch(site, "", entry.url)
+                    except Exception as e:
+                        # A single posting does not fail the whole site
+                        self.last_fetch_error = None
+                        print(f"Error fetching {entry.url}: {e}")
+                        continue
+                    finally:
+                        self.progress.advance("postings")
+                        self._report_progress()
+                    fetched.append(entry)
+                    
+                    for job in self._extract_posting(site, content, entry):
+                        job.matched_queries = tuple(matching_queries(f"{job.title} {job.description}", queries))
+                        if job.matched_queries:
+                            if self.query_overlap is not None:
+                                self.query_overlap.add(job, job.matched_queries)
+                            jobs.append(job)
+                    
+                    if self.replay_archive is None:
+                        self._stop_event.wait(self.crawl_delay(site, entry.url))
+            finally:
+                if state is not None:
+                    # Only a complete pass lets the next run skip unchanged child sitemaps
+                    self.discovery_passes.append(
+                        (site.name, fetched, checked_at if len(fetched) == len(candidates) else None)
+                    )
+                
+        except Exception as e:
+            print(f"Error discovering {site.name}: {e}")
+        
+        return jobs
+    
+    def _read_feed(self, site: JobSite, url: str, state: Optional[DiscoveryState],
+                   depth: int = 0) -> List[FeedEntry]:
+        """Posting entries of a feed, following sitemap indexes to changed child sitemaps"""
+        content = self._fetch(site, "", url)
+        with self.metrics.timer("parse", site.name):
+            entries, sitemaps = parse_feed(content)
+        
+        last_checked = state.last_checked(site.name) if state is not None else None
+        for sitemap in sitemaps:
+            if depth >= 2:
+                break
+            # A child sitemap untouched since the last full check lists nothing new
+            if last_checked and sitemap.modified and sitemap.modified < last_checked:
+                continue
+            if not self._allowed(site, sitemap.url):
+                continue
+            entries.extend(self._read_feed(site, sitemap.url, state, depth + 1))
+        return entries
+    
+    def _extract_posting(self, site: JobSite, content: bytes, entry: FeedEntry) -> List[JobListing]:
+        """The job on a posting page, from its JSON-LD or else the page heuristics and feed entry"""
+        jobs = self._page_jobs(site, "", content, 1, lambda: [BeautifulSoup(content, 'html.parser')])
+        if not jobs and entry.title:
+            jobs = [JobListing(title=entry.title, company="Unknown Company", location="Cambodia",
+                               description=entry.summary, url=entry.url, source_site=site.name)]
+        
+        for job in jobs:
+            # The page's own links point elsewhere; the feed has the posting's address
+            job.url = entry.url
+        return jobs
+    
+    def _get_store(self) -> Optional[JobStore]:
+        if self._store is None and self.db_path:
+            # Opened on first use, in the thread that scrapes
+            self._store = JobStore(self.db_path, check_same_thread=self.thread_bound_store)
+        return self._store
+    
+    def _get_discovery_state(self) -> Optional[DiscoveryState]:
+        if self._discovery_state is None and self.db_path:
+            self._discovery_state = DiscoveryState(self._get_store())
+        return self._discovery_state
+    
+    def _get_site_health(self) -> SiteHealth:
+        if self.site_health is None:
+            self.site_health = SiteHealth(self._get_store(), self.config.circuit_failure_threshold,
+                                          self.config.circuit_cooldown)
+        return self.site_health
+    
+    def _get_crawl_policies(self) -> CrawlPolicies:
+        if self._crawl_policies is None:
+            self._crawl_policies = CrawlPolicies(self._get_store(), self.config, self._fetch_robots)
+        return self._crawl_policies
+    
+    def _fetch_robots(self, url: str) -> Tuple[int, bytes]:
+        # Read as far as fetch_robots would, so both ways of fetching robots.txt see the same rules
+        response, content, _ = self._get(url, limit=ROBOTS_MAX_BYTES)
+        return response.status_code, content
+    
+    @staticmethod
+    def _page_url(site: JobSite, query: str, page: int = 1) -> str:
+        return site.discovery_url if site.uses_discovery else site.get_search_url(query, page)
+    
+    def _allowed(self, site: JobSite, url: str) -> bool:
+        """Whether robots.txt lets us fetch the URL; replays fetch nothing"""
+        return self.replay_archive is not None or self._get_crawl_policies().allows(site, url)
+    
+    def crawl_delay(self, site: JobSite, url: Optional[str] = None) -> float:
+        """Seconds to wait after requesting ``url`` (by default a listing page of the site),
+        from the site's settings and the robots.txt of the URL's host"""
+        return self._get_crawl_policies().delay(site, url)
+    
+    def _fetch(self, site: JobSite, query: str, url: str, cutoff: Optional[ListingCutoff] = None) -> bytes:
+        """GET a page (or read it back from the replay archive), recording its latency and size.
+        
+        With a cutoff the body is parsed as it arrives, and reading stops
+        once the cutoff has all the listings it needs or at
+        ``max_response_bytes``; the bytes read so far are returned. Without
+        one, a body over ``max_response_bytes`` raises ResponseTooLarge
+        rather than returning a truncated document. While responses are
+        archived, pages are read in full (up to the cap) before the cutoff
+        sees them, so replays get the whole page.
+        """
+        try:
+            if self.replay_archive is not None:
+                with self.metrics.timer("fetch", site.name, query):
+                    content = self.replay_archive.get(url)
+                    if content is None:
+                        raise LookupError(f"{url} is not in the replay archive")
+                    if cutoff is not None:
+                        self._feed_cutoff(cutoff, content)
+                self.metrics.add_bytes(site.name, len(content))
+                return content
             
-            for element in job_elements[:15]:
-                if self._stop_scraping:
+            with self.metrics.timer("fetch", site.name, query):
+                if self.archive_writer and cutoff is not None:
+                    response, content, truncated = self._get(url, limit=self.config.max_response_bytes)
+                    self._feed_cutoff(cutoff, content, response)
+                else:
+                    response, content, truncated = self._get(url, cutoff)
+                response.raise_for_status()
+        except Exception as e:
+            self.last_fetch_error = f"{url}: {e}"
+            raise
+        
+        self.metrics.add_bytes(site.name, len(content))
+        
+        if self.archive_writer:
+            self.archive_writer.write_response(site, query, url, response.status_code,
+                                               dict(response.headers), content, truncated)
+        return content
+    
+    @staticmethod
+    def _feed_cutoff(cutoff: ListingCutoff, content: bytes, response: Optional[requests.Response] = None):
+        """Parse a body that was read in full with the cutoff, in the chunks _get would feed it"""
+        if response is not None and 'charset' in response.headers.get('Content-Type', ''):
+            cutoff.encoding = response.encoding
+        for start in range(0, len(content), STREAM_CHUNK_SIZE):
+            if cutoff.feed(content[start:start + STREAM_CHUNK_SIZE]):
+                break
+    
+    def _read_body(self, response: requests.Response, deliver: Callable[[bytes], bool], limit: int,
+                   truncate: bool) -> bool:
+        """Pass on a streamed body in chunks until it ends, reaches ``limit`` bytes or is no longer wanted.
+        
+        Past the limit the body is cut short if ``truncate`` is set, and
+        ResponseTooLarge is raised otherwise. Returns whether it was cut short.
+        """
+        size = 0
+        try:
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                if size + len(chunk) > limit:
+                    if not truncate:
+                        raise ResponseTooLarge(f"{response.url} is larger than {limit} bytes")
+                    if size < limit:
+                        deliver(chunk[:limit - size])
+                    return True
+                size += len(chunk)
+                if not deliver(chunk):
+                    break
+        finally:
+            # Releases the connection without reading the rest of the body
+            response.close()
+        return False
+    
+    def _get(self, url: str, cutoff: Optional[ListingCutoff] = None,
+             limit: Optional[int] = None) -> Tuple[requests.Response, bytes, bool]:
+        """session.get and the body read on a helper thread, so stop_scraping can abandon them immediately.
+        
+        requests offers no way to interrupt a blocking call; an abandoned
+        request finishes (or times out) on its daemon thread and is discarded.
+        The body's chunks are fed to the cutoff on this thread, since lxml
+        parsers must stay on the thread that created them. A ``limit`` cuts
+        the body short at that many bytes; otherwise ``max_response_bytes``
+        applies as _fetch describes. Returns the response, the body and
+        whether the body was cut short at the size limit.
+        """
+        self._wakeup.clear()
+        if self._stop_event.is_set():
+            raise ScrapingCancelled(url)
+        
+        outcome = {}
+        arrived = deque()
+        enough = threading.Event()
+        # Keeps the download a few chunks ahead of the parser at most, so a cutoff also stops the download
+        room = threading.Semaphore(STREAM_READ_AHEAD)
+        
+        def deliver(chunk: bytes) -> bool:
+            """Hand a chunk over; False once no more of the body is wanted"""
+            arrived.append(chunk)
+            self._wakeup.set()
+            while not room.acquire(timeout=0.1):
+                if enough.is_set() or self._stop_event.is_set():
+                    return False
+            return not (enough.is_set() or self._stop_event.is_set())
+        
+        def request():
+            try:
+                response = self.session.get(url, timeout=10, stream=True)
+                outcome['response'] = response
+                if response.ok:
+                    outcome['truncated'] = self._read_body(response, deliver,
+                                                           limit or self.config.max_response_bytes,
+                                                           truncate=cutoff is not None or limit is not None)
+                else:
+                    # Error pages are not read; raise_for_status reports them
+                    response.close()
+            except Exception as e:
+                outcome['error'] = e
+            outcome['done'] = True
+            self._wakeup.set()
+        
+        threading.Thread(target=request, name="scraper-request", daemon=True).start()
+        
+        chunks = []
+        try:
+            while True:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                if self._stop_event.is_set():
+                    raise ScrapingCancelled(url)
+                # Checked before draining, so no chunk delivered before 'done' is left behind
+                done = 'done' in outcome
+                while arrived:
+                    chunk = arrived.popleft()
+                    room.release()
+                    if cutoff is not None and not chunks and 'charset' in outcome['response'].headers.get('Content-Type', ''):
+                        cutoff.encoding = outcome['response'].encoding
+                    chunks.append(chunk)
+                    if cutoff is not None and not enough.is_set() and cutoff.feed(chunk):
+                        enough.set()
+                if done:
+                    break
+        finally:
+            # Whether done, cancelled or failed in the cutoff, the request thread must not wait for room
+            enough.set()
+        
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['response'], b"".join(chunks), outcome.get('truncated', False)
+    
+    def _page_jobs(self, site: JobSite, query: str, content: bytes, limit: int,
+                   elements: Callable[[], list]) -> List[JobListing]:
+        """Listings from the page's JSON-LD, or else from the listing elements ``elements()`` parses.
+        
+        Both parses count as one "parse" observation for the page.
+        """
+        parse = self.metrics.stage_timer("parse", site.name, query)
+        try:
+            with parse.part():
+                postings = find_job_postings(content)
+            jobs = self._extract_structured(site, query, postings, limit)
+            if jobs is not None:
+                return jobs
+            with parse.part():
+                job_elements = elements()
+        finally:
+            parse.record()
+        return self._extract_jobs(site, query, job_elements)
+    
+    def _extract_structured(self, site: JobSite, query: str, postings: List[Dict],
+                            limit: int) -> Optional[List[JobListing]]:
+        """Listings from the page's JSON-LD JobPosting blocks, or None if it has no usable ones"""
+        if not postings:
+            return None
+        
+        jobs = []
+        extracted = 0
+        with self.metrics.timer("extract", site.name, query):
+            for posting in postings[:limit]:
+                job = job_from_posting(posting, site)
+                if job is None:
+                    continue
+                extracted += 1
+                if self._is_repeat(job.url, query):
+                    continue
+                self._credit_query(job, query)
+                jobs.append(job)
+        
+        if not extracted:
+            return None
+        self.last_page_items = extracted
+        self.metrics.record_page(site.name, query, len(jobs))
+        return jobs
+    
+    def _extract_jobs(self, site: JobSite, query: str, job_elements) -> List[JobListing]:
+        """Extract listings from one search page's job elements"""
+        jobs = []
+        with self.metrics.timer("extract", site.name, query):
+            for element in job_elements:
+                if self._stop_event.is_set():
                     break
                 
-                job = self._extract_job_info(element, site)
+                # Checked before the field lookups, which are most of the extraction cost
+                url = self._element_url(element, site)
+                if self._is_repeat(url, query):
+                    self.last_page_items += 1
+                    continue
+                
+                job = self._extract_job_info(element, site, url)
                 if job:
+                    self.last_page_items += 1
+                    self._credit_query(job, query)
                     jobs.append(job)
-                    
-        except Exception as e:
-            print(f"Error with generic scraping: {e}")
         
+        self.metrics.record_page(site.name, query, len(jobs))
         return jobs
     
-    def _extract_job_info(self, element, site: JobSite) -> Optional[JobListing]:
+    def _is_repeat(self, url: str, query: str) -> bool:
+        """Whether another query of this run already returned the posting"""
+        return bool(query) and self.query_overlap is not None and self.query_overlap.repeat(url, query) is not None
+    
+    def _credit_query(self, job: JobListing, query: str):
+        if query:
+            job.matched_queries = (query,)
+            if self.query_overlap is not None:
+                self.query_overlap.add(job, job.matched_queries)
+    
+    def _element_url(self, element, site: JobSite) -> str:
+        link_elem = element.find('a', href=True)
+        if not link_elem:
+            return ""
+        href = link_elem['href']
+        return href if href.startswith('http') else urljoin(site.base_url, href)
+    
+    def _extract_job_info(self, element, site: JobSite, url: Optional[str] = None) -> Optional[JobListing]:
         """Extract job information from HTML element"""
         try:
             title_elem = element.find(['h1', 'h2', 'h3', 'h4', 'a'], 
@@ -202,14 +713,8 @@ class JobScraper(QThread):
                                    class_=re.compile(r'description|summary|content'))
             description = desc_elem.get_text(strip=True) if desc_elem else ""
             
-            link_elem = element.find('a', href=True)
-            url = ""
-            if link_elem:
-                href = link_elem['href']
-                if href.startswith('http'):
-                    url = href
-                else:
-                    url = urljoin(site.base_url, href)
+            if url is None:
+                url = self._element_url(element, site)
             
             if title and title != "Unknown Title" and len(title) > 3:
                 return JobListing(
@@ -222,6 +727,7 @@ class JobScraper(QThread):
                 )
                 
         except Exception as e:
+            self.metrics.record_error(site.name, "extract")
             print(f"Error extracting job info: {e}")
         
         return None
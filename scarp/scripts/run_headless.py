@@ -0,0 +1,179 @@
+"""
+Run one scrape without the GUI and report its metrics.
+
+    python scarp/scripts/run_headless.py --config config.json --prometheus-file scrape.prom
+
+Jobs are analyzed and stored exactly as the main window does, so the run
+shows up in the Demand Trends tab. With --archive the raw responses are
+archived as well, and --replay runs extraction and analysis over such an
+archive (with the current config's vocabulary) instead of the network,
+without storing anything. The per-stage metrics are printed as a
+summary, written as JSON and, optionally, rendered in the Prometheus text
+format to a file (for a node_exporter textfile collector) or served on
+/metrics while the run is in progress.
+"""
+
+import argparse
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager
+from skill_analyzer import SkillAnalyzer
+from job_store import JobStore
+from analytics_cache import AnalyticsCache
+from scraper import JobScraper
+from discovery import DiscoveryState
+from crawl_archive import CrawlArchiveReader, list_archives
+
+
+def serve_metrics(metrics, port: int) -> ThreadingHTTPServer:
+    """Expose the live metrics at http://127.0.0.1:<port>/metrics"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_atomic(path: str, text: str):
+    # Scrapers of the textfile collector must never see a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape the configured job sites without the GUI")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--db", default="job_data.db", help="SQLite job store")
+    parser.add_argument("--metrics-json", help="JSON metrics file (default: the configured metrics_file)")
+    parser.add_argument("--prometheus-file", help="Write the metrics in Prometheus text format to this file")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port during the run")
+    parser.add_argument("--archive", action="store_true", help="Archive raw responses for later replay")
+    parser.add_argument("--replay", metavar="RUN_DIR",
+                        help="Replay an archived run instead of scraping ('latest' for the newest one)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the run summary")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config).load_config()
+    if args.archive:
+        config.archive_responses = True
+
+    replay_archive = None
+    if args.replay:
+        run_dir = args.replay
+        if run_dir == "latest":
+            archives = list_archives(config.archive_dir)
+            if not archives:
+                print(f"No archived runs in {os.path.abspath(config.archive_dir)}", file=sys.stderr)
+                return 2
+            run_dir = archives[-1]
+        replay_archive = CrawlArchiveReader(run_dir)
+        print(f"Replaying {len(replay_archive)} archived responses from {run_dir}")
+
+    analyzer = SkillAnalyzer(config.skill_categories)
+    store = JobStore(args.db)
+    analytics = AnalyticsCache(store)
+
+    # A replay must not touch the discovery state of real runs
+    scraper = JobScraper(config, replay_archive, db_path=None if replay_archive else args.db)
+    metrics = scraper.metrics
+    server = serve_metrics(metrics, args.metrics_port) if args.metrics_port else None
+
+    def on_job_found(job):
+        with metrics.timer("analyze", job.source_site):
+            analytics.add_jobs([job], analyzer)
+        scraper.progress.advance("analyses")
+
+    def on_progress(snapshot):
+        if not args.quiet:
+            print(f"[{snapshot.percent:3d}%] {snapshot}")
+
+    scraper.job_found.connect(on_job_found)
+    scraper.progress_changed.connect(on_progress)
+    scraper.error_occurred.connect(lambda message: print(f"Error: {message}", file=sys.stderr))
+
+    try:
+        # Run in this thread; with no event loop the signals are delivered directly
+        scraper.run()
+
+        passes = scraper.discovery_passes if replay_archive is None else []
+        discovery_state = DiscoveryState(store) if passes else None
+        if scraper.jobs and replay_archive is None:
+            with metrics.timer("store"):
+                # One transaction, so feed postings count as fetched only once their jobs are stored
+                with store.conn:
+                    if discovery_state is not None:
+                        discovery_state.record(passes)
+                    session_id = store.save_session(
+                        scraper.jobs,
+                        [site.name for site in config.job_sites if site.is_active],
+                        config.search_queries,
+                        analyzer.all_skills
+                    )
+                analytics.save(f"session:{session_id}")
+            print(f"Saved session {session_id} with {len(scraper.jobs)} jobs "
+                  f"({scraper.duplicate_count} near-duplicates collapsed, "
+                  f"{scraper.query_overlap.repeats} repeats across queries dropped)")
+        elif scraper.jobs:
+            stats = analytics.get_statistics(analyzer)
+            print(f"Replayed {len(scraper.jobs)} jobs ({scraper.duplicate_count} near-duplicates collapsed), "
+                  f"{stats.get('unique_skills_found', 0)} unique skills")
+            for skill, count in stats.get('most_demanded_skills', [])[:10]:
+                print(f"  {skill:<25} {count}")
+        else:
+            if discovery_state is not None:
+                # Postings that matched no query need not be fetched again next run
+                with store.conn:
+                    discovery_state.record(passes)
+            print("No job listings were found.")
+    finally:
+        metrics.finish()
+        if server:
+            server.shutdown()
+            server.server_close()
+        store.close()
+
+    if scraper.archive_writer:
+        print(f"Archived {scraper.archive_writer.record_count} responses to {scraper.archive_writer.path}")
+    print()
+    print(metrics.summary())
+    if scraper.query_overlap is not None and scraper.query_overlap.results:
+        print()
+        print(scraper.query_overlap.summary())
+    health = scraper.site_health.summary() if scraper.site_health is not None else ""
+    if health:
+        print()
+        print(health)
+
+    metrics_json = args.metrics_json or config.metrics_file
+    if metrics_json:
+        metrics.write_json(metrics_json)
+        print(f"\nRun metrics written to {os.path.abspath(metrics_json)}")
+    if args.prometheus_file:
+        write_atomic(args.prometheus_file, metrics.to_prometheus())
+        print(f"Prometheus metrics written to {os.path.abspath(args.prometheus_file)}")
+
+    return 0 if scraper.jobs else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
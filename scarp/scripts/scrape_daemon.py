@@ -0,0 +1,64 @@
+"""
+Long-running scraping service.
+
+    python scarp/scripts/scrape_daemon.py --config config.json --schedule "0 */6 * * *" --workers 4
+
+Runs the configured sites and queries on a cron-like schedule (the
+``schedule`` scraping setting by default) and writes every page's jobs
+straight into the job store, where the main window picks them up. Queue
+state lives in the store too, so after a crash or Ctrl+C the interrupted
+run is resumed on the next start. Use --once to resume or run a single
+crawl and exit, e.g. from an external scheduler.
+
+With --processes N the run is sharded: N worker processes claim pages from
+the shared queue under leases and parse them in parallel, and this process
+merges their jobs into the store through one duplicate detector.
+"""
+
+import argparse
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager
+from job_store import JobStore
+from scheduler import ScrapeScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape job sites on a schedule")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--db", default="job_data.db", help="SQLite job store")
+    parser.add_argument("--schedule", help="Cron expression (default: the configured schedule)")
+    parser.add_argument("--workers", type=int, help="Concurrent fetch workers (default: the configured number)")
+    parser.add_argument("--processes", type=int,
+                        help="Shard runs across this many worker processes instead of threads")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per page before it is given up")
+    parser.add_argument("--once", action="store_true", help="Resume or start one run, then exit")
+    args = parser.parse_args()
+
+    store = JobStore(args.db)
+    scheduler = ScrapeScheduler(ConfigManager(args.config), store, schedule=args.schedule,
+                                workers=args.workers, max_attempts=args.max_attempts,
+                                processes=args.processes)
+
+    def request_stop(signum, frame):
+        scheduler.log("Stopping after the pages in flight...")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    try:
+        if args.once:
+            scheduler.run(scheduler.queue.unfinished_run())
+        else:
+            scheduler.serve_forever()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
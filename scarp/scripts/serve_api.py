@@ -0,0 +1,49 @@
+"""
+Serve the job store over a local read-only HTTP API.
+
+    python scarp/scripts/serve_api.py --db job_data.db --port 8765
+    curl 'http://127.0.0.1:8765/jobs?limit=20&skill=Python'
+
+See job_api.py for the endpoints. The store is opened read-only, so the
+API can run next to the main window and the scrape daemon.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_api import make_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve scraped jobs and skill trends as JSON")
+    parser.add_argument("--db", default="job_data.db", help="SQLite job store")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.db):
+        print(f"No job store at {os.path.abspath(args.db)}", file=sys.stderr)
+        return 2
+    try:
+        server = make_server(args.db, args.host, args.port)
+    except sqlite3.Error as e:
+        print(f"Cannot open {args.db}: {e}", file=sys.stderr)
+        return 2
+
+    print(f"Serving {os.path.abspath(args.db)} on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.api.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
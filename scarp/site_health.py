@@ -0,0 +1,218 @@
+"""
+Per-site circuit breakers, with health statistics kept in the job store.
+
+A site that fails several pages in a row (fetch errors, or a first results
+page without a single listing, which usually means its markup changed) has
+its circuit opened: its remaining pages are skipped instead of each waiting
+out timeouts and delays. After a cooldown one probe page is let through;
+if it succeeds the circuit closes again, otherwise it reopens. The state
+is stored per site, so a later run knows a site was down a minute ago,
+and every transition is a single statement on the stored row, so the
+threads and worker processes of a run share one circuit per site.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from job_store import JobStore
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class SiteUnavailable(IOError):
+    """A page was not attempted because its site's circuit is open"""
+
+
+class CircuitBreaker:
+    __slots__ = ('state', 'consecutive_failures', 'opened_at', 'probing',
+                 'pages', 'failures', 'skipped', 'last_error')
+
+    def __init__(self, state: str = CLOSED, consecutive_failures: int = 0, opened_at: Optional[float] = None):
+        self.state = state
+        self.consecutive_failures = consecutive_failures
+        self.opened_at = opened_at
+        # Without a store: whether the half-open probe has been let through
+        self.probing = False
+        # Counted for this instance only; the stored totals cover all runs
+        self.pages = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_error = ""
+
+
+class SiteHealth:
+    """Circuit breakers for the sites of a run, persisted if a job store is given"""
+
+    def __init__(self, job_store: Optional[JobStore] = None, failure_threshold: int = 3,
+                 cooldown: float = 1800.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.conn = job_store.conn if job_store is not None else None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        if self.conn is not None:
+            self._create_table()
+
+    def _create_table(self):
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS site_health (
+                    site TEXT PRIMARY KEY,
+                    state TEXT NOT NULL DEFAULT 'closed',
+                    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                    opened_at REAL,
+                    pages INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    empty_pages INTEGER NOT NULL DEFAULT 0,
+                    items INTEGER NOT NULL DEFAULT 0,
+                    last_success_at REAL,
+                    last_error TEXT,
+                    updated_at REAL
+                )
+            ''')
+
+    def close(self):
+        """Stop persisting, e.g. before the owning thread closes the store"""
+        self.conn = None
+
+    def _breaker(self, site: str) -> CircuitBreaker:
+        breaker = self._breakers.get(site)
+        if breaker is None:
+            breaker = self._breakers[site] = CircuitBreaker()
+        return breaker
+
+    def allow(self, site: str) -> bool:
+        """Whether a page of the site may be fetched now; counts it as skipped if not.
+
+        With a store the state is read from it on every call, since other
+        threads and processes update it, and the single probe after the
+        cooldown is claimed there so only one of them makes it.
+        """
+        with self._lock:
+            breaker = self._breaker(site)
+            now = time.time()
+            if self.conn is not None:
+                allowed = self._allow_stored(site, breaker, now)
+            else:
+                if breaker.state == OPEN and now - (breaker.opened_at or 0.0) >= self.cooldown:
+                    breaker.state = HALF_OPEN
+                    breaker.probing = False
+                allowed = breaker.state == CLOSED or (breaker.state == HALF_OPEN and not breaker.probing)
+                breaker.probing = breaker.state == HALF_OPEN
+            if not allowed:
+                breaker.skipped += 1
+            return allowed
+
+    def _allow_stored(self, site: str, breaker: CircuitBreaker, now: float) -> bool:
+        row = self.conn.execute(
+            "SELECT state, consecutive_failures, opened_at FROM site_health WHERE site = ?", (site,)
+        ).fetchone()
+        if row is None:
+            breaker.state = CLOSED
+            return True
+        breaker.state, breaker.consecutive_failures, breaker.opened_at = row
+        if breaker.state == CLOSED:
+            return True
+
+        # The cooldown has passed since the circuit opened, or since a probe that never reported back
+        with self.conn:
+            claimed = self.conn.execute(
+                "UPDATE site_health SET state = ?, updated_at = ? WHERE site = ? AND "
+                "((state = ? AND opened_at <= ?) OR (state = ? AND updated_at <= ?))",
+                (HALF_OPEN, now, site, OPEN, now - self.cooldown, HALF_OPEN, now - self.cooldown)
+            ).rowcount == 1
+        if claimed:
+            breaker.state = HALF_OPEN
+        return claimed
+
+    def record_success(self, site: str, items: int):
+        """A page was fetched; ``items`` may be 0 for pages past the end of the results.
+
+        Closes the circuit unless another worker opened it after this page
+        was let through; the probe's success closes a half-open one.
+        """
+        with self._lock:
+            breaker = self._breaker(site)
+            breaker.pages += 1
+            breaker.probing = False
+            if self.conn is None:
+                if breaker.state != OPEN:
+                    breaker.state = CLOSED
+                    breaker.consecutive_failures = 0
+                    breaker.opened_at = None
+                return
+            now = time.time()
+            with self.conn:
+                row = self.conn.execute(
+                    "INSERT INTO site_health (site, state, consecutive_failures, pages, empty_pages, items, "
+                    "last_success_at, updated_at) VALUES (?, ?, 0, 1, ?, ?, ?, ?) "
+                    "ON CONFLICT (site) DO UPDATE SET "
+                    "state = CASE WHEN state = ? THEN state ELSE ? END, "
+                    "consecutive_failures = CASE WHEN state = ? THEN consecutive_failures ELSE 0 END, "
+                    "opened_at = CASE WHEN state = ? THEN opened_at END, "
+                    "pages = pages + 1, empty_pages = empty_pages + excluded.empty_pages, "
+                    "items = items + excluded.items, last_success_at = excluded.last_success_at, "
+                    "updated_at = excluded.updated_at "
+                    "RETURNING state, consecutive_failures, opened_at",
+                    (site, CLOSED, int(items == 0), items, now, now, OPEN, CLOSED, OPEN, OPEN)
+                ).fetchone()
+            breaker.state, breaker.consecutive_failures, breaker.opened_at = row
+
+    def record_failure(self, site: str, error: str) -> bool:
+        """Count a failed page; returns True if this opened the site's circuit"""
+        with self._lock:
+            breaker = self._breaker(site)
+            breaker.pages += 1
+            breaker.failures += 1
+            breaker.last_error = error
+            breaker.probing = False
+            now = time.time()
+            if self.conn is None:
+                breaker.consecutive_failures += 1
+                opened = breaker.state != OPEN and (
+                    breaker.state == HALF_OPEN or breaker.consecutive_failures >= self.failure_threshold
+                )
+                if opened:
+                    breaker.state = OPEN
+                    breaker.opened_at = now
+                return opened
+
+            # A failed probe reopens the circuit; otherwise it opens at the threshold
+            opens = "(state = ? OR consecutive_failures + 1 >= ?)"
+            with self.conn:
+                row = self.conn.execute(
+                    "INSERT INTO site_health (site, state, consecutive_failures, opened_at, pages, failures, "
+                    "last_error, updated_at) VALUES (?, ?, 1, ?, 1, 1, ?, ?) "
+                    "ON CONFLICT (site) DO UPDATE SET "
+                    f"state = CASE WHEN {opens} THEN ? ELSE state END, "
+                    f"opened_at = CASE WHEN state != ? AND {opens} THEN ? ELSE opened_at END, "
+                    "consecutive_failures = consecutive_failures + 1, pages = pages + 1, failures = failures + 1, "
+                    "last_error = excluded.last_error, updated_at = excluded.updated_at "
+                    "RETURNING state, consecutive_failures, opened_at",
+                    (site, OPEN if self.failure_threshold <= 1 else CLOSED, now if self.failure_threshold <= 1 else None,
+                     error, now, HALF_OPEN, self.failure_threshold, OPEN, OPEN, HALF_OPEN, self.failure_threshold, now)
+                ).fetchone()
+            breaker.state, breaker.consecutive_failures, breaker.opened_at = row
+            return breaker.state == OPEN and breaker.opened_at == now
+
+    def is_open(self, site: str) -> bool:
+        with self._lock:
+            breaker = self._breaker(site)
+            if self.conn is not None:
+                row = self.conn.execute("SELECT state FROM site_health WHERE site = ?", (site,)).fetchone()
+                breaker.state = row[0] if row else CLOSED
+            return breaker.state != CLOSED
+
+    def summary(self) -> str:
+        """One line per site that failed or was skipped in this process"""
+        lines = []
+        with self._lock:
+            for site, breaker in sorted(self._breakers.items()):
+                if not breaker.failures and not breaker.skipped:
+                    continue
+                line = (f"{site}: circuit {breaker.state.replace('_', '-')}, {breaker.failures} of "
+                        f"{breaker.pages} pages failed, {breaker.skipped} skipped")
+                if breaker.last_error:
+                    line += f" (last error: {breaker.last_error})"
+                lines.append(line)
+        return "\n".join(lines)
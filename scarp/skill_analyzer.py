@@ -3,35 +3,147 @@ Skill analysis and matching engine
 """
 
 import re
-from typing import List, Dict, Tuple
+import hashlib
+from typing import List, Dict, Optional, Iterable
 from collections import Counter
 from data_models import JobListing, SkillCategory
 
+# Bump when matching semantics change so cached analytics get rescanned
+MATCHER_VERSION = "2"
+
+
+def _normalize_surface(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _trie_pattern(surfaces: Iterable[str]) -> str:
+    """Compile surface forms into one regex that shares common prefixes"""
+    trie = {}
+    for surface in surfaces:
+        node = trie
+        for char in surface:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        branches = []
+        for char in sorted(key for key in node if key):
+            token = r"\s+" if char == " " else re.escape(char)
+            branches.append(token + emit(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Optional continuation is greedy, so the longest surface wins
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
 class SkillAnalyzer:
     """Analyzes job listings for skill requirements"""
     
     def __init__(self, skill_categories: List[SkillCategory]):
         self.skill_categories = skill_categories
         self.all_skills = {}
+        self.skill_surfaces = {}
+        self.surface_to_skill = {}
         self._build_skill_mapping()
     
     def _build_skill_mapping(self):
-        """Build mapping of skills to categories"""
+        """Build mapping of skills and their aliases to categories"""
         self.all_skills = {}
+        self.skill_surfaces = {}
         for category in self.skill_categories:
             for skill in category.skills:
-                self.all_skills[skill.lower()] = category.name
+                key = skill.lower()
+                self.all_skills[key] = category.name
+                surfaces = self.skill_surfaces.setdefault(key, [_normalize_surface(skill)])
+                for alias in category.aliases.get(skill, []):
+                    alias = _normalize_surface(alias)
+                    if alias and alias not in surfaces:
+                        surfaces.append(alias)
+        
+        self.surface_to_skill = {}
+        for skill, surfaces in self.skill_surfaces.items():
+            for surface in surfaces:
+                self.surface_to_skill[surface] = skill
+        
+        self._build_matcher()
     
-    def analyze_job(self, job: JobListing) -> List[str]:
-        """Analyze a single job listing for skills"""
-        found_skills = []
-        text_to_analyze = f"{job.title} {job.description}".lower()
+    def _build_matcher(self):
+        """Compile every skill and alias into a single one-pass matcher"""
+        surfaces = [surface for surface in self.surface_to_skill if surface]
+        if not surfaces:
+            self._matcher = None
+            self._implied = {}
+            return
         
-        for skill, category in self.all_skills.items():
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if re.search(pattern, text_to_analyze):
-                found_skills.append(skill.title())
+        # The lookahead makes matches overlap, so "React Native" still lets
+        # "Native..." style surfaces starting inside it be found
+        self._matcher = re.compile(r"(?=(?<!\w)(" + _trie_pattern(surfaces) + r")(?!\w))")
         
+        # Only the longest surface is reported per start position, so record
+        # the shorter surfaces it implies ("react native" implies "react")
+        self._implied = {}
+        for surface in surfaces:
+            for end, char in enumerate(surface):
+                prefix = surface[:end]
+                if end and not _is_word_char(char) and prefix in self.surface_to_skill:
+                    self._implied.setdefault(surface, set()).add(self.surface_to_skill[prefix])
+    
+    def skill_signatures(self) -> Dict[str, str]:
+        """Hash of what each skill matches, keyed by lowercased skill name"""
+        effective = {skill: [] for skill in self.skill_surfaces}
+        for surface, skill in self.surface_to_skill.items():
+            effective[skill].append(surface)
+        
+        return {
+            skill: hashlib.sha1(
+                f"{MATCHER_VERSION}:{'|'.join(sorted(surfaces))}".encode('utf-8')
+            ).hexdigest()[:12]
+            for skill, surfaces in effective.items()
+        }
+    
+    def vocabulary_hash(self) -> str:
+        """Hash of the whole vocabulary including the skill to category mapping"""
+        digest = hashlib.sha1()
+        for skill, signature in sorted(self.skill_signatures().items()):
+            digest.update(f"{skill}={signature}:{self.all_skills[skill]};".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def match_skills(self, text: str) -> List[str]:
+        """Canonical (lowercased) skills mentioned in the text, in order of appearance"""
+        if self._matcher is None:
+            return []
+        
+        found = {}
+        for match in self._matcher.finditer(text.lower()):
+            surface = match.group(1)
+            if " " in surface or "\n" in surface or "\t" in surface:
+                surface = " ".join(surface.split())
+            skill = self.surface_to_skill.get(surface)
+            if skill is not None:
+                found[skill] = True
+            for implied in self._implied.get(surface, ()):
+                found[implied] = True
+        return list(found)
+    
+    def find_skills(self, job: JobListing, skills: Optional[Iterable[str]] = None) -> List[str]:
+        """Find skills in a job without touching it, optionally limited to some skills"""
+        found = self.match_skills(f"{job.title} {job.description}")
+        if skills is not None:
+            wanted = {skill.lower() for skill in skills}
+            found = [skill for skill in found if skill in wanted]
+        
+        return [skill.title() for skill in found]
+    
+    def analyze_job(self, job: JobListing) -> List[str]:
+        """Analyze a single job listing for skills"""
+        found_skills = self.find_skills(job)
         job.identified_skills = found_skills
         return found_skills
     
@@ -70,16 +182,27 @@ class SkillAnalyzer:
     def get_skill_statistics(self, jobs: List[JobListing]) -> Dict[str, any]:
         """Get detailed skill statistics"""
         analysis = self.analyze_jobs(jobs)
+        return self.build_statistics(analysis['skill_counts'], analysis['total_jobs'])
+    
+    def build_statistics(self, skill_counts: Counter, total_jobs: int) -> Dict[str, any]:
+        """Build skill statistics from precomputed per-skill mention counts"""
+        category_counts = {cat.name: Counter() for cat in self.skill_categories}
+        for skill, count in skill_counts.items():
+            category = self.all_skills.get(skill.lower())
+            if category is not None and count:
+                category_counts[category][skill] += count
+        
+        skill_counts = Counter({skill: count for skill, count in skill_counts.items() if count})
         
         stats = {
-            'total_jobs_analyzed': analysis['total_jobs'],
-            'unique_skills_found': len(analysis['skill_counts']),
-            'most_demanded_skills': analysis['top_skills'][:10],
+            'total_jobs_analyzed': total_jobs,
+            'unique_skills_found': len(skill_counts),
+            'most_demanded_skills': skill_counts.most_common(10),
             'category_breakdown': {}
         }
         
         for category in self.skill_categories:
-            cat_skills = analysis['category_counts'][category.name]
+            cat_skills = category_counts[category.name]
             if cat_skills:
                 stats['category_breakdown'][category.name] = {
                     'total_mentions': sum(cat_skills.values()),
@@ -0,0 +1,236 @@
+"""
+Re-analysis of stored jobs after the skill vocabulary changes.
+
+The signature of each skill (what it matches, see
+``SkillAnalyzer.skill_signatures``) is recorded alongside the job store
+once its job_skills reflect it. When the vocabulary changes only the skills
+whose signature changed are rescanned, and only on the jobs that could be
+affected: those the search index finds a surface form of the skill in, and
+those already tagged with it. Large rescans are split into chunks that a
+pool of worker processes reads and matches straight from the database,
+while the results are written back here one chunk per transaction.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from data_models import JobListing, SkillCategory
+from job_store import JobStore
+from skill_analyzer import SkillAnalyzer
+from job_archive import archive_path, update_job_archive
+
+# Jobs matched per task and written per transaction
+REANALYSIS_CHUNK_SIZE = 500
+
+# Fewer chunks than this are matched in this process; starting workers would take longer
+MIN_POOL_CHUNKS = 4
+
+_worker_store: Optional[JobStore] = None
+_worker_analyzer: Optional[SkillAnalyzer] = None
+
+
+def _init_worker(db_path: str, skill_categories: List[SkillCategory]):
+    global _worker_store, _worker_analyzer
+    _worker_store = JobStore(db_path, read_only=True)
+    _worker_analyzer = SkillAnalyzer(skill_categories)
+
+
+def _scan_chunk(job_ids: List[int], skills: List[str]) -> List[Tuple[int, List[str]]]:
+    return scan_jobs(_worker_store, _worker_analyzer, job_ids, skills)
+
+
+def scan_jobs(job_store: JobStore, analyzer: SkillAnalyzer, job_ids: List[int],
+              skills: List[str]) -> List[Tuple[int, List[str]]]:
+    """(job id, skills found) for stored jobs, limited to the given lowercased skills"""
+    if not skills:
+        return [(job_id, []) for job_id in job_ids]
+    rows = job_store.conn.execute(
+        f"SELECT id, title, {job_store.description_sql()} FROM jobs "
+        f"WHERE id IN ({', '.join('?' for _ in job_ids)})",
+        job_ids
+    )
+    return [
+        (job_id, analyzer.find_skills(JobListing(title, "", "", description, "", ""), skills))
+        for job_id, title, description in rows
+    ]
+
+
+def _fts_phrase(surface: str) -> str:
+    return '"' + surface.replace('"', '""') + '"'
+
+
+class SkillReanalyzer:
+    """Keeps the skills of stored jobs in line with the current vocabulary"""
+
+    def __init__(self, job_store: JobStore, chunk_size: int = REANALYSIS_CHUNK_SIZE,
+                 processes: Optional[int] = None):
+        self.job_store = job_store
+        self.chunk_size = chunk_size
+        self.processes = processes or os.cpu_count() or 1
+        self._create_table()
+
+    def _create_table(self):
+        with self.job_store.conn:
+            self.job_store.conn.execute('''
+                CREATE TABLE IF NOT EXISTS skill_vocabulary (
+                    skill TEXT PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    category TEXT
+                )
+            ''')
+
+    def stored_vocabulary(self) -> Dict[str, Tuple[str, str]]:
+        """Lowercased skill -> (signature, category) that the stored job skills reflect"""
+        return {
+            skill: (signature, category) for skill, signature, category in
+            self.job_store.conn.execute("SELECT skill, signature, category FROM skill_vocabulary")
+        }
+
+    def _vocabulary(self, analyzer: SkillAnalyzer) -> Dict[str, Tuple[str, str]]:
+        return {skill: (signature, analyzer.all_skills[skill])
+                for skill, signature in analyzer.skill_signatures().items()}
+
+    def needs_update(self, analyzer: SkillAnalyzer) -> bool:
+        return self.stored_vocabulary() != self._vocabulary(analyzer)
+
+    def affected_skills(self, analyzer: SkillAnalyzer) -> Set[str]:
+        """Lowercased skills added, removed or matching differently since the stored vocabulary.
+
+        Without a recorded vocabulary nothing is known about how stored jobs
+        were analyzed, so every skill counts as affected.
+        """
+        stored = self.stored_vocabulary()
+        signatures = analyzer.skill_signatures()
+        if not stored:
+            tagged = {name.lower() for name, in self.job_store.conn.execute(
+                "SELECT DISTINCT s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id"
+            )}
+            return set(signatures) | tagged
+        return {
+            skill for skill in set(signatures) | set(stored)
+            if signatures.get(skill) != (stored[skill][0] if skill in stored else None)
+        }
+
+    def candidate_jobs(self, analyzer: SkillAnalyzer, affected: Set[str]) -> List[int]:
+        """Ids of the stored jobs whose skills may change"""
+        conn = self.job_store.conn
+        rescan = [skill for skill in affected if skill in analyzer.skill_surfaces]
+        surfaces = [surface for skill in rescan for surface, owner in analyzer.surface_to_skill.items()
+                    if owner == skill and surface]
+        # A surface without letters or digits has no tokens for the index to look up
+        if rescan and (not self.job_store.has_search_index or len(rescan) == len(analyzer.skill_surfaces)
+                       or any(not any(char.isalnum() for char in surface) for surface in surfaces)):
+            return [job_id for job_id, in conn.execute("SELECT id FROM jobs ORDER BY id")]
+
+        job_ids = set()
+        if surfaces:
+            expression = " OR ".join(_fts_phrase(surface) for surface in surfaces)
+            job_ids.update(job_id for job_id, in conn.execute(
+                "SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?", (f"{{title description}} : ({expression})",)
+            ))
+        for skill in affected:
+            job_ids.update(job_id for job_id, in conn.execute(
+                "SELECT js.job_id FROM job_skills js JOIN skills s ON s.id = js.skill_id WHERE lower(s.name) = ?",
+                (skill,)
+            ))
+        return sorted(job_ids)
+
+    def reanalyze(self, analyzer: SkillAnalyzer, progress: Optional[Callable[[int, int], None]] = None,
+                  stop_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Bring stored job skills, rollups and the search index in line with the analyzer.
+
+        Safe to interrupt: the vocabulary is only recorded once every chunk
+        is written, and redoing a chunk gives the same result. The last
+        chunk, the category rollups and the vocabulary are committed
+        together, so readers never see the new skills under old categories.
+        """
+        affected = self.affected_skills(analyzer)
+        rescan = sorted(skill for skill in affected if skill in analyzer.skill_surfaces)
+        job_ids = self.candidate_jobs(analyzer, affected) if affected else []
+        chunks = [job_ids[start:start + self.chunk_size] for start in range(0, len(job_ids), self.chunk_size)]
+        summary = {'skills': sorted(affected), 'jobs_scanned': 0, 'jobs_changed': 0, 'complete': False}
+
+        if len(chunks) < MIN_POOL_CHUNKS or not rescan or self.processes < 2:
+            results = (scan_jobs(self.job_store, analyzer, chunk, rescan) for chunk in chunks)
+            pool = None
+        else:
+            # spawn rather than fork: workers must not inherit Qt or SQLite state
+            pool = ProcessPoolExecutor(max_workers=min(self.processes, len(chunks)),
+                                       mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker,
+                                       initargs=(self.job_store.db_path, analyzer.skill_categories))
+            results = pool.map(_scan_chunk, chunks, [rescan] * len(chunks))
+
+        try:
+            for index, found in enumerate(results):
+                if stop_event is not None and stop_event.is_set():
+                    return summary
+                last = index == len(chunks) - 1
+                if last:
+                    self._record_vocabulary(analyzer)
+                summary['jobs_changed'] += self.job_store.replace_job_skills(
+                    found, affected, analyzer.all_skills, update_categories=last
+                )
+                summary['jobs_scanned'] += len(found)
+                if progress is not None:
+                    progress(summary['jobs_scanned'], len(job_ids))
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if not chunks:
+            self._record_vocabulary(analyzer)
+            self.job_store.set_skill_categories(analyzer.all_skills)
+        summary['complete'] = True
+        return summary
+
+    def _record_vocabulary(self, analyzer: SkillAnalyzer):
+        """Issue the vocabulary's statements; the job store call that follows commits them"""
+        conn = self.job_store.conn
+        conn.execute("DELETE FROM skill_vocabulary")
+        conn.executemany("INSERT INTO skill_vocabulary (skill, signature, category) VALUES (?, ?, ?)",
+                         [(skill, signature, category)
+                          for skill, (signature, category) in self._vocabulary(analyzer).items()])
+
+
+class ReanalysisThread(QThread):
+    """Runs SkillReanalyzer on its own connection, then rewrites the job archive if skills changed"""
+
+    progress_updated = pyqtSignal(int, int)
+    reanalysis_finished = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, db_path: str, skill_categories: List[SkillCategory]):
+        super().__init__()
+        self.db_path = db_path
+        self.skill_categories = skill_categories
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        store = None
+        try:
+            store = JobStore(self.db_path)
+            summary = SkillReanalyzer(store).reanalyze(
+                SkillAnalyzer(self.skill_categories), self.progress_updated.emit, self._stop_event
+            )
+            summary['archive_rebuilt'] = False
+            if summary['jobs_changed'] and not self._stop_event.is_set():
+                try:
+                    update_job_archive(store, archive_path(self.db_path), rebuild=True).close()
+                    summary['archive_rebuilt'] = True
+                except OSError as e:
+                    # e.g. another writer held the archive's lock too long; the window rebuilds it
+                    print(f"Error rebuilding the job archive: {e}")
+            self.reanalysis_finished.emit(summary)
+        except Exception as e:
+            self.error_occurred.emit(f"Error re-analyzing stored jobs: {str(e)}")
+        finally:
+            if store is not None:
+                store.close()
@@ -0,0 +1,135 @@
+"""
+schema.org JobPosting extraction from embedded JSON-LD.
+
+Many job boards describe their listings in ``<script type="application/ld+json">``
+blocks for search engines. Those blocks are found with a regular expression
+over the raw page and decoded with the json module, so no DOM is built, and
+their fields are exact where the class-name heuristics in the scraper have
+to guess.
+"""
+
+import html
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+from data_models import JobListing, JobSite
+
+_LD_JSON_BLOCK = re.compile(
+    rb'<script[^>]*?type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def find_job_postings(content: bytes) -> List[Dict]:
+    """JobPosting objects from every JSON-LD block of a page, in page order.
+
+    Postings nested in ``@graph`` or ``ItemList`` wrappers are found too.
+    Blocks that are not valid JSON are skipped.
+    """
+    if b'ld+json' not in content:
+        return []
+
+    postings = []
+    for match in _LD_JSON_BLOCK.finditer(content):
+        postings.extend(block_postings(match.group(1)))
+    return postings
+
+
+def block_postings(block: bytes) -> List[Dict]:
+    """JobPosting objects in the text of one JSON-LD script block"""
+    block = block.strip()
+    # Some CMSs still wrap scripts in HTML comments or CDATA sections
+    for prefix, suffix in ((b'<!--', b'-->'), (b'<![CDATA[', b']]>')):
+        if block.startswith(prefix) and block.endswith(suffix):
+            block = block[len(prefix):-len(suffix)].strip()
+    try:
+        # strict=False accepts the raw newlines often left inside descriptions
+        data = json.loads(block.decode('utf-8', errors='replace'), strict=False)
+    except ValueError:
+        return []
+    return list(_walk(data))
+
+
+def _walk(node, depth: int = 0) -> Iterator[Dict]:
+    if depth > 8:
+        return
+    if isinstance(node, list):
+        for value in node:
+            yield from _walk(value, depth + 1)
+    elif isinstance(node, dict):
+        if _is_job_posting(node):
+            yield node
+            return
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _walk(value, depth + 1)
+
+
+def _is_job_posting(node: Dict) -> bool:
+    types = node.get('@type')
+    if not isinstance(types, list):
+        types = [types]
+    # Matches "JobPosting" as well as "schema:JobPosting" and "https://schema.org/JobPosting"
+    return any(isinstance(value, str) and value.rsplit('/', 1)[-1].rsplit(':', 1)[-1] == 'JobPosting'
+               for value in types)
+
+
+def _text(value) -> str:
+    """Plain text of a property that may be a string, a named object or a list of either"""
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('@value') or ""
+    if not isinstance(value, str):
+        return str(value) if isinstance(value, (int, float)) else ""
+    return _WHITESPACE.sub(' ', html.unescape(_TAG.sub(' ', value))).strip()
+
+
+def _location(posting: Dict) -> str:
+    places = posting.get('jobLocation')
+    if not isinstance(places, list):
+        places = [places]
+
+    names = []
+    for place in places:
+        if isinstance(place, dict):
+            address = place.get('address', place)
+            if isinstance(address, dict):
+                parts = [_text(address.get(key))
+                         for key in ('addressLocality', 'addressRegion', 'addressCountry')]
+            else:
+                parts = [_text(address)]
+        else:
+            parts = [_text(place)]
+        name = ", ".join(dict.fromkeys(part for part in parts if part))
+        if name and name not in names:
+            names.append(name)
+
+    if names:
+        return "; ".join(names)
+    if _text(posting.get('jobLocationType')).upper() == 'TELECOMMUTE':
+        return "Remote"
+    return "Cambodia"
+
+
+def job_from_posting(posting: Dict, site: JobSite) -> Optional[JobListing]:
+    """Map a JobPosting object to a listing, or None if it has no usable title"""
+    title = _text(posting.get('title'))
+    if len(title) <= 3:
+        return None
+
+    url = _text(posting.get('url')) or _text(posting.get('sameAs'))
+    if not url and isinstance(posting.get('@id'), str) and posting['@id'].startswith('http'):
+        url = posting['@id']
+
+    return JobListing(
+        title=title,
+        company=_text(posting.get('hiringOrganization')) or "Unknown Company",
+        location=_location(posting),
+        description=_text(posting.get('description')),
+        url=urljoin(site.base_url, url) if url else "",
+        source_site=site.name
+    )
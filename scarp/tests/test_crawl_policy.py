@@ -0,0 +1,79 @@
+import pytest
+
+from crawl_policy import ROBOTS_AGENT, USER_AGENT, CrawlPolicies, RobotsRules
+from data_models import JobSite, ScrapingConfig
+from scraper import JobScraper
+
+ROBOTS = {
+    "https://www.example.com/robots.txt": b"User-agent: *\nDisallow:\n",
+    "https://jobs.example.net/robots.txt": b"User-agent: scarp\nCrawl-delay: 7\n",
+    "https://cdn.example.org/robots.txt": b"User-agent: *\nCrawl-delay: 3\n",
+}
+
+SITE = JobSite(name="a", base_url="https://www.example.com",
+               search_url_template="https://jobs.example.net/search?q={query}&page={page}")
+
+
+def policies():
+    config = ScrapingConfig(job_sites=[SITE], search_queries=["python"], skill_categories=[],
+                            delay_between_requests=1.0)
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return (200, ROBOTS[url]) if url in ROBOTS else (404, b"")
+
+    return CrawlPolicies(None, config, fetch), fetched
+
+
+def test_delay_follows_the_host_actually_fetched():
+    crawl_policies, fetched = policies()
+    assert crawl_policies.delay(SITE) == 7
+    assert crawl_policies.concurrency(SITE) == 1
+    assert crawl_policies.delay(SITE, "https://cdn.example.org/postings/1") == 3
+    assert crawl_policies.delay(SITE, "https://www.example.com/about") == 1.0
+    assert "https://jobs.example.net/robots.txt" in fetched
+
+
+def test_every_request_identifies_us():
+    assert ROBOTS_AGENT in USER_AGENT
+    scraper = JobScraper(ScrapingConfig(job_sites=[SITE], search_queries=["python"], skill_categories=[]))
+    assert scraper.session.headers["User-Agent"] == USER_AGENT
+
+
+def test_robots_groups_and_longest_match():
+    rules = RobotsRules.parse(
+        "User-agent: *\n"
+        "Disallow: /\n"
+        "\n"
+        "User-agent: otherbot\n"
+        "User-agent: Scarp  # our group\n"
+        "Disallow: /jobs/\n"
+        "Allow: /jobs/public\n"
+        "Disallow: /*.pdf$\n"
+        "Disallow: /search?*sort=\n"
+        "Crawl-delay: 2.5\n"
+    )
+    assert rules.crawl_delay == 2.5
+    assert rules.allows("https://a.example/about")
+    assert not rules.allows("https://a.example/jobs/42")
+    assert rules.allows("https://a.example/jobs/public/42")
+    assert not rules.allows("https://a.example/files/job.pdf")
+    assert rules.allows("https://a.example/files/job.pdf?download=1")
+    assert not rules.allows("https://a.example/search?q=python&sort=date")
+    assert rules.allows("https://a.example/robots.txt")
+
+
+def test_robots_falls_back_to_the_star_group():
+    rules = RobotsRules.parse("User-agent: otherbot\nDisallow: /\n\nUser-agent: *\nDisallow: /private\nAllow: /\n")
+    assert rules.crawl_delay is None
+    assert rules.allows("https://a.example/jobs")
+    assert not rules.allows("https://a.example/private/1")
+    assert RobotsRules.parse("").allows("https://a.example/anything")
+
+
+@pytest.mark.parametrize("status, allowed", [(200, False), (404, True), (500, False), (429, False)])
+def test_unreachable_robots_disallows_and_missing_allows(status, allowed):
+    config = ScrapingConfig(job_sites=[SITE], search_queries=["python"], skill_categories=[])
+    crawl_policies = CrawlPolicies(None, config, lambda url: (status, b"User-agent: *\nDisallow: /\n"))
+    assert crawl_policies.allows(SITE, "https://jobs.example.net/search?q=python") == allowed
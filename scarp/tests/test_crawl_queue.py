@@ -0,0 +1,160 @@
+import time
+import types
+
+import pytest
+
+import crawl_queue
+from crawl_queue import CrawlQueue, LeaseHeartbeat, DONE, FAILED, PENDING, RETRY_BACKOFF
+from data_models import JobListing, JobSite, ScrapingConfig
+from discovery import DiscoveryState, FeedEntry
+from job_store import JobStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(crawl_queue, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def _config(*names: str, queries=("python",)) -> ScrapingConfig:
+    sites = [JobSite(name, f"https://{name}.example", f"https://{name}.example/s?q={{query}}") for name in names]
+    return ScrapingConfig(sites, list(queries), [])
+
+
+def test_failed_item_waits_out_its_backoff(store, clock):
+    queue = CrawlQueue(store)
+    run_id = queue.create_run(_config("a"))
+
+    item = queue.claim(run_id)
+    assert queue.fail(item, "timeout", max_attempts=3) == RETRY_BACKOFF
+    assert queue.claim(run_id) is None
+    assert queue.next_retry_at(run_id) == clock[0] + RETRY_BACKOFF
+
+    clock[0] += RETRY_BACKOFF
+    retried = queue.claim(run_id)
+    assert retried.id == item.id and retried.attempts == 2
+    assert queue.fail(retried, "timeout", max_attempts=3) == 2 * RETRY_BACKOFF
+
+    clock[0] += 2 * RETRY_BACKOFF
+    last = queue.claim(run_id)
+    assert queue.fail(last, "timeout", max_attempts=3) is None
+    assert queue.progress(run_id)[FAILED] == 1
+    assert queue.next_retry_at(run_id) is None
+
+
+def test_expired_lease_on_last_attempt_fails_the_item(store, clock):
+    queue = CrawlQueue(store)
+    run_id = queue.create_run(_config("a"))
+
+    first = queue.claim(run_id, lease_seconds=10, max_attempts=2)
+    clock[0] += 11
+    second = queue.claim(run_id, lease_seconds=10, max_attempts=2)
+    assert second.id == first.id and second.attempts == 2
+    clock[0] += 11
+
+    assert queue.claim(run_id, lease_seconds=10, max_attempts=2) is None
+    assert queue.progress(run_id)[FAILED] == 1
+
+
+def test_latest_finished_session_skips_running_runs(store, clock):
+    queue = CrawlQueue(store)
+    job = JobListing("Python Developer", "Acme", "Phnom Penh", "Python", "https://a.example/1", "a")
+    store.save_session([job], ["a"], ["python"], {})
+    finished = queue.latest_finished_session()
+
+    run_id = queue.create_run(_config("a"))
+    item = queue.claim(run_id)
+    queue.complete(item, [JobListing("Go Developer", "Beta", "Phnom Penh", "Go", "https://a.example/2", "a")], {})
+    assert queue.latest_finished_session() == finished
+
+    queue.finish_run(run_id)
+    assert queue.latest_finished_session() == (queue.session_id(run_id), 1)
+    assert queue.progress(run_id)[DONE] == 1 and not queue.progress(run_id)[PENDING]
+
+
+def test_renewed_lease_is_not_claimed_again(store, clock):
+    queue = CrawlQueue(store)
+    run_id = queue.create_run(_config("a", queries=("python",)))
+
+    item = queue.claim(run_id, lease_seconds=10)
+    clock[0] += 8
+    assert queue.renew(item, lease_seconds=10)
+    clock[0] += 8
+    assert queue.claim(run_id, lease_seconds=10) is None
+
+    clock[0] += 3
+    reclaimed = queue.claim(run_id, lease_seconds=10)
+    assert reclaimed.id == item.id
+    # The first worker lost the item and can no longer renew or complete it
+    assert not queue.renew(item, lease_seconds=10)
+    assert not queue.complete(item, [], {})
+    assert queue.complete(reclaimed, [], {})
+
+
+def test_heartbeat_keeps_a_slow_item_leased(store):
+    queue = CrawlQueue(store)
+    run_id = queue.create_run(_config("a"))
+    with LeaseHeartbeat(store, lease_seconds=0.3) as heartbeat:
+        item = queue.claim(run_id, lease_seconds=0.3)
+        heartbeat.track(item)
+        time.sleep(0.8)
+        assert queue.claim(run_id, lease_seconds=0.3) is None
+        heartbeat.untrack(item)
+    assert queue.complete(item, [], {})
+
+
+def test_claim_respects_per_site_limits(store, clock):
+    queue = CrawlQueue(store)
+    run_id = queue.create_run(_config("a", "b", queries=("q1", "q2", "q3")))
+
+    claimed = [queue.claim(run_id, site_limits={"a": 2}) for _ in range(4)]
+    assert [item.site.name for item in claimed if item] == ["a", "a", "b"]
+    assert claimed[3] is None
+
+    assert queue.complete(claimed[0], [], {})
+    assert queue.claim(run_id, site_limits={"a": 2}).site.name == "a"
+
+
+def test_claims_from_two_queues_never_share_an_item(store, tmp_path):
+    other_store = JobStore(store.db_path)
+    try:
+        queues = [CrawlQueue(store), CrawlQueue(other_store)]
+        run_id = queues[0].create_run(_config("a", "b", "c", "d"))
+        claimed = [queues[i % 2].claim(run_id, site_limits={name: 4 for name in "abcd"}) for i in range(4)]
+        assert len({item.id for item in claimed}) == 4
+        assert queues[0].claim(run_id) is None and queues[1].claim(run_id) is None
+    finally:
+        other_store.close()
+
+
+@pytest.mark.parametrize("store_jobs", [
+    lambda queue, item, jobs: queue.complete(item, jobs, {}),
+    lambda queue, item, jobs: queue.stage(item, jobs),
+], ids=["complete", "stage"])
+def test_feed_postings_are_marked_fetched_only_with_their_jobs(store, clock, store_jobs):
+    queue = CrawlQueue(store)
+    state = DiscoveryState(store)
+    run_id = queue.create_run(_config("a"))
+    entries = [FeedEntry("https://a.example/jobs/1", modified=1.0)]
+    job = JobListing("Python Developer", "Acme", "Phnom Penh", "Python", entries[0].url, "a")
+
+    lost = queue.claim(run_id, lease_seconds=10)
+    clock[0] += 11
+    reclaimed = queue.claim(run_id, lease_seconds=10)
+    state.record([("a", entries, clock[0])])
+    assert not store_jobs(queue, lost, [job])
+    assert state.changed("a", entries) == entries
+    assert state.last_checked("a") is None
+
+    state.record([("a", entries, clock[0])])
+    assert store_jobs(queue, reclaimed, [job])
+    assert state.changed("a", entries) == []
+    assert state.last_checked("a") == clock[0]
@@ -0,0 +1,54 @@
+from data_models import JobListing, JobSite, ScrapingConfig
+from duplicate_detector import DuplicateDetector
+
+DESCRIPTION = ("We are looking for a backend developer with Python and Django experience "
+               "to build REST APIs for our payments platform in Phnom Penh.")
+
+
+def _job(title: str, company: str, description: str, site: str) -> JobListing:
+    return JobListing(title, company, "Phnom Penh", description, f"https://{site}/job", site)
+
+
+def test_near_duplicate_is_dropped():
+    detector = DuplicateDetector(0.8)
+    original = _job("Python Developer", "Acme Co", DESCRIPTION, "a.example")
+    repost = _job("Python Developer", "Acme Co.", DESCRIPTION + " Apply now!", "b.example")
+    other = _job("Accountant", "Bank Ltd", "Prepare monthly financial statements and audits.", "a.example")
+
+    assert detector.add(original) is None
+    assert detector.add(repost) is original
+    assert detector.add(other) is None
+    assert len(detector) == 2
+    assert detector.duplicate_count == 1
+
+
+def test_scraper_run_collapses_reposts(qapp, monkeypatch):
+    # An empty detector is falsy (it has __len__), so this guards the scraper's dedup check
+    from scraper import JobScraper
+    site = JobSite("a", "https://a.example", "https://a.example/s?q={query}", respect_robots=False)
+    config = ScrapingConfig([site], ["python"], [], delay_between_requests=0.0, metrics_file="")
+    scraper = JobScraper(config)
+    jobs = [_job("Python Developer", "Acme Co", DESCRIPTION, "a.example"),
+            _job("Python Developer", "Acme Co.", DESCRIPTION + " Apply now!", "a.example")]
+    monkeypatch.setattr(scraper, "_scrape_site", lambda site, query, page=1: list(jobs))
+    found = []
+    scraper.job_found.connect(found.append)
+
+    scraper.run()
+
+    assert found == jobs[:1]
+    assert scraper.jobs == jobs[:1]
+    assert scraper.duplicate_count == 1
+
+
+def test_removed_jobs_no_longer_match():
+    detector = DuplicateDetector(0.8)
+    original = _job("Python Developer", "Acme Co", DESCRIPTION, "a.example")
+    repost = _job("Python Developer", "Acme Co.", DESCRIPTION + " Apply now!", "b.example")
+
+    assert detector.add(original) is None
+    assert detector.add(repost) is original
+    detector.remove(repost)
+    detector.remove(original)
+    assert len(detector) == 0 and detector.duplicate_count == 0
+    assert detector.add(repost) is None
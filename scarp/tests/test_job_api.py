@@ -0,0 +1,67 @@
+import json
+import threading
+from datetime import datetime
+from http.client import HTTPConnection
+
+import pytest
+
+from data_models import JobListing
+from job_api import make_server
+from job_store import JobStore
+
+
+def jobs(start, count):
+    return [JobListing(f"Python Developer {index}", "Acme", "Phnom Penh", "Django and PostgreSQL",
+                       f"https://a.example/{index}", "a", scraped_at=datetime(2026, 1, 5),
+                       identified_skills=["Python"])
+            for index in range(start, start + count)]
+
+
+@pytest.fixture
+def api(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.save_session(jobs(0, 3), ["a"], ["python"], {"python": "Languages"})
+    server = make_server(store.db_path, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get(path, **headers):
+        connection = HTTPConnection(*server.server_address, timeout=5)
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.getheader("ETag"), response.read()
+        finally:
+            connection.close()
+
+    yield store, get
+    server.shutdown()
+    server.server_close()
+    server.api.close()
+    store.close()
+
+
+def test_matching_etag_is_answered_with_304(api):
+    _, get = api
+    status, etag, body = get("/jobs?limit=2")
+    assert status == 200 and etag.startswith('W/"')
+    assert len(json.loads(body)['jobs']) == 2
+
+    status, again, body = get("/jobs?limit=2", **{"If-None-Match": f'W/"other", {etag}'})
+    assert (status, again, body) == (304, etag, b"")
+    # Each URL has its own tag
+    assert get("/jobs?limit=1", **{"If-None-Match": etag})[0] == 200
+
+
+def test_new_jobs_change_the_etag(api):
+    store, get = api
+    _, etag, _ = get("/skills")
+    store.save_session(jobs(3, 1), ["a"], ["python"], {"python": "Languages"})
+    status, fresh, body = get("/skills", **{"If-None-Match": etag})
+    assert status == 200 and fresh != etag
+
+
+def test_errors_carry_no_etag(api):
+    _, get = api
+    status, etag, body = get("/nowhere")
+    assert status == 404 and etag is None
+    assert "error" in json.loads(body)
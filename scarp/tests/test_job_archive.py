@@ -0,0 +1,137 @@
+import os
+import threading
+
+import pytest
+
+from data_models import JobListing
+from job_archive import archive_path, latest_archive_path, open_job_archive, update_job_archive
+from job_store import JobStore
+
+
+def _jobs(start: int, count: int):
+    return [JobListing(f"Developer {index}", f"Company {index % 3}", "Phnom Penh" if index % 2 else "Siem Reap",
+                       f"Python role {index}", f"https://a.example/{index}", "a",
+                       identified_skills=["Python"] if index % 2 else [])
+            for index in range(start, start + count)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def test_archive_round_trip(store):
+    jobs = _jobs(0, 5)
+    store.save_session(jobs, ["a"], ["python"], {"python": "Languages"})
+    archive = update_job_archive(store, archive_path(store.db_path))
+    try:
+        assert len(archive) == 5 and archive.max_job_id == jobs[-1].job_id
+        for row, job in enumerate(jobs):
+            assert (archive[row].title, archive[row].company, archive[row].location, archive[row].url) == \
+                   (job.title, job.company, job.location, job.url)
+            assert archive[row].job_id == job.job_id
+        assert archive[1].identified_skills == ("Python",) and archive[0].identified_skills == ()
+        assert archive[2].description == "Python role 2"
+        assert [job.title for job in archive.rows_where(location="Siem Reap")] == ["Developer 0", "Developer 2",
+                                                                                  "Developer 4"]
+    finally:
+        archive.close()
+
+
+def test_update_writes_a_new_generation_and_keeps_old_mappings_readable(store):
+    path = archive_path(store.db_path)
+    store.save_session(_jobs(0, 3), ["a"], ["python"], {})
+    first = update_job_archive(store, path)
+    store.save_session(_jobs(3, 2), ["a"], ["python"], {})
+    second = update_job_archive(store, path)
+    try:
+        assert second.path != first.path and latest_archive_path(path) == second.path
+        assert len(second) == 5 and second[-1].title == "Developer 4"
+        # The first generation's file is gone (on POSIX) but its mapping still reads
+        assert len(first) == 3 and first[2].title == "Developer 2"
+        assert not os.path.exists(first.path) or os.name == "nt"
+    finally:
+        first.close()
+        second.close()
+
+    unchanged = update_job_archive(store, path)
+    try:
+        assert unchanged.path == second.path
+    finally:
+        unchanged.close()
+
+
+def test_jobs_saved_during_an_update_go_to_the_next_generation(store, monkeypatch):
+    path = archive_path(store.db_path)
+    store.save_session(_jobs(0, 3), ["a"], ["python"], {})
+    other = JobStore(store.db_path)
+    conn = store.conn
+
+    class SaveAfterMaxId:
+        def execute(self, sql, *args):
+            cursor = conn.execute(sql, *args)
+            if "MAX(id)" in sql:
+                other.save_session(_jobs(3, 2), ["a"], ["python"], {})
+            return cursor
+
+    monkeypatch.setattr(store, "conn", SaveAfterMaxId())
+    try:
+        first = update_job_archive(store, path)
+    finally:
+        other.close()
+    monkeypatch.setattr(store, "conn", conn)
+    second = update_job_archive(store, path)
+    try:
+        assert len(first) == 3 and first.max_job_id == first[-1].job_id
+        assert [job.title for job in second.rows_where()] == [f"Developer {index}" for index in range(5)]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_concurrent_writers_leave_one_complete_archive(store):
+    path = archive_path(store.db_path)
+    store.save_session(_jobs(0, 200), ["a"], ["python"], {})
+    errors = []
+
+    def write(rebuild: bool):
+        writer = JobStore(store.db_path)
+        try:
+            for _ in range(5):
+                update_job_archive(writer, path, rebuild=rebuild).close()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            writer.close()
+
+    threads = [threading.Thread(target=write, args=(rebuild,)) for rebuild in (False, True, True)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    archive = open_job_archive(path)
+    try:
+        assert len(archive) == 200 and archive[199].title == "Developer 199"
+    finally:
+        archive.close()
+    leftovers = [name for name in os.listdir(os.path.dirname(store.db_path)) if ".cols" in name]
+    assert leftovers == [os.path.basename(archive.path)]
+
+
+def test_relative_store_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = JobStore("jobs.db")
+    try:
+        store.save_session(_jobs(0, 2), ["a"], ["python"], {})
+        archive = update_job_archive(store, archive_path(store.db_path))
+        archive.close()
+        assert os.path.exists(archive.path)
+        reopened = open_job_archive(archive_path(store.db_path))
+        assert reopened.path == archive.path and len(reopened) == 2
+        reopened.close()
+    finally:
+        store.close()
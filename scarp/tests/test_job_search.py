@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from data_models import JobListing
+from job_store import JobStore, text_matches
+
+JOBS = [
+    ("Senior Python Developer", "Acme Co", "Phnom Penh", "Build Django services on PostgreSQL.", ["Python", "Django"]),
+    ("Frontend Engineer", "Café Digital", "Siem Reap", "React and Node.js, some TypeScript.", ["React", "Node.js"]),
+    ("Accountant", "Bank Ltd", "Phnom Penh", "Prepare monthly statements.", []),
+]
+
+QUERIES = ["python", "pyth dev", "django penh", "node.j", "cafe", "react acme", "acc", "ython", "++", "reac siem"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    jobs = [JobListing(title, company, location, description, f"https://a.example/{index}", "a",
+                       identified_skills=skills)
+            for index, (title, company, location, description, skills) in enumerate(JOBS)]
+    store.save_session(jobs, ["a"], ["python"], {})
+    yield store, jobs
+    store.close()
+
+
+@pytest.mark.parametrize("text", QUERIES)
+def test_unsaved_jobs_match_like_the_search_index(store, text):
+    job_store, jobs = store
+    expected = {job.job_id for job in jobs
+                if text_matches(text, (job.title, job.company, job.location, job.description, *job.identified_skills))}
+    assert job_store.matching_job_ids(text) == expected
+
+
+def test_search_without_an_index_uses_the_same_rule(store):
+    job_store, jobs = store
+    indexed = {text: job_store.matching_job_ids(text) for text in QUERIES}
+    job_store.has_search_index = False
+    assert {text: job_store.matching_job_ids(text) for text in QUERIES} == indexed
+    assert indexed["pyth dev"] == {jobs[0].job_id}
+    assert job_store.matching_job_ids("penh", session_id=999) == set()
+
+
+def test_search_jobs_ranks_title_matches_first(store):
+    job_store, jobs = store
+    results = job_store.search_jobs("python")
+    assert [job.job_id for job, _ in results] == [jobs[0].job_id]
+    assert "[Python]" in results[0][1]
+
+
+def test_read_only_store_reads_uncompressed_descriptions(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY, title TEXT, company TEXT, location TEXT, "
+                 "description TEXT, url TEXT, source_site TEXT, scraped_at TIMESTAMP, session_id INTEGER)")
+    conn.execute("INSERT INTO jobs (title, description) VALUES ('Python Developer', 'Write Python')")
+    conn.commit()
+    conn.close()
+
+    store = JobStore(path, read_only=True)
+    try:
+        assert store.get_description(1) == "Write Python"
+        assert store.conn.execute(f"SELECT {store.description_sql()} FROM jobs").fetchone() == ("Write Python",)
+    finally:
+        store.close()
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+from data_models import JobListing
+from job_store import JobStore, period_start
+
+CATEGORIES = {"python": "Languages", "go": "Languages", "django": "Web"}
+
+
+def job(index, day, skills):
+    return JobListing(f"Engineer {index}", "Acme", "Phnom Penh", f"Job {index} " + "detail " * 50,
+                      f"https://a.example/{index}", "a", scraped_at=datetime(2026, 1, day, 9),
+                      identified_skills=skills)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def test_save_session_round_trip(store):
+    jobs = [job(0, 5, ["Python", "Django"]), job(1, 6, ["Go"])]
+    session_id = store.save_session(jobs, ["a"], ["engineer"], CATEGORIES)
+
+    assert store.get_latest_session() == (session_id, 2)
+    assert all(job.job_id for job in jobs)
+    loaded = list(store.load_session_jobs(session_id))
+    assert [(job.title, job.url, sorted(job.identified_skills)) for job in loaded] == [
+        ("Engineer 0", "https://a.example/0", ["Django", "Python"]),
+        ("Engineer 1", "https://a.example/1", ["Go"]),
+    ]
+    assert loaded[0].description == jobs[0].description
+    assert store.get_description(jobs[1].job_id) == jobs[1].description
+
+
+def test_sessions_fold_into_the_rollups(store):
+    # 2026-01-05 is a Monday, so the first three days share a week and the 12th starts the next
+    store.save_session([job(0, 5, ["Python", "Django"]), job(1, 6, ["Python"])], ["a"], ["engineer"], CATEGORIES)
+    store.save_session([job(2, 6, ["Go", "Python"]), job(3, 12, ["Django"])], ["a"], ["engineer"], CATEGORIES)
+
+    assert store.get_period_totals("week") == [("2026-01-05", 3), ("2026-01-12", 1)]
+    assert store.get_period_totals("day") == [("2026-01-05", 1), ("2026-01-06", 2), ("2026-01-12", 1)]
+    assert sorted(store.get_skill_rollups("week")) == [
+        ("2026-01-05", "Django", 1), ("2026-01-05", "Go", 1), ("2026-01-05", "Python", 3),
+        ("2026-01-12", "Django", 1),
+    ]
+    assert sorted(store.get_category_rollups("week")) == [
+        ("2026-01-05", "Languages", 4), ("2026-01-05", "Web", 1), ("2026-01-12", "Web", 1),
+    ]
+    assert store.get_top_skills("week", since="2026-01-06", limit=1) == [("Django", 1)]
+    assert store.get_top_skills("day", limit=2) == [("Python", 3), ("Django", 2)]
+
+
+def test_unknown_granularity_is_rejected():
+    with pytest.raises(ValueError):
+        period_start(datetime(2026, 1, 5), "month")
@@ -0,0 +1,59 @@
+import types
+from concurrent.futures import Future
+
+import pytest
+
+import crawl_queue
+from config_manager import ConfigManager
+from data_models import JobListing
+from duplicate_detector import DuplicateDetector
+from job_store import JobStore
+from scheduler import ScrapeScheduler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(crawl_queue, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    scheduler = ScrapeScheduler(ConfigManager(str(tmp_path / "config.json")), store, workers=1)
+    scheduler.config.search_queries = ["python"]
+    scheduler.config.job_sites = scheduler.config.job_sites[:1]
+    scheduler.duplicate_detector = DuplicateDetector()
+    yield scheduler
+    store.close()
+
+
+def _fetched(jobs):
+    future = Future()
+    future.set_result((jobs, []))
+    return future
+
+
+def _jobs():
+    return [JobListing(f"Python Developer {index}", f"Company {index}", "Phnom Penh",
+                       f"Python and Django role number {index} with a distinct team and product {index * 7}",
+                       f"https://a.example/{index}", "a") for index in range(3)]
+
+
+def test_item_with_a_lost_lease_leaves_no_trace(scheduler, clock):
+    run_id = scheduler.queue.create_run(scheduler.config)
+    scheduler.analytics.reset(f"session:{scheduler.queue.session_id(run_id)}")
+    first = scheduler.queue.claim(run_id, lease_seconds=10)
+    clock[0] += 11
+    second = scheduler.queue.claim(run_id, lease_seconds=10)
+    assert second.id == first.id
+
+    scheduler._finish_item(first, _fetched(_jobs()))
+    assert len(scheduler.duplicate_detector) == 0
+    assert scheduler.analytics.total_jobs == 0
+
+    # The worker that claimed the item again stores every job
+    scheduler._finish_item(second, _fetched(_jobs()))
+    assert scheduler.analytics.total_jobs == 3
+    assert len(scheduler.job_store.load_session_jobs(scheduler.queue.session_id(run_id))) == 3
@@ -0,0 +1,18 @@
+from data_models import JobSite, ScrapingConfig
+from discovery import FeedEntry
+
+POSTING = b"""<html><body><div class="job-card">
+<h2 class="title">Python Developer</h2><span class="company">Acme Co</span>
+<p class="description">Build APIs with Python and Django.</p>
+</div></body></html>"""
+
+
+def test_html_fallback_records_parse_once(qapp):
+    from scraper import JobScraper
+    site = JobSite("a", "https://a.example", "https://a.example/s?q={query}", respect_robots=False)
+    scraper = JobScraper(ScrapingConfig([site], ["python"], [], metrics_file=""))
+
+    jobs = scraper._extract_posting(site, POSTING, FeedEntry("https://a.example/jobs/1", title="Python Developer"))
+
+    assert [job.url for job in jobs] == ["https://a.example/jobs/1"]
+    assert scraper.metrics.stage_totals()["parse"].count == 1
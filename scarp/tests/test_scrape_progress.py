@@ -0,0 +1,15 @@
+from scrape_progress import ScrapeProgress
+
+
+def test_timing_reports_weighted_units():
+    now = [0.0]
+    progress = ScrapeProgress(time_constant=1.0, clock=lambda: now[0])
+    progress.plan("pages", 10)
+    for _ in range(4):
+        now[0] += 1.0
+        progress.advance("pages")
+
+    snapshot = progress.snapshot()
+    assert snapshot.counts() == "4/10 pages"
+    assert snapshot.timing().endswith(" left") and " units/s, " in snapshot.timing()
+    assert 0.9 < snapshot.rate < 1.1
@@ -0,0 +1,121 @@
+import re
+import sqlite3
+import threading
+
+import pytest
+
+from crawl_archive import CrawlArchiveReader, CrawlArchiveWriter
+from data_models import JobSite, ScrapingConfig
+from listing_stream import ListingCutoff
+from scraper import JobScraper, ResponseTooLarge
+
+SITE = JobSite(name="a", base_url="https://a.example", search_url_template="https://a.example/jobs?q={query}")
+
+
+class FakeResponse:
+    status_code = 200
+    ok = True
+    encoding = "utf-8"
+
+    def __init__(self, url, body):
+        self.url = url
+        self.body = body
+        self.headers = {'Content-Type': 'text/html'}
+        self.closed = threading.Event()
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeSession:
+    def __init__(self, body):
+        self.body = body
+        self.responses = []
+
+    def get(self, url, **kwargs):
+        response = FakeResponse(url, self.body)
+        self.responses.append(response)
+        return response
+
+
+def scraper(body, max_response_bytes):
+    scraper = JobScraper(ScrapingConfig(job_sites=[SITE], search_queries=["python"], skill_categories=[],
+                                        max_response_bytes=max_response_bytes))
+    scraper.session = FakeSession(body)
+    return scraper
+
+
+def listing_page(count):
+    cards = "".join(f"<div class='job-card'><h3>Job {index}</h3></div>" for index in range(count))
+    return f"<html><body>{cards}</body></html>".encode("utf-8")
+
+
+def test_oversized_feed_fails_instead_of_truncating():
+    job_scraper = scraper(b"<urlset>" + b"<url><loc>https://a.example/j</loc></url>" * 2000 + b"</urlset>", 20000)
+    with pytest.raises(ResponseTooLarge):
+        job_scraper._fetch(SITE, "", "https://a.example/sitemap.xml")
+    assert job_scraper.last_fetch_error
+    assert job_scraper.session.responses[0].closed.is_set()
+
+
+def test_listing_pages_are_cut_off_at_the_cap():
+    body = listing_page(2000)
+    job_scraper = scraper(body, 20000)
+    cutoff = ListingCutoff(5000, ['div'], re.compile('job'))
+    content = job_scraper._fetch(SITE, "python", "https://a.example/jobs", cutoff)
+    assert content == body[:20000]
+
+
+def test_request_thread_is_released_when_the_cutoff_fails(monkeypatch):
+    job_scraper = scraper(listing_page(2000), 1024 * 1024)
+    cutoff = ListingCutoff(5000, ['div'], re.compile('job'))
+    monkeypatch.setattr(cutoff, "feed", lambda chunk: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        job_scraper._fetch(SITE, "python", "https://a.example/jobs", cutoff)
+    assert job_scraper.session.responses[0].closed.wait(5)
+
+
+def test_pool_scraper_store_is_closed_from_another_thread(tmp_path):
+    job_scraper = JobScraper(ScrapingConfig(job_sites=[SITE], search_queries=["python"], skill_categories=[]),
+                             db_path=str(tmp_path / "jobs.db"))
+    job_scraper.thread_bound_store = False
+    stores = []
+
+    def scrape():
+        job_scraper._get_site_health()
+        stores.append(job_scraper._store)
+
+    worker = threading.Thread(target=scrape)
+    worker.start()
+    worker.join()
+
+    job_scraper.close()
+    assert job_scraper._store is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        stores[0].conn.execute("SELECT 1")
+
+
+def test_archived_listing_pages_are_whole(tmp_path, capsys):
+    body = listing_page(200)
+    job_scraper = scraper(body, 1024 * 1024)
+    job_scraper.archive_writer = CrawlArchiveWriter(str(tmp_path), "run")
+    cutoff = ListingCutoff(5, ['div'], re.compile('job'))
+    job_scraper._fetch(SITE, "python", "https://a.example/jobs", cutoff)
+    assert len(cutoff.elements()) == 5
+
+    job_scraper.config.max_response_bytes = 2000
+    job_scraper._fetch(SITE, "python", "https://a.example/jobs?page=2", ListingCutoff(5, ['div'], re.compile('job')))
+    job_scraper.archive_writer.close()
+
+    reader = CrawlArchiveReader(str(tmp_path / "run"))
+    assert reader.get("https://a.example/jobs") == body
+    assert "cut off" not in capsys.readouterr().out
+    assert reader.get("https://a.example/jobs?page=2") == body[:2000]
+    assert "cut off" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+import types
+
+import pytest
+
+import site_health
+from job_store import JobStore
+from site_health import SiteHealth, OPEN
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(site_health, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Two connections, as two worker threads or processes would have
+    stores = [JobStore(str(tmp_path / "jobs.db")) for _ in range(2)]
+    yield stores
+    for store in stores:
+        store.close()
+
+
+def test_workers_share_one_circuit(stores, clock):
+    first, second = (SiteHealth(store, failure_threshold=2, cooldown=60) for store in stores)
+
+    assert not first.record_failure("a", "timeout")
+    assert second.record_failure("a", "timeout")
+    assert not first.allow("a")
+
+    # A page let through before the circuit opened does not close it
+    first.record_success("a", 5)
+    assert first.is_open("a") and second.is_open("a")
+
+    clock[0] += 60
+    assert [first.allow("a"), second.allow("a")] == [True, False]
+    first.record_success("a", 5)
+    assert second.allow("a")
+    assert not second.is_open("a")
+
+
+def test_failed_probe_reopens_the_circuit(stores, clock):
+    first, second = (SiteHealth(store, failure_threshold=1, cooldown=60) for store in stores)
+    assert first.record_failure("a", "timeout")
+
+    clock[0] += 60
+    assert second.allow("a")
+    assert second.record_failure("a", "still down")
+    clock[0] += 30
+    assert not first.allow("a")
+
+    pages, failures, state = stores[0].conn.execute(
+        "SELECT pages, failures, state FROM site_health WHERE site = 'a'"
+    ).fetchone()
+    assert (pages, failures, state) == (2, 2, OPEN)
+
+
+def test_without_a_store_the_breaker_lives_in_memory(clock):
+    health = SiteHealth(None, failure_threshold=2, cooldown=60)
+    health.record_failure("a", "timeout")
+    health.record_success("a", 3)
+    assert not health.record_failure("a", "timeout")
+    assert health.record_failure("a", "timeout")
+    assert not health.allow("a")
+
+    clock[0] += 60
+    assert health.allow("a") and not health.allow("a")
+    health.record_success("a", 3)
+    assert not health.is_open("a")
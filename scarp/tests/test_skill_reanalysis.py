@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_models import JobListing, SkillCategory
+from job_api import JobApi
+from job_store import JobStore
+from skill_analyzer import SkillAnalyzer
+from skill_reanalysis import SkillReanalyzer
+
+OLD = [SkillCategory("Languages", ["Python", "Go"]),
+       SkillCategory("Web", ["React", "Django"]),
+       SkillCategory("Ops", ["Docker"])]
+NEW = [SkillCategory("Languages", ["Python", "Go", "Rust"], aliases={"Go": ["golang"]}),
+       SkillCategory("Web", ["Django"]),
+       SkillCategory("Containers", ["Docker"])]
+
+DESCRIPTIONS = ["Python and Django", "golang services in Docker", "React, Rust and Python",
+                "Docker everywhere", "Go or Rust", "Django with React"]
+
+
+def build(path, categories):
+    store = JobStore(str(path))
+    analyzer = SkillAnalyzer(categories)
+    jobs = [JobListing(f"Engineer {index}", "Acme", "Remote", description, f"https://a.example/{index}", "a",
+                       scraped_at=datetime(2026, 1, 1) + timedelta(days=3 * index))
+            for index, description in enumerate(DESCRIPTIONS)]
+    for job in jobs:
+        analyzer.analyze_job(job)
+    store.save_session(jobs, ["a"], ["engineer"], analyzer.all_skills)
+    return store
+
+
+def contents(store):
+    query = lambda sql: sorted(store.conn.execute(sql).fetchall())
+    return (query("SELECT js.job_id, s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id"),
+            query("SELECT granularity, period_start, skill, category, job_count FROM skill_demand_rollups"),
+            query("SELECT granularity, period_start, category, mention_count FROM category_demand_rollups"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = build(tmp_path / "jobs.db", OLD)
+    SkillReanalyzer(store).reanalyze(SkillAnalyzer(OLD))
+    yield store
+    store.close()
+
+
+def test_reanalysis_matches_a_fresh_analysis(store, tmp_path):
+    summary = SkillReanalyzer(store, chunk_size=2, processes=1).reanalyze(SkillAnalyzer(NEW))
+    assert summary['complete'] and summary['jobs_changed']
+    fresh = build(tmp_path / "fresh.db", NEW)
+    try:
+        assert contents(store) == contents(fresh)
+    finally:
+        fresh.close()
+    assert not SkillReanalyzer(store).needs_update(SkillAnalyzer(NEW))
+
+
+def test_interrupted_reanalysis_keeps_old_vocabulary_and_categories(store):
+    calls = []
+
+    class StopAfterFirstChunk:
+        def is_set(self):
+            calls.append(1)
+            return len(calls) > 1
+
+    categories = contents(store)[2]
+    summary = SkillReanalyzer(store, chunk_size=2, processes=1).reanalyze(SkillAnalyzer(NEW),
+                                                                          stop_event=StopAfterFirstChunk())
+    assert not summary['complete']
+    assert contents(store)[2] == categories
+    assert SkillReanalyzer(store).needs_update(SkillAnalyzer(NEW))
+
+
+def test_rewrites_change_the_api_version(store):
+    api = JobApi(store.db_path)
+    try:
+        before = api.etag("/skills")
+        SkillReanalyzer(store, processes=1).reanalyze(SkillAnalyzer(NEW))
+        after = api.etag("/skills")
+        assert after != before
+        store.set_skill_categories({"docker": "Ops"})
+        assert api.etag("/skills") != after
+    finally:
+        api.close()
@@ -0,0 +1,83 @@
+"""
+Skill and category demand trends over stored scraping sessions
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, List, Dict, Optional
+from job_store import JobStore, period_start
+
+
+class TrendAnalyzer:
+    """Builds demand time series from the job store rollups"""
+
+    def __init__(self, job_store: JobStore):
+        self.job_store = job_store
+
+    def _since(self, granularity: str, periods: Optional[int]) -> Optional[str]:
+        if not periods:
+            return None
+        step = 7 if granularity == "week" else 1
+        start = datetime.now() - timedelta(days=step * (periods - 1))
+        return period_start(start, granularity)
+
+    def _period_axis(self, periods_seen: List[str], granularity: str) -> List[str]:
+        """Fill gaps so every series shares one contiguous axis"""
+        if not periods_seen:
+            return []
+        step = timedelta(days=7 if granularity == "week" else 1)
+        current = date.fromisoformat(min(periods_seen))
+        last = date.fromisoformat(max(periods_seen))
+        axis = []
+        while current <= last:
+            axis.append(current.isoformat())
+            current += step
+        return axis
+
+    def get_skill_trends(self, granularity: str = "week", periods: Optional[int] = None,
+                         top_n: int = 8, skills: Optional[List[str]] = None,
+                         normalize: bool = False) -> Dict[str, Any]:
+        """Demand per period for the given skills, or the current top skills.
+
+        With ``normalize`` the values are the share of jobs in the period
+        that mention the skill instead of raw job counts.
+        """
+        since = self._since(granularity, periods)
+        if not skills:
+            skills = [skill for skill, _ in self.job_store.get_top_skills(granularity, since, top_n)]
+
+        totals = dict(self.job_store.get_period_totals(granularity, since))
+        axis = self._period_axis(list(totals.keys()), granularity)
+
+        series = {skill: [0] * len(axis) for skill in skills}
+        index = {period: i for i, period in enumerate(axis)}
+        for period, skill, count in self.job_store.get_skill_rollups(granularity, since, skills):
+            if normalize:
+                series[skill][index[period]] = count / totals[period] if totals.get(period) else 0
+            else:
+                series[skill][index[period]] = count
+
+        return {
+            'granularity': granularity,
+            'periods': axis,
+            'series': series,
+            'job_totals': [totals.get(period, 0) for period in axis]
+        }
+
+    def get_category_trends(self, granularity: str = "week",
+                            periods: Optional[int] = None) -> Dict[str, Any]:
+        """Total skill mentions per category per period"""
+        since = self._since(granularity, periods)
+        rows = self.job_store.get_category_rollups(granularity, since)
+        totals = dict(self.job_store.get_period_totals(granularity, since))
+        axis = self._period_axis(list(totals.keys()), granularity)
+        index = {period: i for i, period in enumerate(axis)}
+
+        series = {}
+        for period, category, count in rows:
+            series.setdefault(category, [0] * len(axis))[index[period]] = count
+
+        return {
+            'granularity': granularity,
+            'periods': axis,
+            'series': series
+        }